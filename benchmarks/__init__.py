@@ -0,0 +1,6 @@
+"""Standalone performance benchmarks for Clipboard AI.
+
+Run any of them as a module from the repository root, e.g.::
+
+    python -m benchmarks.clipboard_watch
+"""
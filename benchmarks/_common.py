@@ -0,0 +1,145 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+
+def offscreen_app():
+    """Return a QApplication running on the offscreen platform plugin."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def private_model_catalog() -> str:
+    """Save the model catalog to a throwaway file, so fake models never reach the user's."""
+    from clipboard_ai.model_catalog import model_catalog
+    model_catalog.path = os.path.join(tempfile.mkdtemp(prefix="clipboard_ai_bench_"), "model_catalog.json")
+    return model_catalog.path
+
+
+def pump(app, seconds: float) -> None:
+    """Run the Qt event loop for a fixed wall-clock duration."""
+    from PyQt6.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def wait_until(app, predicate, timeout: float = 10.0) -> bool:
+    """Process events until predicate() is true or the timeout expires."""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.0005)
+    return True
+
+
+def proc_status(field: str) -> int:
+    """Read a numeric field from /proc/self/status (Linux only), -1 elsewhere."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def os_threads() -> int:
+    threads = proc_status("Threads")
+    return threads if threads >= 0 else threading.active_count()
+
+
+class ResourceSampler:
+    """Track CPU time, peak RSS growth and peak thread count over a measured section.
+
+    Samples are taken by a Qt timer on the GUI thread, so the event loop must
+    be running (``pump``/``wait_until``) while the section executes.
+    """
+
+    def __init__(self, interval_ms: int = 5):
+        from PyQt6.QtCore import QTimer
+        self._timer = QTimer()
+        self._timer.timeout.connect(self.sample)
+        self.interval_ms = interval_ms
+
+    def sample(self):
+        self.peak_rss_kb = max(self.peak_rss_kb, proc_status("VmRSS"))
+        self.peak_threads = max(self.peak_threads, os_threads())
+
+    def __enter__(self):
+        self.rss_start_kb = self.peak_rss_kb = proc_status("VmRSS")
+        self.peak_threads = os_threads()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        self._timer.start(self.interval_ms)
+        return self
+
+    def __exit__(self, *exc):
+        self._timer.stop()
+        self.sample()
+        self.cpu_s = time.process_time() - self._cpu
+        self.wall_s = time.perf_counter() - self._wall
+
+    def results(self) -> Dict[str, float]:
+        return {
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "rss_growth_mb": (self.peak_rss_kb - self.rss_start_kb) / 1024,
+            "peak_threads": self.peak_threads,
+        }
+
+
+class SignalCounter:
+    """Count emissions of Qt signals as received on the GUI thread."""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+
+    def watch(self, name: str, signal) -> None:
+        self.counts.setdefault(name, 0)
+
+        def count(*_args):
+            self.counts[name] += 1
+
+        signal.connect(count)
+
+    def results(self, suffix: str = "_signals") -> Dict[str, int]:
+        return {f"{name}{suffix}": count for name, count in self.counts.items()}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarise latency samples (seconds) as milliseconds."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000
+
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    """Print a small aligned table of results."""
+    print(f"\n== {title} ==")
+    for name, values in rows.items():
+        cells = ", ".join(
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in values.items()
+        )
+        print(f"  {name:<28} {cells}")
@@ -0,0 +1,179 @@
+"""Memory and frame time of the chat view as the history grows.
+
+Legacy path: one QFrame per message with its own layouts, labels, copy
+button and pixmap inside a QScrollArea, plus the original QImage kept in
+``message_history``.  New path: ``ChatWidget`` backed by ChatMessageModel and a
+QListView delegate, with images kept as JPEG thumbnails.  Each variant runs in
+a fresh subprocess so resident memory is measured cleanly.
+
+    python -m benchmarks.chat_history [--messages 50 200 1000] [--image-every 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from ._common import offscreen_app, print_table, pump
+
+TEXT = ("Here is a detailed answer about the copied content. " * 6 + "\n") * 3
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _screenshot(index: int):
+    from PyQt6.QtGui import QColor, QImage, QPainter
+
+    image = QImage(1920, 1080, QImage.Format.Format_RGB32)
+    image.fill(QColor(30 + index % 200, 120, 200))
+    painter = QPainter(image)
+    for row in range(0, 1080, 40):
+        painter.fillRect(0, row, 1920 - row, 12, QColor(240, 240, 240))
+    painter.end()
+    return image
+
+
+class _LegacyChat:
+    """The previous ChatWidget: a QFrame per message in a QScrollArea."""
+
+    def __init__(self):
+        from PyQt6.QtCore import Qt
+        from PyQt6.QtWidgets import QScrollArea, QVBoxLayout, QWidget
+
+        self.scroll = QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.container = QWidget()
+        self.layout = QVBoxLayout(self.container)
+        self.layout.addStretch()
+        self.scroll.setWidget(self.container)
+        self.scroll.resize(770, 420)
+        self.scroll.show()
+        self.message_history = []
+
+    def add_message(self, text, is_user=True, image=None):
+        from PyQt6.QtCore import Qt
+        from PyQt6.QtGui import QPixmap
+        from PyQt6.QtWidgets import QFrame, QHBoxLayout, QLabel, QPushButton, QVBoxLayout
+
+        msg = QFrame()
+        layout = QVBoxLayout(msg)
+        header = QHBoxLayout()
+        header.addWidget(QLabel("👤" if is_user else "🤖"))
+        header.addWidget(QLabel("You" if is_user else "Assistant"))
+        header.addStretch()
+        header.addWidget(QPushButton("📋 Copy"))
+        layout.addLayout(header)
+        image_label = QLabel()
+        if image is not None:
+            image_label.setPixmap(QPixmap.fromImage(image).scaled(
+                400, 300, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+        else:
+            image_label.hide()
+        layout.addWidget(image_label)
+        content = QLabel(text)
+        content.setWordWrap(True)
+        layout.addWidget(content)
+        self.layout.insertWidget(self.layout.count() - 1, msg)
+        self.message_history.append((text, is_user, image))
+
+    @property
+    def scrollbar(self):
+        return self.scroll.verticalScrollBar()
+
+    @property
+    def viewport(self):
+        return self.scroll.viewport()
+
+
+class _ModelChat:
+    def __init__(self):
+        from clipboard_ai.ui.floating_dialog import ChatWidget
+
+        self.widget = ChatWidget()
+        self.widget.resize(770, 480)
+        self.widget.show()
+
+    def add_message(self, text, is_user=True, image=None):
+        self.widget.add_message(text, is_user, image)
+
+    @property
+    def scrollbar(self):
+        return self.widget.view.verticalScrollBar()
+
+    @property
+    def viewport(self):
+        return self.widget.view.viewport()
+
+
+def measure(variant: str, count: int, image_every: int) -> dict:
+    app = offscreen_app()
+    chat = _LegacyChat() if variant == "legacy" else _ModelChat()
+    pump(app, 0.2)
+    rss_before = _rss_mb()
+
+    started = time.perf_counter()
+    for i in range(count):
+        # Each image is a fresh capture, as a clipboard screenshot would be
+        image = _screenshot(i) if image_every and i % image_every == 0 else None
+        chat.add_message(TEXT, is_user=i % 2 == 0, image=image)
+        del image
+        if i % 25 == 0:
+            app.processEvents()
+    pump(app, 0.3)
+    add_ms = (time.perf_counter() - started) * 1000 / count
+
+    # Frame time: scroll through the history in steps and repaint each time
+    scrollbar, frames = chat.scrollbar, []
+    for step in range(20):
+        scrollbar.setValue(scrollbar.maximum() * step // 19)
+        frame_start = time.perf_counter()
+        chat.viewport.repaint()
+        frames.append(time.perf_counter() - frame_start)
+    frames.sort()
+
+    return {
+        "rss_mb": _rss_mb() - rss_before,
+        "add_ms_per_msg": add_ms,
+        "frame_p50_ms": frames[len(frames) // 2] * 1000,
+        "frame_max_ms": frames[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--image-every", type=int, default=5, help="Attach a 1920x1080 image to every Nth message")
+    parser.add_argument("--variant", choices=["legacy", "model"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.messages[0], args.image_every)))
+        return
+
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    for count in args.messages:
+        results = {}
+        for variant, name in (("legacy", "legacy QFrame per message"), ("model", "model/view + thumbnails")):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.chat_history", "--variant", variant,
+                 "--messages", str(count), "--image-every", str(args.image_every)],
+                capture_output=True, text=True, env=env, check=True
+            ).stdout
+            results[name] = json.loads(output.strip().splitlines()[-1])
+        print_table(f"{count} messages, image every {args.image_every}", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Idle CPU and per-change latency of clipboard change detection.
+
+Compares the legacy 1 s ``QTimer`` poll (decode image + read text on every
+tick) with the event-driven ``ClipboardWatcher``.  Images are served through a
+mime object that decodes PNG bytes on every ``imageData()`` call, the way a
+platform clipboard does for data owned by another process.
+
+    python -m benchmarks.clipboard_watch [--idle-seconds 5] [--changes 20]
+"""
+import argparse
+import time
+
+from ._common import offscreen_app, percentiles, print_table, pump, wait_until
+
+
+def _make_png(side: int, seed: int) -> bytes:
+    from PyQt6.QtCore import QBuffer, QByteArray, QIODevice
+    from PyQt6.QtGui import QColor, QImage, QPainter
+
+    image = QImage(side, side, QImage.Format.Format_RGB32)
+    image.fill(QColor(seed * 37 % 255, 80, 160))
+    painter = QPainter(image)
+    for i in range(0, side, 16):
+        painter.fillRect(i, (i * seed) % side, 12, 12, QColor(i % 255, seed % 255, 200))
+    painter.end()
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(data)
+
+
+def _png_mime(png: bytes, counter: dict):
+    from PyQt6.QtCore import QMimeData
+    from PyQt6.QtGui import QImage
+
+    class PngMimeData(QMimeData):
+        """Mime data that decodes its image lazily, like a foreign clipboard owner."""
+
+        def formats(self):
+            return ["application/x-qt-image", "image/png"]
+
+        def hasFormat(self, mime_type):
+            return mime_type in self.formats()
+
+        def retrieveData(self, mime_type, preferred_type):
+            if mime_type == "image/png":
+                return png
+            if mime_type == "application/x-qt-image":
+                counter["decodes"] += 1
+                return QImage.fromData(png, "PNG")
+            return None
+
+    return PngMimeData()
+
+
+def legacy_check(clipboard, state: dict) -> None:
+    """What ClipboardMonitor._check_clipboard did once per second."""
+    mime_data = clipboard.mimeData()
+    if mime_data and mime_data.hasImage():
+        image = mime_data.imageData()
+        if image is not None and not image.isNull():
+            state["seen"] = image.pixel(0, 0)
+            return
+    if mime_data and mime_data.hasText():
+        state["seen"] = mime_data.text().strip()
+
+
+def run(idle_seconds: float, changes: int, side: int) -> None:
+    from PyQt6.QtCore import QTimer
+    from clipboard_ai.clipboard_watcher import ClipboardWatcher
+
+    app = offscreen_app()
+    clipboard = app.clipboard()
+    pngs = [_make_png(side, seed) for seed in range(1, changes + 2)]
+    results = {}
+
+    # ---- Legacy polling path ----
+    counter = {"decodes": 0}
+    state = {"seen": None}
+    clipboard.setMimeData(_png_mime(pngs[0], counter))
+    poller = QTimer()
+    poller.timeout.connect(lambda: legacy_check(clipboard, state))
+    poller.start(1000)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    pump(app, idle_seconds)
+    idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    idle_decodes = counter["decodes"]
+
+    latencies = []
+    for png in pngs[1:]:
+        previous = state["seen"]
+        counter["decodes"] = 0
+        clipboard.setMimeData(_png_mime(png, counter))
+        started = time.perf_counter()
+        wait_until(app, lambda: state["seen"] != previous, timeout=3)
+        latencies.append(time.perf_counter() - started)
+    poller.stop()
+    results["legacy poll (1000 ms)"] = {
+        "idle_cpu_pct": idle_cpu * 100,
+        "idle_decodes": idle_decodes,
+        **percentiles(latencies),
+    }
+
+    # ---- Event-driven watcher ----
+    counter = {"decodes": 0}
+    clipboard.setMimeData(_png_mime(pngs[0], counter))
+    app.processEvents()
+    watcher = ClipboardWatcher(clipboard)
+    handled = {"count": 0}
+
+    def on_change(_fingerprint):
+        mime_data = clipboard.mimeData()
+        if mime_data.hasImage():
+            mime_data.imageData()
+        handled["count"] += 1
+
+    watcher.changed.connect(on_change)
+    counter["decodes"] = 0
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    pump(app, idle_seconds)
+    idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    idle_decodes = counter["decodes"]
+
+    latencies = []
+    counter["decodes"] = 0
+    for png in pngs[1:]:
+        before = handled["count"]
+        clipboard.setMimeData(_png_mime(png, counter))
+        started = time.perf_counter()
+        wait_until(app, lambda: handled["count"] > before, timeout=3)
+        latencies.append(time.perf_counter() - started)
+    watcher.stop()
+    results[f"watcher (debounce {watcher.debounce_ms} ms)"] = {
+        "idle_cpu_pct": idle_cpu * 100,
+        "idle_decodes": idle_decodes,
+        "decodes_per_change": counter["decodes"] / max(1, changes),
+        **percentiles(latencies),
+    }
+
+    print_table(f"Clipboard change detection ({side}x{side} PNG)", results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--side", type=int, default=2000, help="Screenshot edge length in pixels")
+    args = parser.parse_args()
+    run(args.idle_seconds, args.changes, args.side)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""A local stand-in for the Ollama HTTP API, for benchmarks that need no GPU.
+
+Implements ``/api/tags``, ``/api/ps``, ``/api/show``, ``/api/generate``,
+``/api/chat`` and ``/api/embed`` over keep-alive HTTP/1.1 with chunked NDJSON
+streaming.  Embeddings are hashed bags of words, so texts sharing most of
+their words get similar vectors.  Token
+rate, answer text or length, prefill time per KB of request body and the
+number of generations served in parallel are configurable, and the server
+counts the TCP connections, requests and request bytes it has served.
+Generating with a model the server does not list is a 404, and ``crash()``
+cuts open connections, so several servers can stand in for a cluster.
+``stalled`` and ``fail_statuses`` make it hang or answer with errors.
+
+    with FakeOllama(token_delay=0.002) as server:
+        ollama.base_url = server.url
+"""
+import contextlib
+import hashlib
+import json
+import math
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Like Ollama's Go server: no Nagle delay between streamed chunks
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+            self.server.sockets.add(self.connection)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.sockets.discard(self.connection)
+        super().finish()
+
+    def _send_json(self, obj, status: int = 200):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.paths[self.path] = self.server.paths.get(self.path, 0) + 1
+
+    def _unavailable(self) -> bool:
+        """Act out a stalled or overloaded server; True if the request was answered with an error."""
+        fake = self.server.fake
+        while fake.stalled.is_set():
+            time.sleep(0.01)
+        with self.server.lock:
+            status = fake.fail_statuses.pop(0) if fake.fail_statuses else None
+        if status is None:
+            return False
+        if self.command == "POST":
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._send_json({"error": "server busy"}, status)
+        return True
+
+    def do_GET(self):
+        self._count()
+        if self._unavailable():
+            return
+        fake = self.server.fake
+        if fake.metadata_delay:
+            time.sleep(fake.metadata_delay)
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": name, "model": name, "size": 1 << 30, "digest": fake.digest(name)}
+                                        for name in fake.models]})
+        elif self.path == "/api/ps":
+            self._send_json({"models": [{"name": name, "model": name} for name in fake.models
+                                        if name in fake.loaded]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        self._count()
+        if self._unavailable():
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.bytes_received += length
+        fake = self.server.fake
+        if self.path == "/api/show":
+            if fake.metadata_delay:
+                time.sleep(fake.metadata_delay)
+            self._send_json({
+                "modelfile": "",
+                "details": {"family": "fake"},
+                "model_info": {"fake.context_length": fake.context_length},
+                "capabilities": ["completion", "vision"],
+            })
+        elif self.path in ("/api/generate", "/api/chat"):
+            name = fake.model_name(body.get("model", ""))
+            if name is None:
+                self._send_json({"error": f"model '{body.get('model')}' not found"}, 404)
+                return
+            with self.server.lock:
+                cold = name not in fake.loaded
+                fake.loaded.add(name)
+                self.server.active += 1
+                self.server.peak_active = max(self.server.peak_active, self.server.active)
+            try:
+                with fake.slots:
+                    if cold and fake.load_delay:
+                        time.sleep(fake.load_delay)
+                    self._generate(body, chat=self.path == "/api/chat", size=length)
+            finally:
+                with self.server.lock:
+                    self.server.active -= 1
+        elif self.path == "/api/embed":
+            inputs = body.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self._send_json({"model": body.get("model"), "embeddings": [fake.embedding(text) for text in inputs]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _generate(self, body, chat: bool, size: int):
+        fake = self.server.fake
+        limit = body.get("options", {}).get("num_predict")
+        if fake.answer is not None:
+            words = re.findall(r"\s*\S+\s*", fake.answer)[:limit or None]
+        else:
+            words = [f"{fake.word}{i % 10} " for i in range(limit or fake.tokens)]
+        if not body.get("prompt") and not body.get("messages"):
+            words = []  # A load or keep-alive ping
+        tokens = len(words)
+
+        def chunk(text, done, **extra):
+            if chat:
+                return {"model": body.get("model"), "message": {"role": "assistant", "content": text},
+                        "done": done, **extra}
+            return {"model": body.get("model"), "response": text, "done": done, **extra}
+
+        started = time.perf_counter()
+        prefill = fake.first_token_delay + fake.prefill_delay_per_kb * size / 1024
+        if prefill and tokens:
+            time.sleep(prefill)
+        stats = {"prompt_eval_count": 16, "eval_count": tokens}
+        if body.get("stream", True) is False:
+            time.sleep(fake.token_delay * tokens)
+            self._send_json(chunk("".join(words), True, total_duration=int((time.perf_counter() - started) * 1e9),
+                                  **stats))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for word in words:
+                if fake.token_delay:
+                    time.sleep(fake.token_delay)
+                self._write_chunk((json.dumps(chunk(word, False)) + "\n").encode())
+            final = chunk("", True, total_duration=int((time.perf_counter() - started) * 1e9),
+                          prompt_eval_duration=int(prefill * 1e9) or 1_000_000, eval_duration=int(fake.token_delay * tokens * 1e9),
+                          **stats)
+            self._write_chunk((json.dumps(final) + "\n").encode())
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            with self.server.lock:
+                self.server.aborted += 1
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, fake: "FakeOllama"):
+        super().__init__(address, _Handler)
+        self.fake = fake
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.aborted = 0
+        self.bytes_received = 0
+        self.paths = {}
+        self.sockets = set()  # Open client connections
+        self.active = 0  # Generations in flight, including those waiting for a slot
+        self.peak_active = 0
+
+
+class FakeOllama:
+    """Run the fake server on a background thread; usable as a context manager."""
+
+    def __init__(self, tokens: int = 50, token_delay: float = 0.0, first_token_delay: float = 0.0,
+                 models=("gemma3:latest",), context_length: int = 8192, port: int = 0, word: str = "tok",
+                 answer: str = None, prefill_delay_per_kb: float = 0.0, parallel: int = 0,
+                 embedding_dim: int = 768, loaded=None, load_delay: float = 0.0, metadata_delay: float = 0.0):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        # Fixed answer streamed word by word instead of ``tokens`` generated words
+        self.answer = answer
+        # Extra time before the first token per KB of request body (prompt and images)
+        self.prefill_delay_per_kb = prefill_delay_per_kb
+        # Generations served at once, like OLLAMA_NUM_PARALLEL (0 = no limit); the rest wait
+        self.slots = threading.BoundedSemaphore(parallel) if parallel else contextlib.nullcontext()
+        self.models = list(models)
+        # Models /api/ps reports as in memory (default all); generating loads one
+        self.loaded = set(self.models if loaded is None else loaded)
+        self.load_delay = load_delay  # Time to load a model that is not in memory yet
+        self.metadata_delay = metadata_delay  # Time to answer /api/tags, /api/ps and /api/show
+        self._pulls = {}  # Times each model was re-pulled, which changes its digest
+        # While set, requests are accepted but not answered, like an Ollama that is starting up
+        self.stalled = threading.Event()
+        # Statuses to answer the next requests with instead of serving them
+        self.fail_statuses = []
+        self.context_length = context_length
+        self.word = word
+        self.embedding_dim = embedding_dim
+        self._server = _Server(("127.0.0.1", port), self)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+
+    def model_name(self, model: str):
+        """The listed name a request's model refers to, or None if the server does not have it."""
+        for name in (model, f"{model}:latest"):
+            if name in self.models:
+                return name
+        return None
+
+    def digest(self, name: str) -> str:
+        return hashlib.sha256(f"{name}#{self._pulls.get(name, 0)}".encode()).hexdigest()
+
+    def repull(self, name: str):
+        """Give a model a new digest, as pulling a newer version does."""
+        self._pulls[name] = self._pulls.get(name, 0) + 1
+
+    def embedding(self, text: str) -> list:
+        """Hashed bag of words, unit length."""
+        vector = [0.0] * self.embedding_dim
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.embedding_dim] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        return self._server.connections
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    @property
+    def aborted(self) -> int:
+        return self._server.aborted
+
+    @property
+    def peak_active(self) -> int:
+        """Most generations in flight at once since the last reset."""
+        return self._server.peak_active
+
+    @property
+    def bytes_received(self) -> int:
+        return self._server.bytes_received
+
+    @property
+    def paths(self) -> dict:
+        """Requests served per path."""
+        with self._server.lock:
+            return dict(self._server.paths)
+
+    def reset_counters(self):
+        with self._server.lock:
+            self._server.connections = self._server.requests = self._server.aborted = 0
+            self._server.bytes_received = 0
+            self._server.paths.clear()
+            self._server.peak_active = self._server.active
+
+    def start(self) -> "FakeOllama":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def crash(self):
+        """Go down like a host that lost power: refuse new connections and cut the open ones."""
+        self.stop()
+        with self._server.lock:
+            sockets = list(self._server.sockets)
+        for sock in sockets:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama API until interrupted")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=0)
+    parser.add_argument("--parallel", type=int, default=0, help="Generations served at once (0 = no limit)")
+    args = parser.parse_args()
+    server = FakeOllama(tokens=args.tokens, token_delay=args.token_ms / 1000,
+                        first_token_delay=args.first_token_ms / 1000, parallel=args.parallel, port=args.port).start()
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,114 @@
+"""Time-to-first-token per follow-up turn against a running Ollama server.
+
+Legacy path: the whole transcript is flattened into one prompt and sent to
+``/api/generate`` on every turn, so prefill grows with the conversation.
+New path: the transcript is sent to ``/api/chat`` as a messages list, whose
+rendered prefix is identical from turn to turn and stays in the KV cache.
+
+Besides client-side TTFT, the table reports the server's own
+``prompt_eval_count`` (tokens actually prefilled) and ``prompt_eval_duration``.
+
+    python -m benchmarks.followup_ttft [--model llama3.2] [--turns 6]
+"""
+import argparse
+import time
+
+QUESTIONS = [
+    "Explain how a hash map handles collisions.",
+    "Can you give a short Python example of that?",
+    "What is the worst-case lookup time and why?",
+    "How does Python's dict avoid that in practice?",
+    "Summarise the trade-offs of open addressing.",
+    "Which approach would you pick for a cache and why?",
+    "What changes if keys are mostly integers?",
+    "Give one sentence I could put in a code comment.",
+]
+
+
+def _flatten(history, question: str) -> str:
+    """The prompt TextWorker used to build for follow-ups."""
+    if not history:
+        return question
+    context_str = "\n".join(
+        f"{'User' if role == 'user' else 'Assistant'}: {content}" for content, role in history
+    )
+    return f"{context_str}\n\nUser: {question}\n\nAssistant: Let me help you with that follow-up question."
+
+
+def _consume(request, text_of):
+    """Send a streaming request and drain it, returning (ttft seconds, full text, final chunk)."""
+    started = time.perf_counter()
+    ttft, text, last = None, "", None
+    for chunk in request():
+        piece = text_of(chunk)
+        if piece and ttft is None:
+            ttft = time.perf_counter() - started
+        text += piece
+        last = chunk
+    return ttft or (time.perf_counter() - started), text, last
+
+
+def run_legacy(ollama, model: str, turns: int, options: dict):
+    history, rows = [], []
+    for question in QUESTIONS[:turns]:
+        prompt = _flatten(history, question)
+        ttft, answer, last = _consume(
+            lambda: ollama.generate(model, prompt, stream=True, options=options),
+            lambda c: c.text)
+        history += [(question, "user"), (answer, "assistant")]
+        rows.append((ttft, last))
+    return rows
+
+
+def run_chat(ollama, model: str, turns: int, options: dict):
+    messages, rows = [], []
+    for question in QUESTIONS[:turns]:
+        messages.append({"role": "user", "content": question})
+        ttft, answer, last = _consume(
+            lambda: ollama.chat(model, list(messages), stream=True, options=options),
+            lambda c: c.text)
+        messages.append({"role": "assistant", "content": answer})
+        rows.append((ttft, last))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=None, help="Ollama base URL (defaults to the configured host)")
+    parser.add_argument("--model", default=None, help="Model to test (defaults to selected_model)")
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--num-predict", type=int, default=64, help="Cap answer length to keep runs short")
+    args = parser.parse_args()
+
+    from clipboard_ai.config import config
+    from clipboard_ai.ollama_integration import OllamaAPI, DEFAULT_OPTIONS
+
+    ollama = OllamaAPI()
+    if args.host:
+        ollama.base_url = args.host.rstrip("/")
+    model = args.model or config.get("selected_model")
+    turns = max(1, min(args.turns, len(QUESTIONS)))
+    options = dict(DEFAULT_OPTIONS, num_predict=args.num_predict, seed=42)
+
+    # Load the model once so turn 1 of the first path does not pay for it
+    for _ in ollama.generate(model, "hi", stream=True, options={"num_predict": 1}):
+        pass
+
+    results = {"generate (flattened)": run_legacy(ollama, model, turns, options),
+               "chat (messages)": run_chat(ollama, model, turns, options)}
+
+    print(f"\nmodel={model} turns={turns}")
+    print(f"{'turn':>4}  " + "  ".join(f"{name:>44}" for name in results))
+    print(f"{'':>4}  " + "  ".join(f"{'ttft_ms':>12}{'prefill_tok':>14}{'prefill_ms':>14}    " for _ in results))
+    for turn in range(turns):
+        cells = []
+        for rows in results.values():
+            ttft, last = rows[turn]
+            stats = last.stats if last else {}
+            cells.append(f"{ttft * 1000:>12.1f}{stats.get('prompt_eval_count', 0):>14}"
+                         f"{stats.get('prompt_eval_duration', 0) / 1e6:>14.1f}    ")
+        print(f"{turn + 1:>4}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
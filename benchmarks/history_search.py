@@ -0,0 +1,159 @@
+"""Write cost and search latency of the persistent history at 100k entries.
+
+Writes: ``HistoryStore.add`` (queued, batched by the writer thread, WAL) is
+compared with the straightforward alternative of an INSERT and COMMIT per
+entry on the calling thread with SQLite's default journal.  Both report the
+time the caller is blocked per entry; the batched store also reports how
+long the writer took to land everything.
+
+Reads: full-text search through the FTS5 index against a ``LIKE '%word%'``
+scan of the same table, for the first page of results and for a page deep in
+the result list (keyset by id against OFFSET).
+
+    python -m benchmarks.history_search [--entries 100000] [--queries 50]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from ._common import percentiles, print_table
+
+WORDS = ("python function error traceback invoice meeting summary translate email draft server "
+         "kubernetes docker memory leak screenshot chart revenue quarter customer ticket bug fix "
+         "release notes schedule deadline budget analysis paragraph recipe address phone contract "
+         "database index query latency cache thread signal widget layout font color image scan "
+         "receipt flight hotel booking password reset login token refund shipping order tracking").split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    # Skewed word frequencies, like real text: a few words are everywhere, most are rare
+    return " ".join(WORDS[min(len(WORDS) - 1, int(rng.expovariate(1 / 12)))] for _ in range(words))
+
+
+def _rows(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield ("text", _text(rng, 40) + f" item{i}", "", "gemma3:latest", _text(rng, 120), 0.2, 3.0)
+
+
+def write_store(path: str, entries: int):
+    from clipboard_ai.history_store import HistoryStore
+
+    rows = list(_rows(entries))
+    store = HistoryStore(path, max_items=entries)
+    blocked = []
+    started = time.perf_counter()
+    for kind, source, prompt, model, response, ttft, total in rows:
+        t = time.perf_counter()
+        store.add(kind, source, model, response, prompt, ttft, total)
+        blocked.append(time.perf_counter() - t)
+    queued = time.perf_counter() - started
+    store.flush(timeout=600)
+    landed = time.perf_counter() - started
+    return store, {
+        "caller_us_per_entry": sum(blocked) / len(blocked) * 1e6,
+        "caller_max_ms": max(blocked) * 1000,
+        "caller_total_s": queued,
+        "on_disk_after_s": landed,
+        "transactions": store.batches,
+    }
+
+
+def write_per_commit(path: str, entries: int):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY, created REAL, kind TEXT, source TEXT,"
+                 " prompt TEXT, model TEXT, response TEXT, ttft_s REAL, total_s REAL)")
+    rows = list(_rows(entries))
+    blocked = []
+    started = time.perf_counter()
+    for row in rows:
+        t = time.perf_counter()
+        conn.execute("INSERT INTO history (created, kind, source, prompt, model, response, ttft_s, total_s)"
+                     " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (time.time(),) + row)
+        conn.commit()
+        blocked.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return {
+        "caller_us_per_entry": sum(blocked) / len(blocked) * 1e6,
+        "caller_max_ms": max(blocked) * 1000,
+        "caller_total_s": elapsed,
+        "on_disk_after_s": elapsed,
+        "transactions": entries,
+    }
+
+
+def search(store, queries, deep_page: int, page_size: int = 50):
+    from clipboard_ai.history_store import HistoryEntry
+
+    conn = store._reader()
+    columns = ", ".join(HistoryEntry._fields)
+    fts_first, fts_deep, like_first, like_deep, hits = [], [], [], [], 0
+    for query in queries:
+        started = time.perf_counter()
+        page = store.page(query, limit=page_size)
+        fts_first.append(time.perf_counter() - started)
+        hits += len(page)
+
+        started = time.perf_counter()
+        for _ in range(deep_page):
+            if not page:
+                break
+            page = store.page(query, before_id=page[-1].id, limit=page_size)
+        fts_deep.append(time.perf_counter() - started)
+
+        words = query.split()
+        where = " AND ".join("(source LIKE ? OR prompt LIKE ? OR response LIKE ?)" for _ in words)
+        params = [f"%{word}%" for word in words for _ in range(3)]
+        started = time.perf_counter()
+        conn.execute(f"SELECT {columns} FROM history WHERE {where} ORDER BY id DESC LIMIT ?",
+                     params + [page_size]).fetchall()
+        like_first.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for number in range(1, deep_page + 1):
+            conn.execute(f"SELECT {columns} FROM history WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                         params + [page_size, number * page_size]).fetchall()
+        like_deep.append(time.perf_counter() - started)
+    return {
+        "FTS5, first page": percentiles(fts_first),
+        f"FTS5, next {deep_page} pages (keyset)": percentiles(fts_deep),
+        "LIKE scan, first page": percentiles(like_first),
+        f"LIKE scan, next {deep_page} pages (OFFSET)": percentiles(like_deep),
+    }, hits / max(1, len(queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--deep-pages", type=int, default=10)
+    parser.add_argument("--legacy-entries", type=int, default=5_000,
+                        help="Entries for the commit-per-entry writer (it is slow)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store, batched = write_store(os.path.join(directory, "history.sqlite3"), args.entries)
+        per_commit = write_per_commit(os.path.join(directory, "legacy.sqlite3"), args.legacy_entries)
+        print_table("Writing history entries", {
+            f"commit per entry ({args.legacy_entries})": per_commit,
+            f"HistoryStore batched ({args.entries})": batched,
+        })
+
+        rng = random.Random(3)
+        queries = [" ".join(rng.sample(WORDS[:30], rng.choice((1, 2)))) for _ in range(args.queries // 2)]
+        queries += [f"item{rng.randrange(args.entries)}" for _ in range(args.queries - len(queries))]
+        rows, hits = search(store, queries, args.deep_pages)
+        print_table(f"Searching {store.count()} entries, {len(queries)} queries, {hits:.0f} hits per first page",
+                    rows)
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                   if name.startswith("history"))
+        print(f"\nDatabase with index: {size / 1024 / 1024:.0f} MB")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
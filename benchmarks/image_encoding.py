@@ -0,0 +1,102 @@
+"""Encode time and peak memory of preparing an image request body.
+
+Legacy path: save a JPEG to the temp dir, read it back, base64 it, decode to
+str and let ``json=`` serialise the payload again.  New path:
+``encode_image`` into a QBuffer plus ``async_ollama.encode_body`` splicing the
+base64 bytes into the JSON.  Peak memory is the Python heap high-water mark
+from tracemalloc (Qt's own pixel buffers are the same for both paths).
+
+    python -m benchmarks.image_encoding [--repeat 5]
+"""
+import argparse
+import base64
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from ._common import offscreen_app, print_table
+
+
+def _screenshot(width: int, height: int):
+    from PyQt6.QtGui import QColor, QFont, QImage, QPainter
+
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor(245, 245, 245))
+    painter = QPainter(image)
+    painter.setFont(QFont("Sans", 14))
+    for row in range(0, height, 22):
+        painter.fillRect(0, row, width // 3, 2, QColor(row % 255, 120, 200))
+        painter.drawText(10, row + 18, f"line {row} " + "lorem ipsum dolor sit amet " * 4)
+    painter.end()
+    return image
+
+
+def legacy_body(image) -> bytes:
+    from PyQt6.QtCore import Qt
+
+    path = os.path.join(tempfile.gettempdir(), f"clipboard_ai_bench_{uuid.uuid4()}.jpg")
+    try:
+        if image.width() > 1200 or image.height() > 1200:
+            image.scaled(1200, 1200, Qt.AspectRatioMode.KeepAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation).save(path, "JPG", 85)
+        else:
+            image.save(path, "JPG", 90)
+        with open(path, "rb") as f:
+            encoded = base64.b64encode(f.read()).decode("utf-8")
+        payload = {"model": "m", "messages": [{"role": "user", "content": "describe", "images": [encoded]}],
+                   "stream": True}
+        # What requests does for json=payload
+        return json.dumps(payload).encode("utf-8")
+    finally:
+        os.remove(path)
+
+
+def new_body(image) -> bytes:
+    from clipboard_ai.image_encoding import encode_image
+    from clipboard_ai.async_ollama import encode_body
+
+    encoded = encode_image(image, max_side=1200, fmt="JPG")
+    payload = {"model": "m", "messages": [{"role": "user", "content": "describe", "images": [encoded.base64]}],
+               "stream": True}
+    return encode_body(payload)
+
+
+def measure(fn, image, repeat: int):
+    fn(image)  # Warm up imports and codec plugins outside the measurement
+    timings, peaks, size = [], [], 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        body = fn(image)
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        size = len(body)
+        del body
+    return {
+        "encode_ms": min(timings) * 1000,
+        "peak_py_mb": max(peaks) / 1024 / 1024,
+        "body_kb": size / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = offscreen_app()  # noqa: F841 - keep the QApplication alive
+    for width, height in ((1280, 720), (1920, 1080), (3840, 2160)):
+        image = _screenshot(width, height)
+        results = {
+            "legacy temp file": measure(legacy_body, image, args.repeat),
+            "in-memory QBuffer": measure(new_body, image, args.repeat),
+        }
+        print_table(f"{width}x{height} screenshot", results)
+
+
+if __name__ == "__main__":
+    main()
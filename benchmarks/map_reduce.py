@@ -0,0 +1,136 @@
+"""Very large clipboard text: one prompt against map-reduce over parts.
+
+Against ``benchmarks.fake_ollama`` with prefill time proportional to the
+request size, a multi-megabyte log is processed as the app used to (one
+``TextWorker`` prompt, which the context manager cuts down to the window,
+dropping the middle of the text) and with ``MapReduceWorker`` at several
+levels of parallelism, the server running as many generations at once.
+
+Reported per run: time to the first useful streamed text (for map-reduce
+the first finished part), time to the final answer, requests sent and the
+share of the input that reached the model.  The splitter's own throughput
+is measured on a log and on concatenated source files.
+
+    python -m benchmarks.map_reduce [--size-kb 2048] [--parallel 1,2,4] [--prefill-ms-per-kb 2]
+"""
+import argparse
+import os
+import random
+import time
+
+from ._common import offscreen_app, print_table, private_model_catalog, wait_until
+from .fake_ollama import FakeOllama
+
+LEVELS = ("DEBUG", "INFO", "INFO", "INFO", "WARN", "ERROR")
+
+
+def make_log(size: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    lines, total = [], 0
+    while total < size:
+        line = (f"2026-10-18T12:{rng.randrange(60):02d}:{rng.randrange(60):02d}.{rng.randrange(1000):03d} "
+                f"{rng.choice(LEVELS):<5} [worker-{rng.randrange(16)}] request {rng.randrange(10 ** 6)} "
+                f"{rng.choice(('handled', 'retrying', 'timed out', 'cache miss', 'queued'))} "
+                f"in {rng.randrange(2000)} ms")
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def make_source_tree() -> str:
+    """The app's own modules, concatenated as if a whole source tree was copied."""
+    import clipboard_ai
+
+    root = os.path.dirname(clipboard_ai.__file__)
+    parts = []
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if name.endswith(".py"):
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    parts.append(f"# ===== {name} =====\n```python\n{f.read()}\n```\n")
+    return "\n".join(parts)
+
+
+def bench_split(texts: dict, max_tokens: int) -> dict:
+    from clipboard_ai.chunking import split_text
+
+    rows = {}
+    for name, text in texts.items():
+        started = time.perf_counter()
+        chunks = split_text(text, max_tokens)
+        elapsed = time.perf_counter() - started
+        rows[name] = {"size_kb": len(text) / 1024, "chunks": len(chunks),
+                      "split_ms": elapsed * 1000, "mb_per_s": len(text) / 1024 / 1024 / elapsed}
+    return rows
+
+
+def run_worker(app, server: FakeOllama, worker, size: int) -> dict:
+    from clipboard_ai.worker_pool import WorkerPool
+
+    state = {"first": None, "done": False, "error": None}
+    started = time.perf_counter()
+
+    def on_chunk(text):
+        # The map-reduce header is not an answer; wait for the first part
+        if state["first"] is None and not text.startswith("*Long text"):
+            state["first"] = time.perf_counter() - started
+
+    def on_result(_text):
+        state["done"] = time.perf_counter() - started
+
+    worker.stream_chunk.connect(on_chunk)
+    worker.result_ready.connect(on_result)
+    worker.error.connect(lambda err: state.update(error=err, done=time.perf_counter() - started))
+    server.reset_counters()
+    pool = WorkerPool(max_workers=1)
+    pool.submit(worker)
+    wait_until(app, lambda: state["done"], timeout=900)
+    pool.shutdown()
+    if state["error"]:
+        print(f"  error: {state['error']}")
+    return {
+        "first_text_s": state["first"] if state["first"] is not None else float("nan"),
+        "answer_s": state["done"] or float("nan"),
+        "requests": sum(count for path, count in server.paths.items() if path == "/api/chat"),
+        # Request bodies carry the text JSON-escaped plus prompts, close enough for a share
+        "input_sent": f"{min(1.0, server.bytes_received / size):.0%}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--parallel", default="1,2,4")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens per answer (capped by num_predict)")
+    parser.add_argument("--token-ms", type=float, default=2.0)
+    parser.add_argument("--prefill-ms-per-kb", type=float, default=2.0)
+    args = parser.parse_args()
+
+    app = offscreen_app()
+    from clipboard_ai.config import config
+    from clipboard_ai.map_reduce_worker import MapReduceWorker
+    from clipboard_ai.ollama_integration import ollama
+    from clipboard_ai.text_worker import TextWorker
+
+    config.current_config.update(response_cache_enabled=False, semantic_cache_enabled=False,
+                                 history_enabled=False, model_warmup_enabled=False)
+    private_model_catalog()
+    log = make_log(args.size_kb * 1024)
+    print_table("Splitting", bench_split({"log": log, "source tree": make_source_tree()},
+                                         config.get("map_reduce_chunk_tokens", 3000)))
+
+    rows = {}
+    for parallel in [int(p) for p in args.parallel.split(",") if p.strip()]:
+        with FakeOllama(tokens=args.tokens, token_delay=args.token_ms / 1000, first_token_delay=0.02,
+                        prefill_delay_per_kb=args.prefill_ms_per_kb / 1000, parallel=parallel) as server:
+            ollama.base_url = server.url
+            config.current_config.update(ollama_host=server.url, map_reduce_parallel=parallel,
+                                         scheduler_max_per_model=parallel)
+            if not rows:
+                rows["one prompt (old)"] = run_worker(app, server, TextWorker(prompt=log), len(log))
+            rows[f"map-reduce, {parallel} at once"] = run_worker(app, server, MapReduceWorker(log), len(log))
+    print_table(f"{args.size_kb} KB log, {args.token_ms} ms/token, {args.prefill_ms_per_kb} ms prefill/KB", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Opening settings and looking up model metadata, with and without the model catalog.
+
+Against ``benchmarks.fake_ollama`` answering /api/tags and /api/show after
+``--metadata-ms`` (a busy or remote Ollama):
+
+* Opening the settings dialog.  Before, ``check_dependencies`` and
+  ``refresh_models`` each called ``ollama.list_models()`` on the GUI
+  thread; the ``before`` row times those two calls plus building the dialog.
+  With the catalog, the dialog is built from a snapshot and the list
+  arrives in the background.  Reported: time the GUI thread was blocked,
+  and the time until the combos hold the live list.
+* Context-length, vision and image-capability lookups for every model: the
+  first lookup per model before (one /api/show each, per process), and with
+  the catalog after a background refresh and after a restart (read from
+  ``model_catalog.json``).
+* Re-pulling one model: how long the next (background) refresh takes and
+  the /api/show requests it makes.
+
+    python -m benchmarks.model_catalog [--models 12] [--metadata-ms 150]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from ._common import offscreen_app, print_table, wait_until
+from .fake_ollama import FakeOllama
+
+
+def bench_settings(app, server: FakeOllama, catalog) -> dict:
+    from clipboard_ai.ollama_integration import ollama
+    from clipboard_ai.ui.settings_dialog import SettingsDialog
+
+    rows = {}
+    started = time.perf_counter()
+    ollama.list_models()  # check_dependencies
+    ollama.list_models()  # refresh_models
+    SettingsDialog().deleteLater()
+    blocked = time.perf_counter() - started
+    rows["before: list_models x2 on the GUI thread"] = {"gui_blocked_ms": blocked * 1000,
+                                                        "models_shown_ms": blocked * 1000}
+
+    for name, warm in (("catalog, first open", False), ("catalog, reopened", True)):
+        if not warm:
+            catalog.invalidate()
+        started = time.perf_counter()
+        dialog = SettingsDialog()
+        blocked = time.perf_counter() - started
+        wait_until(app, lambda: dialog.text_model_combo.count() >= len(server.models), timeout=30)
+        rows[name] = {"gui_blocked_ms": blocked * 1000, "models_shown_ms": (time.perf_counter() - started) * 1000}
+        dialog.deleteLater()
+        app.processEvents()
+    return rows
+
+
+def bench_lookups(app, server: FakeOllama, path: str) -> dict:
+    from clipboard_ai.model_catalog import ModelCatalog
+    from clipboard_ai.ollama_integration import ollama
+
+    def lookups(catalog) -> dict:
+        server.reset_counters()
+        started = time.perf_counter()
+        for name in server.models:
+            catalog.context_length(name)
+            catalog.vision_tile(name)
+            catalog.supports_images(name)
+        return {"total_ms": (time.perf_counter() - started) * 1000,
+                "show_requests": server.paths.get("/api/show", 0)}
+
+    rows = {}
+    server.reset_counters()
+    started = time.perf_counter()
+    for name in server.models:
+        ollama.get_model_info(name)
+    rows["before: /api/show per model"] = {"total_ms": (time.perf_counter() - started) * 1000,
+                                           "show_requests": server.paths.get("/api/show", 0)}
+
+    catalog = ModelCatalog(path)
+    catalog.refresh()
+    wait_until(app, lambda: catalog._refreshing is None, timeout=60)  # Cleared once saved
+    rows["catalog, after background refresh"] = lookups(catalog)
+    rows["catalog, after restart (from disk)"] = lookups(ModelCatalog(path))
+
+    server.repull(server.models[0])
+    server.reset_counters()
+    started = time.perf_counter()
+    catalog.refresh(force=True)
+    wait_until(app, lambda: catalog._refreshing is None, timeout=60)
+    rows["one model re-pulled, background refresh"] = {"total_ms": (time.perf_counter() - started) * 1000,
+                                                       "show_requests": server.paths.get("/api/show", 0)}
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, default=12)
+    parser.add_argument("--metadata-ms", type=float, default=150)
+    args = parser.parse_args()
+
+    app = offscreen_app()
+    from clipboard_ai.async_ollama import AsyncOllamaAPI
+    from clipboard_ai.config import config
+    from clipboard_ai.model_catalog import model_catalog
+    from clipboard_ai.ollama_integration import ollama
+
+    models = ["gemma3:latest"] + [f"model{i}:7b" for i in range(args.models - 1)]
+    config.current_config.update(selected_model=models[0], image_model=models[0])
+    directory = tempfile.mkdtemp(prefix="clipboard_ai_catalog_")
+    model_catalog.path = os.path.join(directory, "shared.json")
+    with FakeOllama(models=models, metadata_delay=args.metadata_ms / 1000) as server:
+        ollama.client.close()
+        ollama.client = AsyncOllamaAPI(server.url)
+        print_table(f"Opening settings, {args.models} models, Ollama answering in {args.metadata_ms:g} ms",
+                    bench_settings(app, server, model_catalog))
+        print_table(f"Context length, vision size and image support for {args.models} models",
+                    bench_lookups(app, server, os.path.join(directory, "lookups.json")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Spreading requests over several Ollama hosts, and failing over between them.
+
+Three ``benchmarks.fake_ollama`` servers, each serving one generation at a
+time, stand in for a shop's Ollama boxes: host A has the model in memory,
+host B has it on disk only (the first request pays ``--load-ms``), and host C
+does not have it at all.  A burst of concurrent chat requests is sent:
+
+* ``single host``: everything to A, as with one ``ollama_host``.
+* ``round robin``: requests rotate over the hosts, ignoring what each has.
+* ``balanced``: ``BalancedOllamaAPI`` picks the least-busy host that has the
+  model, preferring one with it loaded.
+
+Then, with all three hosts serving the model, requests run back to back
+while the host they are going to crashes mid-run and a replacement comes up
+on the same port; reported are failed requests, streams cut after they had
+started (these cannot be replayed) and how long after the restart the
+probes bring the host back.  Finally the cost of one probe round is measured.
+
+    python -m benchmarks.multi_host [--requests 24] [--tokens 80] [--token-ms 3] [--load-ms 1500]
+"""
+import argparse
+import itertools
+import threading
+import time
+
+from ._common import percentiles, print_table
+from .fake_ollama import FakeOllama
+
+MODEL = "gemma3:latest"
+MESSAGES = [{"role": "user", "content": "Summarise the copied text."}]
+
+
+def _burst(stream_chat, count: int) -> dict:
+    """Send count streamed chats at once from threads; time to first chunk and to done."""
+    first, done, errors = [], [], []
+    lock = threading.Lock()
+
+    def one(number: int):
+        started = time.perf_counter()
+        got_first = None
+        try:
+            for chunk in stream_chat(number):
+                if chunk.error:
+                    raise RuntimeError(chunk.error)
+                if got_first is None and chunk.text:
+                    got_first = time.perf_counter() - started
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        with lock:
+            first.append(got_first or 0.0)
+            done.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=one, args=(n,)) for n in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"first_p50_ms": percentiles(first).get("p50_ms", float("nan")),
+            "done_p95_ms": percentiles(done).get("p95_ms", float("nan")),
+            "wall_s": time.perf_counter() - started, "errors": len(errors)}
+
+
+def bench_routing(servers, count: int) -> dict:
+    from clipboard_ai.async_ollama import AsyncOllamaAPI, event_loop
+    from clipboard_ai.ollama_backends import BalancedOllamaAPI
+
+    def iterate(client, number):
+        return event_loop.iterate(client.chat_stream(MODEL, MESSAGES + [{"role": "user", "content": str(number)}]))
+
+    single = AsyncOllamaAPI(servers[0].url)
+    clients = [AsyncOllamaAPI(server.url) for server in servers]
+    rotation = itertools.cycle(clients)
+    balanced = BalancedOllamaAPI([server.url for server in servers])
+    setups = {
+        "single host": lambda n: iterate(single, n),
+        "round robin": lambda n: iterate(next(rotation), n),
+        "balanced": lambda n: iterate(balanced, n),
+    }
+    rows = {}
+    for name, stream_chat in setups.items():
+        for server in servers:
+            server.reset_counters()
+            server.loaded = {model for model in server.loaded if server is servers[0]}
+        row = _burst(stream_chat, count)
+        for label, server in zip("ABC", servers):
+            row[f"on_{label}"] = server.paths.get("/api/chat", 0)
+        rows[name] = row
+    for client in [single, balanced] + clients:
+        client.close()
+    return rows
+
+
+def bench_failover(args) -> dict:
+    from clipboard_ai.async_ollama import event_loop
+    from clipboard_ai.ollama_backends import BalancedOllamaAPI
+
+    options = dict(tokens=args.tokens, token_delay=args.token_ms / 1000, parallel=1)
+    servers = [FakeOllama(**options).start() for _ in range(3)]
+    balanced = BalancedOllamaAPI([server.url for server in servers])
+    counts = {"ok": 0, "failed": 0, "cut_mid_stream": 0}
+    victim = {}
+
+    def run_one():
+        started_stream = False
+        try:
+            for chunk in event_loop.iterate(balanced.chat_stream(MODEL, MESSAGES)):
+                started_stream = started_stream or bool(chunk.text)
+        except Exception:
+            counts["cut_mid_stream" if started_stream else "failed"] += 1
+            return
+        counts["ok"] += 1
+
+    def crash_and_replace():
+        time.sleep(0.5)
+        # The host the request in flight is on, or the one the next request goes to
+        backend = max(balanced.backends, key=lambda b: b.in_flight)
+        if not backend.in_flight:
+            backend = balanced.candidates(MODEL)[0]
+        index = balanced.backends.index(backend)
+        port = int(servers[index].url.rsplit(":", 1)[1])
+        servers[index].crash()
+        time.sleep(1.0)
+        servers[index] = FakeOllama(port=port, **options).start()
+        restarted_at = time.perf_counter()
+        while backend.healthy is False and time.perf_counter() - restarted_at < 10:
+            time.sleep(0.01)
+        victim["back_after_restart_s"] = time.perf_counter() - restarted_at
+
+    crasher = threading.Thread(target=crash_and_replace)
+    crasher.start()
+    deadline = time.perf_counter() + args.failover_s
+    while time.perf_counter() < deadline:
+        run_one()
+    crasher.join()
+    row = dict(counts, back_after_restart_s=victim["back_after_restart_s"],
+               host_status="/".join("up" if b.healthy else "down" for b in balanced.backends),
+               requests_per_host="/".join(str(b.requests) for b in balanced.backends))
+    balanced.close()
+    for server in servers:
+        server.stop()
+    return {"crash one host, restart after 1 s": row}
+
+
+def bench_probe(servers, rounds: int = 50) -> dict:
+    from clipboard_ai.async_ollama import event_loop
+    from clipboard_ai.ollama_backends import BalancedOllamaAPI
+
+    balanced = BalancedOllamaAPI([server.url for server in servers])
+    event_loop.run(balanced.probe_all())
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        event_loop.run(balanced.probe_all())
+        times.append(time.perf_counter() - started)
+    balanced.close()
+    return {f"{len(servers)} hosts": dict(percentiles(times), requests_per_round=2 * len(servers))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=24)
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--token-ms", type=float, default=3.0)
+    parser.add_argument("--load-ms", type=float, default=1500)
+    parser.add_argument("--failover-s", type=float, default=5.0)
+    args = parser.parse_args()
+
+    from clipboard_ai.config import config
+
+    config.current_config.update(ollama_probe_interval_s=1)
+    options = dict(tokens=args.tokens, token_delay=args.token_ms / 1000, parallel=1, load_delay=args.load_ms / 1000)
+    servers = [
+        FakeOllama(models=(MODEL,), **options).start(),
+        FakeOllama(models=(MODEL,), loaded=(), **options).start(),
+        FakeOllama(models=("llama3.2:latest",), **options).start(),
+    ]
+    try:
+        print_table(f"{args.requests} concurrent requests; A has the model loaded, B on disk "
+                    f"({args.load_ms:.0f} ms to load), C not at all", bench_routing(servers, args.requests))
+        print_table("Probe round (/api/tags and /api/ps on every host)", bench_probe(servers))
+    finally:
+        for server in servers:
+            server.stop()
+    print_table(f"Back-to-back requests for {args.failover_s:g} s over 3 hosts, probing every 1 s",
+                bench_failover(args))
+
+
+if __name__ == "__main__":
+    main()
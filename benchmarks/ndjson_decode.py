@@ -0,0 +1,170 @@
+"""Decoding cost of a streamed Ollama answer.
+
+Replays a recorded /api/chat response body (HTTP chunked framing around one
+NDJSON line per token) into a StreamReader in network-sized pieces; the
+feeding is included in every variant's time.  Legacy path: the per-frame ``readline``/``readexactly``
+reader, line splitting and ``json.loads`` per line with dict lookups, plus
+``+=`` accumulation.  New path: ``Response.iter_stream`` with NDJSONDecoder,
+on orjson when installed and on the standard library.
+
+Without ``--recording`` a 10k-token stream shaped like Ollama's output is
+synthesised; a real one can be captured with
+``curl --raw -sN localhost:11434/api/chat -d '{...}' > chat.raw``.
+
+    python -m benchmarks.ndjson_decode [--tokens 10000] [--recording chat.raw] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from ._common import print_table
+
+
+def synthesize(tokens: int) -> bytes:
+    rng = random.Random(tokens)
+    words = ["the", " model", " streams", " tokens", "\n", " quickly", " and", "```", "python", " def",
+             " return", " value", " clipboard", " analysis", " é", " 😀", "**", " 1.", " -", " \"quoted\""]
+    frames = []
+    for i in range(tokens):
+        line = json.dumps({
+            "model": "gemma3:latest",
+            "created_at": f"2025-03-01T12:00:{i // 1000 % 60:02d}.{i:09d}Z",
+            "message": {"role": "assistant", "content": rng.choice(words)},
+            "done": False,
+        }) + "\n"
+        frames.append(line.encode())
+    frames.append((json.dumps({
+        "model": "gemma3:latest", "created_at": "2025-03-01T12:01:00.000000000Z",
+        "message": {"role": "assistant", "content": ""}, "done_reason": "stop", "done": True,
+        "total_duration": 5_000_000_000, "load_duration": 20_000_000, "prompt_eval_count": 26,
+        "prompt_eval_duration": 130_000_000, "eval_count": tokens, "eval_duration": 4_800_000_000,
+    }) + "\n").encode())
+    return b"".join(b"%x\r\n%s\r\n" % (len(frame), frame) for frame in frames) + b"0\r\n\r\n"
+
+
+async def _feed(reader: asyncio.StreamReader, body: bytes, read_sizes):
+    """Hand the body to the reader piece by piece, like successive socket reads."""
+    position = 0
+    for size in read_sizes:
+        if position >= len(body):
+            break
+        reader.feed_data(body[position:position + size])
+        position += size
+        await asyncio.sleep(0)
+    if position < len(body):
+        reader.feed_data(body[position:])
+    reader.feed_eof()
+
+
+async def legacy(reader: asyncio.StreamReader):
+    """The decoder this replaces: a read per frame, split lines, json.loads, dict lookups."""
+    text, last = "", None
+    pending = b""
+    while True:
+        size = int(((await reader.readline()).split(b";", 1)[0].strip()) or b"0", 16)
+        if size == 0:
+            break
+        data = (await reader.readexactly(size + 2))[:-2]
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                chunk = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            text += chunk.get("message", {}).get("content", "")
+            last = chunk
+    return text, last.get("eval_count")
+
+
+async def decoder(reader: asyncio.StreamReader):
+    from clipboard_ai.async_ollama import Response
+
+    class _Pool:
+        def _release(self, connection, reuse):
+            pass
+
+    class _Connection:
+        pass
+
+    connection = _Connection()
+    connection.reader = reader
+    response = Response(_Pool(), connection, 200, "OK", {"transfer-encoding": "chunked"})
+    parts, last = [], None
+    async for chunk in response.iter_stream():
+        if chunk.text:
+            parts.append(chunk.text)
+        last = chunk
+    return "".join(parts), last.stats.get("eval_count")
+
+
+def measure(body: bytes, run, read_sizes, repeat: int):
+    async def once():
+        reader = asyncio.StreamReader(limit=1 << 20)
+        started = time.perf_counter()
+        result, _ = await asyncio.gather(run(reader), _feed(reader, body, read_sizes))
+        return time.perf_counter() - started, result
+
+    times, result = [], None
+    for _ in range(repeat):
+        seconds, result = asyncio.run(once())
+        times.append(seconds)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10000)
+    parser.add_argument("--recording", help="Raw chunked response body to replay instead of a synthetic one")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from clipboard_ai import ndjson
+
+    if args.recording:
+        with open(args.recording, "rb") as f:
+            body = f.read()
+    else:
+        body = synthesize(args.tokens)
+    tokens = body.count(b'"done"')
+
+    rng = random.Random(7)
+    patterns = {
+        "one frame per read": None,  # Set below from the frame boundaries
+        "bursty reads (64 B - 16 KB)": [rng.choice((64, 512, 4096, 16384)) for _ in range(len(body) // 64 + 1)],
+        "all buffered (decode cost only)": [len(body)],
+    }
+    frame_sizes, position = [], 0
+    while position < len(body):
+        line_end = body.index(b"\r\n", position)
+        size = int(body[position:line_end], 16)
+        frame_sizes.append(line_end + 2 + size + 2 - position)
+        position = line_end + 4 + size
+    patterns["one frame per read"] = frame_sizes
+
+    orjson_module = ndjson.orjson
+    for name, read_sizes in patterns.items():
+        rows = {}
+        expected = None
+        variants = [("legacy readline + json.loads", legacy, None)]
+        if orjson_module is not None:
+            variants.append(("NDJSONDecoder (orjson)", decoder, orjson_module))
+        variants.append(("NDJSONDecoder (json)", decoder, None))
+        for label, run, backend in variants:
+            ndjson.orjson = backend
+            seconds, result = measure(body, run, read_sizes, args.repeat)
+            if expected is None:
+                expected = result
+            elif result != expected:
+                raise RuntimeError(f"{label} decoded a different answer")
+            rows[label] = {"total_ms": seconds * 1000, "us_per_token": seconds * 1e6 / tokens}
+        ndjson.orjson = orjson_module
+        print_table(f"{tokens} tokens, {len(body) // 1024} KB body, {name}", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""End-to-end overhead of the app against a local fake Ollama, no GPU needed.
+
+Starts ``benchmarks.fake_ollama`` and drives the real code paths on the
+offscreen Qt platform through scripted scenarios:
+
+* ``api``: ``OllamaAPI.chat`` streams, one after another
+* ``text``: a burst of ``TextWorker`` jobs on the ``WorkerPool``
+* ``image``: ``ImageWorker`` jobs for distinct screenshots (encode + upload)
+* ``monitor``: ``ClipboardMonitor`` in auto mode reacting to scripted copies
+  of text and images, from the clipboard change to the finished answer
+
+Every scenario reports latency percentiles (time to first streamed text and
+to the final result), wall and CPU time, peak RSS growth, peak thread count
+and how many signals reached the GUI thread.  Because the server's token rate
+is fixed, changes in these numbers are changes in the app's own overhead.
+``--json`` writes the results for comparing runs.
+
+    python -m benchmarks.offline_suite [--scenarios api,text,image,monitor] [--requests 50]
+        [--tokens 100] [--token-ms 2] [--json results.json]
+"""
+import argparse
+import json
+import random
+import time
+
+from ._common import (ResourceSampler, SignalCounter, offscreen_app, percentiles, print_table,
+                      private_model_catalog, wait_until)
+from .fake_ollama import FakeOllama
+
+SCENARIOS = ("api", "text", "image", "monitor")
+
+
+def _latency(prefix: str, samples) -> dict:
+    stats = percentiles(samples)
+    return {f"{prefix}_{key}": stats[key] for key in ("p50_ms", "p95_ms", "p99_ms") if key in stats}
+
+
+def _make_image(side: int, seed: int):
+    """A screenshot-like image that differs enough from every other seed to miss the image cache."""
+    from PyQt6.QtGui import QColor, QImage, QPainter
+
+    rng = random.Random(seed)
+    image = QImage(side, side * 3 // 4, QImage.Format.Format_RGB32)
+    image.fill(QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    painter = QPainter(image)
+    for _ in range(40):
+        painter.fillRect(rng.randrange(side), rng.randrange(side), rng.randrange(8, side // 3),
+                         rng.randrange(8, side // 6), QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    painter.end()
+    return image
+
+
+class _Timings:
+    """Submit-to-first-chunk and submit-to-result times of one scenario."""
+
+    def __init__(self):
+        self.first = []
+        self.total = []
+        self.done = 0
+
+    def track(self, chunk_signal, result_signal, started: float):
+        state = {"first": None}
+
+        def on_chunk(_text):
+            if state["first"] is None:
+                state["first"] = time.perf_counter()
+                self.first.append(state["first"] - started)
+
+        def on_result(*_args):
+            self.total.append(time.perf_counter() - started)
+            self.done += 1
+
+        chunk_signal.connect(on_chunk)
+        result_signal.connect(on_result)
+
+    def results(self) -> dict:
+        return {**_latency("first", self.first), **_latency("result", self.total)}
+
+
+def run_api(app, server: FakeOllama, requests: int) -> dict:
+    from clipboard_ai.ollama_integration import ollama
+
+    first, total = [], []
+    with ResourceSampler() as sampler:
+        for i in range(requests):
+            started = time.perf_counter()
+            seen = None
+            for chunk in ollama.chat("gemma3:latest", [{"role": "user", "content": f"question {i}"}]):
+                if seen is None and chunk.text:
+                    seen = time.perf_counter()
+                    first.append(seen - started)
+            total.append(time.perf_counter() - started)
+    return {**_latency("first", first), **_latency("result", total), **sampler.results()}
+
+
+def run_text(app, server: FakeOllama, requests: int) -> dict:
+    from clipboard_ai.text_worker import TextWorker
+    from clipboard_ai.worker_pool import WorkerPool
+
+    pool = WorkerPool()
+    timings, signals = _Timings(), SignalCounter()
+    with ResourceSampler() as sampler:
+        for i in range(requests):
+            worker = TextWorker(prompt=f"Summarise clipboard text number {i}.")
+            timings.track(worker.stream_chunk, worker.result_ready, time.perf_counter())
+            signals.watch("stream_chunk", worker.stream_chunk)
+            worker.error.connect(lambda err: print(f"TextWorker error: {err}"))
+            worker.error.connect(lambda _err: setattr(timings, "done", timings.done + 1))
+            pool.submit(worker)
+        wait_until(app, lambda: timings.done >= requests, timeout=300)
+    pool.shutdown()
+    return {**timings.results(), **sampler.results(), **signals.results()}
+
+
+def run_image(app, server: FakeOllama, requests: int, side: int) -> dict:
+    from clipboard_ai.image_cache import image_cache
+    from clipboard_ai.image_worker import ImageWorker
+    from clipboard_ai.worker_pool import WorkerPool
+
+    image_cache.clear()
+    images = [_make_image(side, seed) for seed in range(requests)]
+    pool = WorkerPool(max_workers=1)
+    timings, signals = _Timings(), SignalCounter()
+    server.reset_counters()
+    with ResourceSampler() as sampler:
+        for image in images:
+            worker = ImageWorker(image)
+            done = timings.done
+            timings.track(worker.stream_chunk, worker.response_ready, time.perf_counter())
+            signals.watch("stream_chunk", worker.stream_chunk)
+            signals.watch("progress", worker.progress)
+            worker.error.connect(lambda err: print(f"ImageWorker error: {err}"))
+            pool.submit(worker)
+            # One screenshot at a time, as the user copies them
+            wait_until(app, lambda: timings.done > done, timeout=60)
+    pool.shutdown()
+    return {**timings.results(), **sampler.results(), **signals.results(),
+            "upload_kb_per_image": server.bytes_received / 1024 / max(1, requests)}
+
+
+def run_monitor(app, server: FakeOllama, requests: int, side: int) -> dict:
+    from PyQt6.QtCore import QMimeData
+    from clipboard_ai.clipboard_monitor import ClipboardMonitor
+    from clipboard_ai.config import config
+    from clipboard_ai.image_cache import image_cache
+
+    image_cache.clear()
+    config.current_config["processing_mode"] = "auto"
+    clipboard = app.clipboard()
+    monitor = ClipboardMonitor(clipboard)
+    # What the app does after the user confirms the image dialog
+    monitor.image_detected.connect(lambda image: monitor.process_image(image))
+    signals = SignalCounter()
+    for name in ("stream_received", "content_processed", "processing_started", "image_progress",
+                 "image_processed_signal", "error_occurred"):
+        signals.watch(name, getattr(monitor, name))
+    monitor.error_occurred.connect(lambda err: print(f"ClipboardMonitor error: {err}"))
+
+    state = {"started": 0.0, "first": None, "done": False}
+    first, total = {"text": [], "image": []}, {"text": [], "image": []}
+
+    def on_stream(_text):
+        if state["first"] is None:
+            state["first"] = time.perf_counter() - state["started"]
+
+    def on_processed(_result):
+        state["done"] = True
+
+    monitor.stream_received.connect(on_stream)
+    monitor.content_processed.connect(on_processed)
+
+    with ResourceSampler() as sampler:
+        for i in range(requests):
+            kind = "image" if i % 4 == 3 else "text"
+            mime = QMimeData()
+            if kind == "image":
+                mime.setImageData(_make_image(side, 10_000 + i))
+            else:
+                mime.setText(f"Copied paragraph {i}: " + "lorem ipsum dolor sit amet " * 20)
+            state.update(started=time.perf_counter(), first=None, done=False)
+            clipboard.setMimeData(mime)
+            if wait_until(app, lambda: state["done"], timeout=60):
+                total[kind].append(time.perf_counter() - state["started"])
+                if state["first"] is not None:
+                    first[kind].append(state["first"])
+            # Let late batches and the image dialog signal drain before the next copy
+            wait_until(app, lambda: not monitor.processing_lock, timeout=5)
+    monitor.shutdown()
+    return {
+        **_latency("text_first", first["text"]), **_latency("text_result", total["text"]),
+        **_latency("image_first", first["image"]), **_latency("image_result", total["image"]),
+        **sampler.results(), **signals.results(),
+        "debounce_ms": monitor.watcher.debounce_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens per answer")
+    parser.add_argument("--token-ms", type=float, default=2.0, help="Server time per token")
+    parser.add_argument("--first-token-ms", type=float, default=20.0, help="Server prefill time before the first token")
+    parser.add_argument("--prefill-ms-per-kb", type=float, default=0.0, help="Extra prefill per KB of request body")
+    parser.add_argument("--parallel", type=int, default=1, help="Generations the server runs at once")
+    parser.add_argument("--image-side", type=int, default=1600)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    app = offscreen_app()
+    from clipboard_ai.config import config
+    from clipboard_ai.ollama_integration import ollama
+
+    # Measure the request path, not the response cache; nothing here is saved to disk
+    config.current_config["response_cache_enabled"] = False
+    config.current_config["history_enabled"] = False
+    private_model_catalog()
+
+    results = {}
+    with FakeOllama(tokens=args.tokens, token_delay=args.token_ms / 1000,
+                    first_token_delay=args.first_token_ms / 1000,
+                    prefill_delay_per_kb=args.prefill_ms_per_kb / 1000, parallel=args.parallel) as server:
+        ollama.base_url = server.url
+        config.current_config["ollama_host"] = server.url
+        for name in scenarios:
+            if name == "api":
+                row = run_api(app, server, args.requests)
+            elif name == "text":
+                row = run_text(app, server, args.requests)
+            elif name == "image":
+                row = run_image(app, server, max(1, args.requests // 5), args.image_side)
+            else:
+                row = run_monitor(app, server, args.requests, args.image_side // 2)
+            results[name] = row
+            print_table(f"{name}: {args.tokens} tokens at {args.token_ms} ms", {name: row})
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
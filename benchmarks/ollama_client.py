@@ -0,0 +1,127 @@
+"""Connection reuse and per-request overhead of the Ollama client.
+
+Legacy path: ``requests.post`` per call, as ``OllamaAPI.chat``/``generate``
+used to do, which opens a new TCP connection every time.  New path: the
+``OllamaAPI`` wrappers over ``AsyncOllamaAPI`` and its keep-alive pool, plus
+the same streams driven as coroutines on the shared loop without a thread per
+request.  Runs against ``benchmarks.fake_ollama`` on localhost; thread counts
+include the stub server's thread per open connection.
+
+    python -m benchmarks.ollama_client [--requests 200] [--concurrent 8]
+"""
+import argparse
+import base64
+import os
+import threading
+import time
+
+from ._common import percentiles, print_table
+from .fake_ollama import FakeOllama
+
+MODEL = "gemma3:latest"  # Listed by the fake server
+MESSAGES = [{"role": "user", "content": "Describe this screenshot."}]
+
+
+def _legacy_chat(url: str, payload: dict):
+    import json
+    import requests
+
+    response = requests.post(f"{url}/api/chat", json=payload, stream=True)
+    response.raise_for_status()
+    chunks = [json.loads(line) for line in response.iter_lines() if line]
+    response.close()
+    return chunks
+
+
+def sequential(server: FakeOllama, requests_count: int, image: bytes, legacy: bool):
+    from clipboard_ai.ollama_integration import ollama
+
+    server.reset_counters()
+    messages = [dict(MESSAGES[0], images=[image])] if image else MESSAGES
+    latencies = []
+    for _ in range(requests_count):
+        started = time.perf_counter()
+        if legacy:
+            _legacy_chat(server.url, {"model": MODEL, "messages": [dict(m, images=[i.decode() for i in m.get("images", [])])
+                                                                   for m in messages]})
+        else:
+            list(ollama.chat(MODEL, messages))
+        latencies.append(time.perf_counter() - started)
+    return {"connections": server.connections, **percentiles(latencies)}
+
+
+def concurrent(server: FakeOllama, streams: int, mode: str):
+    from clipboard_ai.async_ollama import event_loop
+    from clipboard_ai.ollama_integration import ollama
+
+    server.reset_counters()
+    threads_before = threading.active_count()
+    peak = {"threads": threads_before}
+    started = time.perf_counter()
+    if mode == "asyncio":
+        import asyncio
+
+        async def drain():
+            return [chunk async for chunk in ollama.client.chat_stream(MODEL, MESSAGES)]
+
+        async def gather():
+            peak["threads"] = max(peak["threads"], threading.active_count())
+            return await asyncio.gather(*(drain() for _ in range(streams)))
+
+        results = event_loop.run(gather())
+    else:
+        results = []
+
+        def job():
+            if mode == "legacy":
+                results.append(_legacy_chat(server.url, {"model": MODEL, "messages": MESSAGES}))
+            else:
+                results.append(list(ollama.chat(MODEL, MESSAGES)))
+            peak["threads"] = max(peak["threads"], threading.active_count())
+
+        workers = [threading.Thread(target=job) for _ in range(streams)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    elapsed = time.perf_counter() - started
+    if len(results) != streams or any(len(chunks) != server.tokens + 1 for chunks in results):
+        raise RuntimeError("A stream came back incomplete")
+    return {
+        "connections": server.connections,
+        "extra_threads": peak["threads"] - threads_before,
+        "wall_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrent", type=int, default=8)
+    parser.add_argument("--image-kb", type=int, default=300, help="Size of the base64 image in the image scenario")
+    parser.add_argument("--tokens", type=int, default=20)
+    args = parser.parse_args()
+
+    from clipboard_ai.ollama_integration import ollama
+
+    image = base64.b64encode(os.urandom(args.image_kb * 768))
+    with FakeOllama(tokens=args.tokens) as server:
+        ollama.base_url = server.url
+        list(ollama.chat(MODEL, MESSAGES))  # Start the loop thread before timing
+
+        for name, payload in (("text", b""), (f"{args.image_kb} KB image", image)):
+            print_table(f"{args.requests} sequential chat requests, {name}", {
+                "requests.post per call": sequential(server, args.requests, payload, legacy=True),
+                "keep-alive pool": sequential(server, args.requests, payload, legacy=False),
+            })
+
+        server.token_delay = 0.005
+        print_table(f"{args.concurrent} concurrent streams of {args.tokens} tokens", {
+            "thread + requests.post": concurrent(server, args.concurrent, "legacy"),
+            "thread + OllamaAPI wrapper": concurrent(server, args.concurrent, "wrapper"),
+            "coroutines on the loop": concurrent(server, args.concurrent, "asyncio"),
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Hotkey presses while Ollama is down, hung or flaky: timeouts, retries and the circuit breaker.
+
+Each "press" is a streamed chat request made the way the workers make it
+(``ollama.chat(stream=True)`` on a worker thread).  Against
+``benchmarks.fake_ollama``:
+
+* ``hung``: the server accepts connections but never answers, like an
+  Ollama that is starting up.  Before, a press blocked its worker until
+  Ollama answered; this is shown by the ``no timeouts`` row, which gives up
+  waiting after ``--give-up-s``.  With the policy the first presses fail
+  after the first-token timeout and, once the circuit opens, the rest fail
+  at once.
+* ``down``: nothing listens on the port; presses fail at once either way,
+  and the breaker stops them from reaching the network.
+* ``flaky``: two of every three /api/tags requests answer 503.  Listing
+  models (the settings dialog) with and without retries.
+* ``recovery``: the server comes back while the circuit is open; reported
+  is how long until a press succeeds again.
+
+    python -m benchmarks.request_policy [--presses 8] [--first-token-s 2] [--reset-s 3]
+"""
+import argparse
+import threading
+import time
+
+from ._common import percentiles, print_table
+from .fake_ollama import FakeOllama
+
+MESSAGES = [{"role": "user", "content": "Explain the copied text."}]
+
+
+def fresh_client(url: str):
+    """Point ``ollama`` at url with a new client, so a new circuit breaker."""
+    from clipboard_ai.async_ollama import AsyncOllamaAPI
+    from clipboard_ai.ollama_integration import ollama
+
+    ollama.client.close()
+    ollama.client = AsyncOllamaAPI(url)
+
+
+def press(give_up_s: float) -> tuple:
+    """One streamed chat on a worker thread: (seconds until it returned or was abandoned, outcome)."""
+    from clipboard_ai.ollama_integration import ollama
+
+    outcome = {}
+
+    def work():
+        try:
+            for _ in ollama.chat(model="gemma3:latest", messages=MESSAGES, stream=True):
+                pass
+            outcome["result"] = "ok"
+        except Exception as e:
+            outcome["result"] = type(e).__name__
+
+    started = time.perf_counter()
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    thread.join(give_up_s)
+    elapsed = time.perf_counter() - started
+    return elapsed, outcome.get("result", f"still blocked after {give_up_s:g} s")
+
+
+def presses(count: int, give_up_s: float) -> dict:
+    times, outcomes = [], {}
+    for _ in range(count):
+        elapsed, outcome = press(give_up_s)
+        times.append(elapsed)
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    stats = percentiles(times)
+    return {"first_s": times[0], "p50_ms": stats["p50_ms"], "max_ms": stats["max_ms"],
+            "worker_s_total": sum(times), "outcomes": ", ".join(f"{k} x{v}" for k, v in outcomes.items())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--presses", type=int, default=8)
+    parser.add_argument("--first-token-s", type=float, default=2.0)
+    parser.add_argument("--reset-s", type=float, default=3.0)
+    parser.add_argument("--give-up-s", type=float, default=10.0)
+    args = parser.parse_args()
+
+    from clipboard_ai.config import config
+    from clipboard_ai.ollama_integration import ollama
+
+    policy = dict(ollama_first_token_timeout_s=args.first_token_s, ollama_connect_timeout_s=2,
+                  circuit_breaker_failures=3, circuit_breaker_reset_s=args.reset_s,
+                  request_retry_attempts=3, request_retry_base_s=0.1)
+    unbounded = dict(policy, ollama_first_token_timeout_s=1e9, circuit_breaker_failures=10 ** 9)
+
+    rows = {}
+    with FakeOllama(tokens=20) as server:
+        server.stalled.set()
+        for name, settings in (("hung, no timeouts", unbounded), ("hung, policy", policy)):
+            config.current_config.update(settings)
+            fresh_client(server.url)
+            rows[name] = presses(2 if settings is unbounded else args.presses, args.give_up_s)
+        server.stalled.clear()
+
+    config.current_config.update(policy)
+    fresh_client(server.url)  # The server is gone now: connections are refused
+    rows["down, policy"] = presses(args.presses, args.give_up_s)
+    print_table(f"{args.presses} presses; first-token timeout {args.first_token_s:g} s, "
+                f"circuit opens after 3 failures for {args.reset_s:g} s", rows)
+
+    rows = {}
+    with FakeOllama() as server:
+        for name, attempts in (("flaky, no retries", 1), ("flaky, 3 attempts", 3)):
+            config.current_config.update(request_retry_attempts=attempts, circuit_breaker_failures=10 ** 9)
+            ok = 0
+            started = time.perf_counter()
+            for _ in range(30):
+                fresh_client(server.url)
+                server.fail_statuses[:] = [503, 503]
+                ok += bool(ollama.list_models())
+            rows[name] = {"model_lists_ok": f"{ok}/30", "mean_ms": (time.perf_counter() - started) / 30 * 1000}
+    print_table("Listing models, two of every three requests answered 503", rows)
+
+    config.current_config.update(policy)
+    with FakeOllama(tokens=20) as server:
+        fresh_client(server.url)
+        server.stalled.set()
+        presses(3, args.give_up_s)  # Opens the circuit
+        server.stalled.clear()
+        back = time.perf_counter()
+        attempts = 0
+        while True:
+            attempts += 1
+            _, outcome = press(args.give_up_s)
+            if outcome == "ok":
+                break
+            time.sleep(0.1)
+        print_table("Recovery", {"server back, circuit open": {
+            "first_success_after_s": time.perf_counter() - back, "presses": attempts}})
+
+
+if __name__ == "__main__":
+    main()
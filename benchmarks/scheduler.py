@@ -0,0 +1,140 @@
+"""Auto mode under rapid copies, with and without the request scheduler.
+
+Against ``benchmarks.fake_ollama`` serving one generation at a time (like a
+single local Ollama), a burst of clipboard copies in auto mode (background
+text requests, one per copy) overlaps with requests the user is waiting
+for (interactive, e.g. notes on an image).
+
+* ``pool only``: what ClipboardMonitor did before.  Each copy cancels the
+  previous auto request and every request goes straight to the WorkerPool,
+  so auto and interactive generations are sent to Ollama together and
+  queue there, in no particular order.
+* ``scheduler``: ``RequestScheduler`` with one generation per model.
+  Queued auto requests are replaced by newer copies, and interactive
+  requests go first.
+
+Reported: time to first text of the interactive requests, time from the
+last copy to its answer, generations Ollama started and had cut off, the
+peak number of generations in flight at the server, and the scheduler's
+queue metrics.
+
+    python -m benchmarks.scheduler [--copies 12] [--copy-ms 150] [--tokens 150] [--token-ms 5]
+"""
+import argparse
+import time
+
+from ._common import offscreen_app, percentiles, print_table, private_model_catalog, pump, wait_until
+from .fake_ollama import FakeOllama
+
+MODEL = "gemma3:latest"
+
+
+class _Tracker:
+    def __init__(self):
+        self.first = {}
+        self.done = {}
+
+    def watch(self, name: str, worker, started: float):
+        def on_chunk(_text):
+            self.first.setdefault(name, time.perf_counter() - started)
+
+        def on_done(*_args):
+            self.done[name] = time.perf_counter() - started
+
+        worker.stream_chunk.connect(on_chunk)
+        worker.result_ready.connect(on_done)
+
+
+def run(app, server: FakeOllama, use_scheduler: bool, copies: int, copy_ms: float, interactive_at) -> dict:
+    from clipboard_ai.metrics import metrics
+    from clipboard_ai.request_scheduler import BACKGROUND, INTERACTIVE, RequestScheduler
+    from clipboard_ai.text_worker import TextWorker
+    from clipboard_ai.worker_pool import WorkerPool
+
+    metrics.clear()
+    server.reset_counters()
+    pool = WorkerPool(max_workers=2)
+    scheduler = RequestScheduler(pool, max_per_model=1) if use_scheduler else None
+    tracker = _Tracker()
+    auto = {"worker": None, "job": None}
+    events = sorted([(i * copy_ms / 1000, "copy", i) for i in range(copies)]
+                    + [(at, "interactive", n) for n, at in enumerate(interactive_at)])
+    started = time.perf_counter()
+    last_copy_at = None
+    for at, kind, number in events:
+        wait_until(app, lambda: time.perf_counter() - started >= at, timeout=60)
+        now = time.perf_counter()
+        if kind == "copy":
+            worker = TextWorker(prompt=f"Copied paragraph {number}: " + "lorem ipsum " * 40)
+            tracker.watch(f"auto{number}", worker, now)
+            last_copy_at = now
+            if scheduler is not None:
+                job = scheduler.submit(worker, MODEL, BACKGROUND, key=number, slot="auto")
+            else:
+                pool.cancel(auto["job"])
+                job = pool.submit(worker)
+            if auto["worker"] is not None:
+                auto["worker"].cancel()
+            auto.update(worker=worker, job=job)
+        else:
+            worker = TextWorker(prompt=f"Question {number} about the screenshot")
+            tracker.watch(f"user{number}", worker, now)
+            if scheduler is not None:
+                scheduler.submit(worker, MODEL, INTERACTIVE)
+            else:
+                pool.submit(worker)
+    last = f"auto{copies - 1}"
+    wanted = [last] + [f"user{n}" for n in range(len(interactive_at))]
+    wait_until(app, lambda: all(name in tracker.done for name in wanted), timeout=300)
+    pump(app, 0.2)
+    pool.shutdown()
+
+    interactive = [tracker.first[name] for name in wanted[1:] if name in tracker.first]
+    row = {
+        "interactive_first_p50_ms": percentiles(interactive)["p50_ms"],
+        "interactive_first_max_ms": max(interactive) * 1000 if interactive else float("nan"),
+        "last_copy_answer_ms": tracker.done.get(last, float("nan")) * 1000,
+        "generations": server.paths.get("/api/chat", 0),
+        "cut_off": server.aborted,
+        "peak_in_flight": server.peak_active,
+    }
+    if scheduler is not None:
+        queue = metrics.queue_summary()
+        row.update(replaced=queue.get("replaced", 0), max_queued=queue["max_depth"],
+                   background_wait_p95_ms=(queue.get("background_wait_p95_s") or 0) * 1000,
+                   interactive_wait_p95_ms=(queue.get("interactive_wait_p95_s") or 0) * 1000)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=12)
+    parser.add_argument("--copy-ms", type=float, default=150)
+    parser.add_argument("--tokens", type=int, default=150)
+    parser.add_argument("--token-ms", type=float, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = offscreen_app()
+    from clipboard_ai.config import config
+    from clipboard_ai.ollama_integration import ollama
+
+    config.current_config.update(response_cache_enabled=False, semantic_cache_enabled=False,
+                                 history_enabled=False, selected_model=MODEL)
+    private_model_catalog()
+    span = args.copies * args.copy_ms / 1000
+    interactive_at = [span * 0.25, span * 0.6, span * 0.9]
+    with FakeOllama(tokens=args.tokens, token_delay=args.token_ms / 1000, first_token_delay=0.03,
+                    parallel=1) as server:
+        ollama.base_url = server.url
+        config.current_config["ollama_host"] = server.url
+        for attempt in range(args.repeat):
+            print_table(f"Run {attempt + 1}: {args.copies} copies every {args.copy_ms:.0f} ms, "
+                        f"{len(interactive_at)} interactive requests, answers of {args.tokens} tokens", {
+                            "pool only": run(app, server, False, args.copies, args.copy_ms, interactive_at),
+                            "scheduler": run(app, server, True, args.copies, args.copy_ms, interactive_at),
+                        })
+
+
+if __name__ == "__main__":
+    main()
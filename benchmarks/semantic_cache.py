@@ -0,0 +1,188 @@
+"""Lookup latency of the semantic cache's vector index at 10k, 100k and 1M vectors.
+
+Index: ``VectorIndex`` is filled with random unit vectors (768 dimensions by
+default, the size of nomic-embed-text) and queried with near-duplicates of
+stored vectors and with unrelated ones.  Reported per size: cosine top-1 and
+top-5 search, top-1 limited to one scope (group), and inserting and evicting
+a single vector.  At the smallest size a plain Python loop over the same
+vectors is timed as the non-vectorized baseline.
+
+End to end: ``SemanticCache`` with the embedding round trip to
+``benchmarks.fake_ollama``, for reworded and unrelated prompts.
+
+    python -m benchmarks.semantic_cache [--sizes 10000,100000,1000000] [--dim 768] [--queries 200]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from ._common import percentiles, print_table
+from .fake_ollama import FakeOllama
+
+FILL_CHUNK = 50_000
+
+
+def _unit(rows: np.ndarray) -> np.ndarray:
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def build_index(size: int, dim: int, groups: int, seed: int = 1):
+    from clipboard_ai.semantic_cache import VectorIndex
+
+    rng = np.random.default_rng(seed)
+    index = VectorIndex(dim, capacity=size + 1)
+    started = time.perf_counter()
+    for start in range(0, size, FILL_CHUNK):
+        count = min(FILL_CHUNK, size - start)
+        keys = np.arange(start, start + count)
+        index.add_many(keys, _unit(rng.standard_normal((count, dim), dtype=np.float32)), keys % groups)
+    return index, time.perf_counter() - started
+
+
+def _queries(index, count: int, seed: int = 2):
+    """Half near-duplicates of stored vectors (cosine about 0.97), half random."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for i in range(count):
+        if i % 2 == 0:
+            stored = index._matrix[rng.integers(index.size)]
+            noise = rng.standard_normal(index.dim, dtype=np.float32) / np.sqrt(index.dim)
+            vector = stored + 0.25 * noise
+        else:
+            vector = rng.standard_normal(index.dim, dtype=np.float32)
+        queries.append((vector / np.linalg.norm(vector)).astype(np.float32))
+    return queries
+
+
+def _time(calls) -> list:
+    samples = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_index(size: int, dim: int, queries: int, groups: int) -> dict:
+    index, fill_s = build_index(size, dim, groups)
+    vectors = _queries(index, queries)
+    threshold_hits = sum(index.search(v, 1)[0][1] >= 0.95 for v in vectors)
+    rows = {
+        "top-1": percentiles(_time(lambda v=v: index.search(v, 1) for v in vectors)),
+        "top-5": percentiles(_time(lambda v=v: index.search(v, 5) for v in vectors)),
+        f"top-1, 1 of {groups} scopes": percentiles(_time(lambda v=v: index.search(v, 1, group=0) for v in vectors)),
+    }
+    # Insert then evict, as a full cache does on every new answer
+    rng = np.random.default_rng(5)
+    fresh = _unit(rng.standard_normal((queries, dim), dtype=np.float32))
+    rows["insert + evict"] = percentiles(_time(
+        lambda i=i: (index.add(size + i, fresh[i], 0), index.remove(i)) for i in range(queries)
+    ))
+    for row in rows.values():
+        row.pop("max_ms", None)
+    summary = {"fill_s": fill_s, "matrix_mb": index._matrix.nbytes / 1024 / 1024,
+               "near_duplicates_over_0.95": f"{threshold_hits}/{queries}"}
+    return rows, summary, index, vectors
+
+
+def bench_python_loop(index, vectors, repeat: int = 5) -> dict:
+    """Cosine search with a Python loop over lists, the non-vectorized baseline."""
+    stored = index._matrix[:index.size].tolist()
+    queries = [vector.tolist() for vector in vectors[:repeat]]
+
+    def search(query):
+        best, best_score = -1, -2.0
+        for row, candidate in enumerate(stored):
+            score = sum(a * b for a, b in zip(candidate, query))
+            if score > best_score:
+                best, best_score = row, score
+        return best, best_score
+
+    row = percentiles(_time(lambda q=q: search(q) for q in queries))
+    row.pop("max_ms", None)
+    return row
+
+
+def _reword(rng: random.Random, words: list) -> str:
+    words = list(words)
+    for _ in range(max(1, len(words) // 25)):
+        words[rng.randrange(len(words))] = rng.choice(("the", "this", "that", "a", "some"))
+    return " ".join(words)
+
+
+def bench_end_to_end(entries: int, queries: int) -> dict:
+    from clipboard_ai.config import config
+    from clipboard_ai.ollama_integration import ollama
+    from clipboard_ai.semantic_cache import SemanticCache
+
+    vocabulary = [f"w{i}" for i in range(5000)]
+    rng = random.Random(7)
+    prompts = [[rng.choice(vocabulary) for _ in range(120)] for _ in range(entries)]
+    config.current_config.update(semantic_cache_enabled=True, semantic_cache_threshold=0.95)
+    with tempfile.TemporaryDirectory() as directory, FakeOllama() as server:
+        ollama.base_url = server.url
+        cache = SemanticCache(os.path.join(directory, "semantic.sqlite3"), max_entries=entries)
+        batch = 256
+        for start in range(0, entries, batch):
+            texts = [" ".join(words) for words in prompts[start:start + batch]]
+            for text, vector in zip(texts, ollama.embed(cache.embedding_model, texts)):
+                cache.put("gemma3:latest", text, np.asarray(vector, dtype=np.float32), f"answer {start}")
+        cache.close()
+
+        # A fresh instance, as after a restart: the first lookup loads the index from disk
+        cache = SemanticCache(os.path.join(directory, "semantic.sqlite3"), max_entries=entries)
+        started = time.perf_counter()
+        cache.lookup("gemma3:latest", cache.embed("warm up"))
+        load_s = time.perf_counter() - started
+
+        rows = {}
+        for name, make in (("reworded prompt", lambda: _reword(rng, rng.choice(prompts))),
+                           ("unrelated prompt", lambda: " ".join(rng.choice(vocabulary) for _ in range(120)))):
+            texts = [make() for _ in range(queries)]
+            hits = 0
+            embed_s, lookup_s = [], []
+            for text in texts:
+                started = time.perf_counter()
+                vector = cache.embed(text)
+                embedded = time.perf_counter()
+                hits += cache.lookup("gemma3:latest", vector) is not None
+                embed_s.append(embedded - started)
+                lookup_s.append(time.perf_counter() - embedded)
+            rows[name] = {"embed_p50_ms": percentiles(embed_s)["p50_ms"],
+                          "lookup_p50_ms": percentiles(lookup_s)["p50_ms"],
+                          "lookup_p95_ms": percentiles(lookup_s)["p95_ms"],
+                          "hit_rate": hits / len(texts)}
+        cache.close()
+    return rows, load_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=4, help="Scopes (chat models) the vectors are spread over")
+    parser.add_argument("--entries", type=int, default=2000, help="Cache entries for the end-to-end run")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    for position, size in enumerate(sizes):
+        rows, summary, index, vectors = bench_index(size, args.dim, args.queries, args.groups)
+        if position == 0:
+            rows["python loop, top-1"] = bench_python_loop(index, vectors)
+        print_table(f"{size} vectors x {args.dim}", rows)
+        print("  " + ", ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                               for key, value in summary.items()))
+        del index, vectors
+
+    rows, load_s = bench_end_to_end(args.entries, max(10, args.queries // 4))
+    print_table(f"SemanticCache against the fake server, {args.entries} entries "
+                f"(index loaded from disk in {load_s * 1000:.0f} ms)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Start-up cost: import time and time until the tray is up.
+
+Each run is a fresh interpreter on the offscreen Qt platform.  Legacy path:
+what ``ClipboardAI.init_components`` used to do, importing every UI and
+worker module up front, blocking on the Ollama status check (and exiting
+when it fails), then building the chat window, the tray, the clipboard
+monitor and the hotkeys.  New path: ``ClipboardAI()`` with ``fast_start``,
+which shows the tray and hotkeys first and builds the rest on the first
+pass of the event loop, checking Ollama in the background.
+
+Reported per scenario (medians over ``--repeat`` runs):
+``process_ms`` from spawning the interpreter until the tray is up,
+``import_ms`` for the application imports, ``tray_ms`` from the start of
+the script until the tray is up, ``monitor_ms`` until clipboard monitoring
+runs and ``ollama_ms`` until the first health result.  Ollama is
+``benchmarks.fake_ollama``, or a closed port for the "down" scenario.
+
+    python -m benchmarks.startup [--repeat 5]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ._common import print_table
+from .fake_ollama import FakeOllama
+
+_LEGACY = r"""
+import json, os, sys, time
+started = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from clipboard_ai.ui.tray import SystemTray
+from clipboard_ai.ui.settings_dialog import SettingsDialog
+from clipboard_ai.ui.metrics_dialog import MetricsDialog
+from clipboard_ai.ui.floating_dialog import FloatingDialog
+from clipboard_ai.clipboard_monitor import ClipboardMonitor
+from clipboard_ai.hotkey_manager import HotkeyManager
+from clipboard_ai.ollama_integration import ollama
+from clipboard_ai.model_residency import ModelResidencyManager
+from clipboard_ai.ui.notes_dialog import NotesDialog
+from clipboard_ai.ui.image_dialog import ImageDialog
+import keyboard
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+if not ollama.check_ollama_status():
+    print(json.dumps({"import_ms": (imported - started) * 1000, "exit": True}))
+    sys.exit(1)
+checked = time.perf_counter()
+model_manager = ModelResidencyManager()
+dialog = FloatingDialog()
+dialog.hide()
+tray = SystemTray(app)
+tray_ready = time.perf_counter()
+monitor = ClipboardMonitor(app.clipboard())
+for hotkey in ("ctrl+shift+u", "ctrl+shift+.", "ctrl+shift+o"):
+    HotkeyManager().register_hotkey(lambda: None, hotkey)
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "tray_ms": (tray_ready - started) * 1000,
+    "monitor_ms": (ready - started) * 1000,
+    "ollama_ms": (checked - started) * 1000,
+    "wall_clock": time.time() - (ready - tray_ready),
+}))
+"""
+
+_FAST = r"""
+import json, os, sys, time
+started = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from clipboard_ai.main import ClipboardAI
+imported = time.perf_counter()
+ai = ClipboardAI()
+tray_ready = time.perf_counter()
+wall_clock = time.time()
+monitor_at = ollama_at = None
+status = []
+deadline = time.perf_counter() + 20
+while time.perf_counter() < deadline:
+    ai.app.processEvents()
+    if monitor_at is None and ai.clipboard_monitor is not None:
+        monitor_at = time.perf_counter()
+        ai.health_monitor.status_changed.connect(status.append)
+    if monitor_at is not None and ai.health_monitor.available is not None:
+        ollama_at = time.perf_counter()
+        break
+    time.sleep(0.0005)
+ai.cleanup()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "tray_ms": (tray_ready - started) * 1000,
+    "monitor_ms": (monitor_at - started) * 1000 if monitor_at else None,
+    "ollama_ms": (ollama_at - started) * 1000 if ollama_at else None,
+    "ollama_up": ai.health_monitor.available,
+    "wall_clock": wall_clock,
+}))
+"""
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _run(script: str, host: str) -> dict:
+    catalog = os.path.join(tempfile.mkdtemp(prefix="clipboard_ai_bench_"), "model_catalog.json")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", CLIPBOARD_AI_BENCH_HOST=host,
+               CLIPBOARD_AI_BENCH_CATALOG=catalog)
+    # Point the app at the test server without touching the user's saved config
+    prelude = ("from clipboard_ai.config import config\n"
+               "config.current_config['ollama_host'] = os.environ['CLIPBOARD_AI_BENCH_HOST']\n"
+               "config.current_config['model_warmup_enabled'] = False\n"
+               "from clipboard_ai.model_catalog import model_catalog\n"
+               "model_catalog.path = os.environ['CLIPBOARD_AI_BENCH_CATALOG']\n")
+    body = script.replace("started = time.perf_counter()\n", "started = time.perf_counter()\n" + prelude, 1)
+    spawned = time.time()
+    proc = subprocess.run([sys.executable, "-c", body], env=env, capture_output=True, text=True, timeout=60)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"start-up run failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(lines[-1])
+    wall_clock = result.pop("wall_clock", None)
+    if wall_clock is not None:
+        result["process_ms"] = (wall_clock - spawned) * 1000
+    return result
+
+
+def _median(runs):
+    row = {}
+    for key in ("process_ms", "import_ms", "tray_ms", "monitor_ms", "ollama_ms"):
+        values = [run[key] for run in runs if run.get(key) is not None]
+        if values:
+            row[key] = statistics.median(values)
+    if any(run.get("exit") for run in runs):
+        row["exits"] = "yes"
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with FakeOllama() as server:
+        scenarios = {"Ollama up": server.url, "Ollama down": f"http://127.0.0.1:{_closed_port()}"}
+        for name, host in scenarios.items():
+            print_table(f"Start-up, {name}", {
+                "legacy eager start": _median([_run(_LEGACY, host) for _ in range(args.repeat)]),
+                "fast_start": _median([_run(_FAST, host) for _ in range(args.repeat)]),
+            })
+
+
+if __name__ == "__main__":
+    main()
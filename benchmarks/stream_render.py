@@ -0,0 +1,146 @@
+"""UI-thread time spent rendering a streamed answer.
+
+Tokens are delivered to the UI thread by a timer, as the worker signals would
+deliver them.  Legacy path: read the QLabel text back, concatenate, setText,
+processEvents and scroll for every token.  New path:
+``FloatingDialog.update_streaming`` with the frame-rate-limited
+StreamRenderer appending to the chat model.  The main thread's CPU time
+(including layout and painting) is reported per 1,000 tokens.
+
+    python -m benchmarks.stream_render [--tokens 500 1000 2000] [--token-ms 2]
+"""
+import argparse
+import random
+import time
+
+from ._common import offscreen_app, print_table, pump
+
+
+def _tokens(count: int):
+    rng = random.Random(count)
+    words = ["the", "model", "streams", "tokens", "quickly", "and", "each", "one", "is", "short",
+             "def", "return", "value", "```", "python", "clipboard", "analysis", "-", "1.", "**bold**"]
+    out = []
+    for i in range(count):
+        word = rng.choice(words)
+        out.append(("\n" if i and rng.random() < 0.06 else " ") + word)
+    return out
+
+
+class _LegacyDialog:
+    """The previous update_streaming: QLabel.setText with the whole text per token."""
+
+    def __init__(self):
+        from PyQt6.QtCore import Qt
+        from PyQt6.QtWidgets import QLabel, QScrollArea
+
+        self.scroll = QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        self.scroll.resize(760, 520)
+        self.label = QLabel()
+        self.label.setWordWrap(True)
+        self.label.setTextFormat(Qt.TextFormat.PlainText)
+        self.scroll.setWidget(self.label)
+        self.scroll.show()
+
+    def update_streaming(self, text: str):
+        from PyQt6.QtWidgets import QApplication
+        self.label.setText(self.label.text() + text)
+        QApplication.processEvents()
+        scrollbar = self.scroll.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def rendered(self) -> str:
+        return self.label.text()
+
+    def close(self):
+        self.scroll.close()
+        self.scroll.deleteLater()
+
+
+class _NewDialog:
+    def __init__(self):
+        from clipboard_ai.ui.floating_dialog import FloatingDialog
+
+        self.dialog = FloatingDialog()
+        self.dialog.show()
+
+    def update_streaming(self, text: str):
+        self.dialog.update_streaming(text)
+
+    def rendered(self) -> str:
+        message = self.dialog.current_assistant_message
+        return message.text() if message else ""
+
+    def close(self):
+        self.dialog.stream_renderer.reset()
+        self.dialog.hide()
+        self.dialog.deleteLater()
+
+
+def run(app, factory, tokens, token_ms: float):
+    from PyQt6.QtCore import QEventLoop, QTimer
+
+    target = factory()
+    pump(app, 0.2)  # Let the window settle before measuring
+    expected = "".join(tokens)
+    queue = list(tokens)
+    slot_times = []
+
+    def deliver():
+        if not queue:
+            timer.stop()
+            # Give the last frame time to flush and paint, then stop
+            QTimer.singleShot(100, loop.quit)
+            return
+        started = time.perf_counter()
+        target.update_streaming(queue.pop(0))
+        slot_times.append(time.perf_counter() - started)
+
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.setInterval(max(0, int(token_ms)))
+    timer.timeout.connect(deliver)
+
+    cpu_start, wall_start = time.thread_time(), time.perf_counter()
+    timer.start()
+    loop.exec()
+    # The 100 ms tail is idle time, so it does not count towards CPU
+    cpu = time.thread_time() - cpu_start
+    wall = time.perf_counter() - wall_start - 0.1
+    if target.rendered().strip() != expected.strip():
+        raise RuntimeError("Rendered text does not match the streamed tokens")
+    target.close()
+    pump(app, 0.05)
+
+    slot_times.sort()
+    return {
+        "ui_cpu_ms": cpu * 1000,
+        "cpu_ms_per_1k_tok": cpu * 1000 * 1000 / len(tokens),
+        "slot_p95_ms": slot_times[int(0.95 * (len(slot_times) - 1))] * 1000,
+        "slot_max_ms": slot_times[-1] * 1000,
+        "wall_s": wall,
+        "ideal_wall_s": len(tokens) * token_ms / 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--token-ms", type=float, default=2, help="Interval between delivered tokens")
+    args = parser.parse_args()
+
+    app = offscreen_app()
+    from clipboard_ai.ui.floating_dialog import FloatingDialog  # noqa: F401 - import before timing
+
+    for count in args.tokens:
+        tokens = _tokens(count)
+        results = {
+            "legacy QLabel.setText": run(app, _LegacyDialog, tokens, args.token_ms),
+            "StreamRenderer @30Hz": run(app, _NewDialog, tokens, args.token_ms),
+        }
+        print_table(f"{count} tokens, one every {args.token_ms:g} ms", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Cross-thread signals and GUI event-loop latency while an answer streams.
+
+A TextWorker runs on the WorkerPool against an in-process fake of
+``ollama.chat`` and its chunks are shown by ``FloatingDialog.update_streaming``
+through ``ClipboardMonitor.stream_received``-style wiring.  Legacy path: one
+``stream_chunk`` emit per token, relayed by a Python slot (batching disabled).
+New path: ``ChunkBatcher`` with the configured interval, connected signal to
+signal.  A probe posts a zero-delay timer every 5 ms from the GUI thread and
+records how long it waits behind the queued stream events.
+
+    python -m benchmarks.stream_signals [--tokens 2000] [--token-ms 0 1 5]
+"""
+import argparse
+import time
+
+from ._common import offscreen_app, percentiles, print_table
+
+
+def _install_fake_ollama(tokens: int, token_delay: float):
+    from clipboard_ai.config import config
+    from clipboard_ai.context_manager import context_manager
+    from clipboard_ai.ndjson import StreamChunk
+    from clipboard_ai.ollama_integration import ollama
+
+    config.current_config["response_cache_enabled"] = False
+    config.current_config["history_enabled"] = False
+
+    def chat(model, messages, *args, **kwargs):
+        for i in range(tokens):
+            if token_delay:
+                time.sleep(token_delay)
+            yield StreamChunk(f" tok{i}")
+
+    ollama.chat = chat
+    # Not through ollama.get_model_info: the model catalog would save the stub to the user's config
+    context_manager.context_length = lambda model: 8192
+
+
+def run(app, batch_ms: int, legacy: bool):
+    from PyQt6.QtCore import QEventLoop, QObject, QTimer, pyqtSignal
+    from clipboard_ai.config import config
+    from clipboard_ai.text_worker import TextWorker
+    from clipboard_ai.ui.floating_dialog import FloatingDialog
+    from clipboard_ai.worker_pool import WorkerPool
+
+    class Relay(QObject):
+        stream_received = pyqtSignal(str)
+
+    config.current_config["stream_batch_ms"] = batch_ms
+    dialog = FloatingDialog()
+    dialog.show()
+    relay = Relay()
+    pool = WorkerPool(max_workers=1)
+    state = {"deliveries": 0, "result": "", "elapsed": 0.0}
+    probe_waits = []
+
+    def on_chunk(text):
+        state["deliveries"] += 1
+        dialog.update_streaming(text)
+
+    def on_result(result):
+        state["result"] = result
+        state["elapsed"] = time.perf_counter() - started
+        prober.stop()
+        # Let the renderer paint the last frame, then stop
+        QTimer.singleShot(100, loop.quit)
+
+    def probe():
+        posted = time.perf_counter()
+        QTimer.singleShot(0, lambda: probe_waits.append(time.perf_counter() - posted))
+
+    relay.stream_received.connect(on_chunk)
+    worker = TextWorker(prompt="benchmark")
+    if legacy:
+        # The old ClipboardMonitor._handle_stream slot
+        worker.stream_chunk.connect(lambda text: relay.stream_received.emit(text))
+    else:
+        worker.stream_chunk.connect(relay.stream_received)
+    worker.result_ready.connect(on_result)
+
+    loop = QEventLoop()
+    prober = QTimer()
+    prober.timeout.connect(probe)
+    prober.start(5)
+    cpu_start, started = time.thread_time(), time.perf_counter()
+    pool.submit(worker)
+    loop.exec()
+    cpu = time.thread_time() - cpu_start
+
+    rendered = dialog.current_assistant_message.text().strip() if dialog.current_assistant_message else ""
+    if rendered != state["result"]:
+        raise RuntimeError("Rendered text does not match the streamed answer")
+    dialog.stream_renderer.reset()
+    dialog.hide()
+    dialog.deleteLater()
+    pool.shutdown()
+
+    waits = percentiles(probe_waits)
+    return {
+        "signals": state["deliveries"],
+        "gui_cpu_ms": cpu * 1000,
+        "probe_p50_ms": waits.get("p50_ms", 0.0),
+        "probe_p99_ms": waits.get("p99_ms", 0.0),
+        "probe_max_ms": waits.get("max_ms", 0.0),
+        "wall_s": state["elapsed"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--token-ms", type=float, nargs="+", default=[0, 1, 5],
+                        help="Delay between fake tokens (0 = as fast as the worker can emit)")
+    parser.add_argument("--batch-ms", type=int, default=33)
+    args = parser.parse_args()
+
+    app = offscreen_app()
+    from clipboard_ai.ui.floating_dialog import FloatingDialog  # noqa: F401 - import before timing
+
+    for token_ms in args.token_ms:
+        _install_fake_ollama(args.tokens, token_ms / 1000)
+        results = {
+            "per-token emit": run(app, 0, legacy=True),
+            f"ChunkBatcher {args.batch_ms} ms": run(app, args.batch_ms, legacy=False),
+        }
+        print_table(f"{args.tokens} tokens, one every {token_ms:g} ms", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Stress test: hundreds of clipboard requests through TextWorker.
+
+Compares the legacy "new QThread per request" wiring with ``WorkerPool`` and
+records peak OS thread count, peak RSS growth and submit-to-result latency.
+Ollama is replaced by an in-process generator that yields tokens at a fixed
+rate and, like a local Ollama server, only serves ``--server-slots``
+generations at a time, so only the app's own threading overhead differs.
+
+    python -m benchmarks.worker_pool [--requests 300] [--tokens 20]
+"""
+import argparse
+import threading
+import time
+
+from ._common import offscreen_app, os_threads, percentiles, print_table, proc_status, wait_until
+
+
+def _install_fake_ollama(tokens: int, token_delay: float, slots: int):
+    from clipboard_ai import text_worker
+    from clipboard_ai.config import config
+    from clipboard_ai.context_manager import context_manager
+    from clipboard_ai.ndjson import StreamChunk
+
+    # Every prompt is unique, but keep the cache out of the measurement anyway
+    config.current_config["response_cache_enabled"] = False
+    config.current_config["history_enabled"] = False  # Keep benchmark runs out of the user's history
+
+    server_slots = threading.Semaphore(slots)
+
+    def chat(model, messages, *args, **kwargs):
+        with server_slots:
+            for i in range(tokens):
+                time.sleep(token_delay)
+                yield StreamChunk(f"tok{i} ")
+
+    text_worker.ollama.chat = chat
+    # Prompt budgeting asks the model catalog, which would ask a real Ollama
+    context_manager.context_length = lambda model: 8192
+
+
+def _sample_threads(app, state):
+    state["peak_threads"] = max(state["peak_threads"], os_threads())
+    state["peak_rss_kb"] = max(state["peak_rss_kb"], proc_status("VmRSS"))
+
+
+def run_legacy(app, requests: int):
+    from PyQt6.QtCore import QThread, QTimer
+    from clipboard_ai.text_worker import TextWorker
+
+    state = {"done": 0, "peak_threads": os_threads(), "peak_rss_kb": proc_status("VmRSS")}
+    rss_start = state["peak_rss_kb"]
+    latencies = []
+    keep_alive = []  # Without this the overwritten QThread is destroyed while running
+    sampler = QTimer()
+    sampler.timeout.connect(lambda: _sample_threads(app, state))
+    sampler.start(5)
+
+    started = time.perf_counter()
+    for i in range(requests):
+        submitted = time.perf_counter()
+        thread = QThread()
+        worker = TextWorker(prompt=f"legacy {i}")
+        worker.moveToThread(thread)
+        thread.started.connect(worker.process)
+
+        def on_result(_result, submitted=submitted):
+            latencies.append(time.perf_counter() - submitted)
+            state["done"] += 1
+
+        worker.result_ready.connect(on_result)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
+        keep_alive.append((thread, worker))
+        app.processEvents()
+    wait_until(app, lambda: state["done"] >= requests, timeout=120)
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+    return {
+        "wall_s": elapsed,
+        "peak_threads": state["peak_threads"],
+        "rss_growth_mb": (state["peak_rss_kb"] - rss_start) / 1024,
+        **percentiles(latencies),
+    }
+
+
+def run_pool(app, requests: int, workers: int):
+    from PyQt6.QtCore import QTimer
+    from clipboard_ai.text_worker import TextWorker
+    from clipboard_ai.worker_pool import WorkerPool
+
+    pool = WorkerPool(max_workers=workers)
+    state = {"done": 0, "peak_threads": os_threads(), "peak_rss_kb": proc_status("VmRSS")}
+    rss_start = state["peak_rss_kb"]
+    latencies = []
+    sampler = QTimer()
+    sampler.timeout.connect(lambda: _sample_threads(app, state))
+    sampler.start(5)
+
+    started = time.perf_counter()
+    for i in range(requests):
+        submitted = time.perf_counter()
+        worker = TextWorker(prompt=f"pool {i}")
+
+        def on_result(_result, submitted=submitted):
+            latencies.append(time.perf_counter() - submitted)
+            state["done"] += 1
+
+        worker.result_ready.connect(on_result)
+        pool.submit(worker)
+        app.processEvents()
+    wait_until(app, lambda: state["done"] >= requests, timeout=120)
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+    pool.shutdown()
+    return {
+        "wall_s": elapsed,
+        "peak_threads": state["peak_threads"],
+        "rss_growth_mb": (state["peak_rss_kb"] - rss_start) / 1024,
+        **percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--token-delay", type=float, default=0.001, help="Seconds per fake token")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--server-slots", type=int, default=2, help="Parallel generations the fake server allows")
+    args = parser.parse_args()
+
+    app = offscreen_app()
+    _install_fake_ollama(args.tokens, args.token_delay, args.server_slots)
+    results = {
+        "QThread per request": run_legacy(app, args.requests),
+        f"WorkerPool ({args.workers} threads)": run_pool(app, args.requests, args.workers),
+    }
+    print_table(f"{args.requests} requests x {args.tokens} tokens", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,698 @@
+# clipboard_ai/async_ollama.py
+import asyncio
+import concurrent.futures
+import json
+import queue
+import ssl
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+from .config import config
+from .cancellation import CancellationToken
+from .metrics import RequestTimer
+from . import ndjson
+from .ndjson import NDJSONDecoder, StreamChunk
+from .ollama_policy import (RETRYABLE_STATUSES, CircuitBreaker, OllamaConnectionError, OllamaError,
+                            OllamaStreamError, OllamaTimeoutError, backoff_delay, is_retryable, retry_attempts,
+                            timeouts)
+
+# Errors that mean no usable HTTP response came back
+TRANSPORT_ERRORS = (OSError, EOFError, asyncio.TimeoutError)
+
+
+class HTTPStatusError(OllamaError):
+    """Ollama answered with an error status."""
+
+    def __init__(self, status: int, reason: str, body: str = ""):
+        super().__init__(f"{status} {reason}" + (f": {body[:300]}" if body else ""))
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+async def _within(awaitable: Awaitable, timeout: Optional[float], phase: str, message: str):
+    """Await with an optional timeout, raising OllamaTimeoutError for the given phase."""
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise OllamaTimeoutError(f"{message} within {timeout:g} s", phase) from None
+
+
+def default_keep_alive() -> int:
+    """keep_alive (seconds) sent with every request, -1 keeps the model loaded."""
+    idle = config.get("model_idle_unload_s", 900)
+    return int(idle) if idle and idle > 0 else -1
+
+
+def encode_body(payload: Dict[str, Any]) -> bytes:
+    """Serialise a request payload to JSON bytes.
+
+    Values given as bytes (base64-encoded images) are spliced into the body
+    verbatim instead of being decoded, escaped and re-encoded by json.dumps.
+    """
+    marker = uuid.uuid4().hex
+    blobs = []
+
+    def extract(value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            blobs.append(value)
+            return f"{marker}:{len(blobs) - 1}"
+        if isinstance(value, dict):
+            return {key: extract(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [extract(item) for item in value]
+        return value
+
+    body = json.dumps(extract(payload)).encode("utf-8")
+    if not blobs:
+        return body
+
+    parts = []
+    position = 0
+    for index, blob in enumerate(blobs):
+        placeholder = f'"{marker}:{index}"'.encode("ascii")
+        start = body.index(placeholder, position)
+        parts.extend((body[position:start], b'"', blob, b'"'))
+        position = start + len(placeholder)
+    parts.append(body[position:])
+    return b"".join(parts)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def usable(self) -> bool:
+        return not self.reader.at_eof() and not self.writer.is_closing()
+
+    def close(self):
+        self.writer.close()
+
+
+class Response:
+    """An HTTP/1.1 response whose body is read incrementally.
+
+    The connection goes back to the pool once the body has been read to the
+    end; closing the response early drops the connection instead, which also
+    tells Ollama to stop generating.
+    """
+
+    READ_SIZE = 1 << 16
+
+    def __init__(self, pool: "ConnectionPool", connection: _Connection, status: int, reason: str,
+                 headers: Dict[str, str], timeout: Optional[float] = None):
+        self.pool = pool
+        self.connection = connection
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.timeout = timeout
+        self._chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        length = headers.get("content-length")
+        self._remaining = int(length) if length is not None and not self._chunked else None
+        self._reusable = headers.get("connection", "").lower() != "close"
+        self._raw = bytearray()
+        self._done = False
+        # Filled in by the pool: waiting for a connection slot, and opening the socket
+        self.queue_wait = 0.0
+        self.connect_time = 0.0
+        self.reused = False
+        if status in (204, 304):
+            self._finish()
+
+    async def _read(self, awaitable: Awaitable):
+        return await _within(awaitable, self.timeout, "read", "Ollama sent no more data")
+
+    async def read_chunk(self) -> bytes:
+        """Next piece of the body, b"" once it has been read completely."""
+        pieces = await self._read_pieces()
+        return pieces[0] if len(pieces) == 1 else b"".join(pieces)
+
+    async def _read_pieces(self) -> List[bytes]:
+        """Body data received so far (one piece per chunk when chunked), [] at the end."""
+        if self._done:
+            return []
+        reader = self.connection.reader
+        try:
+            if self._chunked:
+                return await self._read_chunked()
+            if self._remaining is not None:
+                if self._remaining == 0:
+                    self._finish()
+                    return []
+                data = await self._read(reader.read(min(self._remaining, self.READ_SIZE)))
+                if not data:
+                    raise EOFError("Connection closed in the middle of the response")
+                self._remaining -= len(data)
+                return [data]
+            # No length given: the body ends when the server closes the connection
+            data = await self._read(reader.read(self.READ_SIZE))
+            if not data:
+                self._reusable = False
+                self._finish()
+                return []
+            return [data]
+        except BaseException:
+            self.close()
+            raise
+
+    async def _read_chunked(self) -> List[bytes]:
+        """Payloads of every complete chunk received so far, reading more only when there is none.
+
+        The socket is read in large blocks and the chunk framing is parsed out
+        of one buffer, so a burst of streamed lines costs one read instead of
+        two per line.
+        """
+        raw = self._raw
+        while True:
+            pieces = []
+            position = 0
+            while True:
+                line_end = raw.find(b"\r\n", position)
+                if line_end < 0:
+                    break
+                size = int(raw[position:line_end].split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Last chunk, then optional trailers and a blank line
+                    end = raw.find(b"\r\n\r\n", line_end)
+                    if end < 0:
+                        break
+                    if len(raw) > end + 4:
+                        self._reusable = False  # Bytes past the body: do not trust this connection
+                    raw.clear()
+                    self._finish()
+                    return pieces
+                frame_end = line_end + 2 + size
+                if len(raw) < frame_end + 2:
+                    break
+                pieces.append(raw[line_end + 2:frame_end])
+                position = frame_end + 2
+            if position:
+                del raw[:position]
+            if pieces:
+                return pieces
+            data = await self._read(self.connection.reader.read(self.READ_SIZE))
+            if not data:
+                raise EOFError("Connection closed in the middle of the response")
+            raw += data
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        while not self._done:
+            for data in await self._read_pieces():
+                if data:
+                    yield data
+
+    async def iter_stream(self) -> AsyncIterator[StreamChunk]:
+        """Decoded chunks of an NDJSON streaming body."""
+        decoder = NDJSONDecoder()
+        while not self._done:
+            # Ollama flushes one line per chunk, which the decoder parses in place
+            for data in await self._read_pieces():
+                for chunk in decoder.feed(data):
+                    yield chunk
+        for chunk in decoder.close():
+            yield chunk
+
+    async def read(self) -> bytes:
+        return b"".join([data async for data in self.iter_chunks()])
+
+    async def json(self) -> Any:
+        return ndjson.loads(await self.read())
+
+    async def raise_for_status(self):
+        if self.status >= 400:
+            body = (await self.read()).decode("utf-8", "replace")
+            raise HTTPStatusError(self.status, self.reason, body)
+
+    def close(self):
+        """Stop reading; an unfinished body means the connection cannot be reused."""
+        if not self._done:
+            self._reusable = False
+            self._finish()
+
+    def _finish(self):
+        self._done = True
+        self.pool._release(self.connection, self._reusable)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one server, used from the event loop thread only.
+
+    At most ``max_connections`` requests are in flight; further requests wait
+    for a connection to come back instead of opening new sockets.
+    """
+
+    def __init__(self, base_url: str, max_connections: int = 4, connect_timeout: float = 10.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.host_header = parts.netloc or self.host
+        self.base_path = parts.path.rstrip("/")
+        self.max_connections = max(1, max_connections)
+        self.connect_timeout = connect_timeout
+        self._idle: Deque[_Connection] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.opened = 0
+        self.reused = 0
+
+    async def _acquire(self) -> Tuple[_Connection, bool, float, float]:
+        """A connection, whether it was reused, and the seconds spent queueing and connecting."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        started = time.perf_counter()
+        await self._slots.acquire()
+        acquired = time.perf_counter()
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if connection.usable():
+                    self.reused += 1
+                    return connection, True, acquired - started, 0.0
+                connection.close()
+            reader, writer = await _within(asyncio.open_connection(self.host, self.port, ssl=self.ssl),
+                                           self.connect_timeout, "connect", "Could not connect to Ollama")
+            self.opened += 1
+            return _Connection(reader, writer), False, acquired - started, time.perf_counter() - acquired
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: _Connection, reuse: bool):
+        if reuse and connection.usable():
+            self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None,
+                      timeout: Optional[float] = None, first_byte_timeout: Optional[float] = None) -> Response:
+        """Send a request and return once the status line and headers are in.
+
+        first_byte_timeout bounds the wait for the status line (timeout if
+        not given); timeout bounds every later read.
+        """
+        head = [
+            f"{method} {self.base_path}{path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+        ]
+        if body is not None:
+            head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        request = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+
+        queue_wait = connect_time = 0.0
+        for attempt in range(2):
+            connection, reused, waited, connected = await self._acquire()
+            queue_wait += waited
+            connect_time += connected
+            try:
+                connection.writer.write(request)
+                if body:
+                    connection.writer.write(body)
+                await connection.writer.drain()
+                # Ollama sends headers with the first token, so this waits for model load too
+                status_line = await _within(connection.reader.readline(),
+                                            timeout if first_byte_timeout is None else first_byte_timeout,
+                                            "first_token", "Ollama did not start answering")
+                if not status_line:
+                    raise ConnectionResetError("Connection closed before the response")
+                _, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+                headers = {}
+                while True:
+                    line = await connection.reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                response = Response(self, connection, int(status), reason, headers, timeout)
+                response.queue_wait, response.connect_time, response.reused = queue_wait, connect_time, reused
+                return response
+            except (ConnectionError, EOFError):
+                self._release(connection, False)
+                if reused and attempt == 0:
+                    # The server dropped an idle keep-alive connection; retry on a new one
+                    continue
+                raise
+            except BaseException:
+                self._release(connection, False)
+                raise
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class EventLoopThread:
+    """A single asyncio event loop on a daemon thread, shared by all Ollama requests.
+
+    Worker threads (and the GUI thread) hand coroutines to it with ``run``,
+    ``submit`` or ``iterate``; none of them need an event loop of their own.
+    """
+
+    def __init__(self, name: str = "ollama-asyncio"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(target=self._run, args=(loop, ready), name=self.name, daemon=True)
+                thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block the calling thread until it finishes."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Request did not finish within {timeout} s")
+
+    def iterate(self, agen: AsyncIterator, cancel_token: Optional[CancellationToken] = None) -> Iterator:
+        """Consume an async generator from a regular thread as a plain generator.
+
+        Items are handed over through a queue as they arrive.  Cancelling the
+        token (or closing the returned generator) cancels the task on the loop,
+        which closes the HTTP response.
+        """
+        items: "queue.Queue[Tuple[bool, Any]]" = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put((False, item))
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                items.put((True, e))
+
+        future = self.submit(pump())
+        # Posted even if the task is cancelled before it starts
+        future.add_done_callback(lambda _: items.put((True, None)))
+        release = cancel_token.register(future.cancel) if cancel_token is not None else (lambda: None)
+        try:
+            while True:
+                finished, item = items.get()
+                if cancel_token is not None and cancel_token.cancelled:
+                    return
+                if finished:
+                    if item is not None:
+                        raise item
+                    return
+                yield item
+        finally:
+            release()
+            future.cancel()
+
+
+class AsyncOllamaAPI:
+    """asyncio client for the Ollama HTTP API over a pool of keep-alive connections.
+
+    Streaming calls are async generators of StreamChunks decoded from the
+    NDJSON body.  Every request is bounded by the timeouts in
+    ``ollama_policy.timeouts()`` and goes through this host's CircuitBreaker;
+    calls without side effects (listing, showing, embedding, loading) are
+    retried with jittered backoff.  Failures raise OllamaError subclasses.  All
+    methods must run on ``event_loop``; ``OllamaAPI`` wraps them for threads.
+    """
+
+    def __init__(self, base_url: str, max_connections: Optional[int] = None):
+        self.base_url = base_url.rstrip("/")
+        self.pool = ConnectionPool(self.base_url, max_connections or config.get("ollama_max_connections", 4),
+                                   connect_timeout=timeouts()["connect"])
+        self.breaker = CircuitBreaker(self.base_url)
+
+    def _unreachable(self, error: BaseException) -> OllamaError:
+        if isinstance(error, OllamaError):
+            return error
+        return OllamaConnectionError(f"Cannot reach Ollama at {self.base_url}: {error}")
+
+    async def _request(self, method: str, path: str, payload: Any = None, timeout: Optional[float] = None,
+                       first_byte_timeout: Optional[float] = None) -> Response:
+        body = None
+        if payload is not None:
+            body = payload if isinstance(payload, bytes) else encode_body(payload)
+        self.breaker.before_request()
+        try:
+            response = await self.pool.request(method, path, body, timeout, first_byte_timeout)
+        except TRANSPORT_ERRORS as e:
+            self.breaker.record_failure()
+            raise self._unreachable(e) from e
+        if response.status in RETRYABLE_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def _retrying(self, call: Callable[[], Awaitable], what: str) -> Any:
+        """Run an idempotent call, retrying failures that may pass."""
+        attempts = retry_attempts()
+        for attempt in range(attempts):
+            try:
+                return await call()
+            except OllamaError as e:
+                if attempt + 1 >= attempts or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"{what} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _json(self, method: str, path: str, payload: Any = None, timeout: Optional[float] = None) -> Any:
+        if timeout is None:
+            timeout = timeouts()["metadata"]
+        response = await self._request(method, path, payload, timeout)
+        try:
+            await response.raise_for_status()
+            return await response.json()
+        except TRANSPORT_ERRORS as e:
+            raise self._unreachable(e) from e
+        finally:
+            response.close()
+
+    @staticmethod
+    def _timer(path: str, payload: Dict[str, Any]) -> RequestTimer:
+        return RequestTimer(path.rsplit("/", 1)[-1], payload.get("model", ""))
+
+    async def _generation(self, path: str, payload: Dict[str, Any]) -> Any:
+        """A non-streaming generate/chat call, recorded in the metrics."""
+        timer = self._timer(path, payload)
+        status, error = "error", ""
+        limits = timeouts()
+        try:
+            # Nothing comes back until the whole answer is generated
+            response = await self._request("POST", path, payload, limits["read"], limits["request"])
+            timer.connected(response)
+            try:
+                await response.raise_for_status()
+                result = await response.json()
+            except TRANSPORT_ERRORS as e:
+                raise self._unreachable(e) from e
+            finally:
+                response.close()
+            if isinstance(result, dict) and result.get("error"):
+                raise OllamaStreamError(f"Ollama error: {result['error']}")
+            chunk = StreamChunk.from_json(result) if isinstance(result, dict) else None
+            if chunk is not None:
+                if chunk.text:
+                    timer.text()
+                timer.stats = chunk.stats
+            status = "ok"
+            return result
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            timer.finish(status, error)
+
+    async def _stream(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None
+                      ) -> AsyncIterator[StreamChunk]:
+        timer = self._timer(path, payload)
+        status, error = "error", ""
+        limits = timeouts()
+        try:
+            # Ollama sends the headers with the first token, after loading the model
+            response = await self._request("POST", path, payload, timeout or limits["read"], limits["first_token"])
+            timer.connected(response)
+            try:
+                await response.raise_for_status()
+                async for chunk in response.iter_stream():
+                    if chunk.error:
+                        raise OllamaStreamError(f"Ollama error: {chunk.error}")
+                    if chunk.text:
+                        timer.text()
+                    if chunk.done:
+                        timer.stats = chunk.stats
+                    yield chunk
+            except TRANSPORT_ERRORS as e:
+                # A stream that stalls or drops counts against the host as well
+                self.breaker.record_failure()
+                raise self._unreachable(e) from e
+            finally:
+                response.close()
+            status = "ok"
+        except (asyncio.CancelledError, GeneratorExit):
+            status = "cancelled"
+            raise
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            timer.finish(status, error)
+
+    async def probe(self, timeout: float = 5.0) -> Optional[List[Dict[str, Any]]]:
+        """The models /api/tags lists, or None if Ollama does not answer.
+
+        A health check: it bypasses the circuit breaker and is not retried,
+        and an answer closes the breaker.
+        """
+        try:
+            response = await self.pool.request("GET", "/api/tags", timeout=timeout)
+        except TRANSPORT_ERRORS:
+            return None
+        try:
+            body = await response.read()
+        except TRANSPORT_ERRORS:
+            body = b""
+        finally:
+            response.close()
+        if response.status != 200:
+            return None
+        self.breaker.record_success()
+        try:
+            return ndjson.loads(body).get("models", [])
+        except (ValueError, AttributeError):
+            return []
+
+    async def check_status(self, timeout: float = 5.0) -> bool:
+        return await self.probe(timeout) is not None
+
+    async def list_models(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        result = await self._retrying(lambda: self._json("GET", "/api/tags", timeout=timeout), "Listing models")
+        return result.get("models", [])
+
+    async def running_models(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        result = await self._retrying(lambda: self._json("GET", "/api/ps", timeout=timeout),
+                                      "Listing running models")
+        return result.get("models", [])
+
+    async def show(self, model: str) -> Dict[str, Any]:
+        return await self._retrying(lambda: self._json("POST", "/api/show", {"name": model}),
+                                    f"Showing {model}")
+
+    async def load_model(self, model: str, keep_alive: Optional[int] = None, options: dict = None) -> bool:
+        """Load a model (or refresh its keep_alive) without generating anything."""
+        payload = {
+            "model": model,
+            "stream": False,
+            "keep_alive": default_keep_alive() if keep_alive is None else keep_alive,
+            **({"options": options} if options else {})
+        }
+        timer = RequestTimer("load", model)
+        status, error = "error", ""
+        limits = timeouts()
+
+        async def attempt() -> Tuple[int, str, bytes]:
+            response = await self._request("POST", "/api/generate", payload, limits["read"], limits["request"])
+            timer.connected(response)
+            try:
+                body = await response.read()
+            except TRANSPORT_ERRORS as e:
+                raise self._unreachable(e) from e
+            finally:
+                response.close()
+            if response.status in RETRYABLE_STATUSES:
+                raise HTTPStatusError(response.status, response.reason, body.decode("utf-8", "replace"))
+            return response.status, response.reason, body
+
+        try:
+            code, reason, body = await self._retrying(attempt, f"Loading {model}")
+            if code == 200:
+                status = "ok"
+                try:
+                    timer.stats = StreamChunk.from_json(ndjson.loads(body)).stats
+                except (ValueError, AttributeError):
+                    pass
+            else:
+                error = f"{code} {reason}"
+            return code == 200
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            timer.finish(status, error)
+
+    async def embed(self, model: str, inputs: List[str], timeout: Optional[float] = 60) -> List[List[float]]:
+        """Embedding vectors for ``inputs``, in one request to /api/embed."""
+        return await self._retrying(lambda: self._embed(model, inputs, timeout), f"Embedding with {model}")
+
+    async def _embed(self, model: str, inputs: List[str], timeout: Optional[float]) -> List[List[float]]:
+        payload = {"model": model, "input": inputs, "keep_alive": default_keep_alive()}
+        try:
+            return (await self._json("POST", "/api/embed", payload, timeout)).get("embeddings", [])
+        except HTTPStatusError as e:
+            if e.status != 404:
+                raise
+        # Ollama before 0.3.4 only has /api/embeddings, one prompt per request
+        vectors = []
+        for text in inputs:
+            result = await self._json("POST", "/api/embeddings", {"model": model, "prompt": text}, timeout)
+            vectors.append(result.get("embedding", []))
+        return vectors
+
+    def _payload(self, model: str, options: Optional[dict], stream: bool, **fields) -> Dict[str, Any]:
+        payload = {"model": model, **fields, "stream": stream, "keep_alive": default_keep_alive()}
+        if options:
+            payload["options"] = options
+        return payload
+
+    async def generate(self, model: str, prompt: str, options: dict = None, **fields) -> Dict[str, Any]:
+        return await self._generation("/api/generate", self._payload(model, options, False, prompt=prompt, **fields))
+
+    def generate_stream(self, model: str, prompt: str, options: dict = None, timeout: Optional[float] = None,
+                        **fields) -> AsyncIterator[StreamChunk]:
+        return self._stream("/api/generate", self._payload(model, options, True, prompt=prompt, **fields), timeout)
+
+    async def chat(self, model: str, messages: List[Dict[str, Any]], options: dict = None) -> Dict[str, Any]:
+        return await self._generation("/api/chat", self._payload(model, options, False, messages=messages))
+
+    def chat_stream(self, model: str, messages: List[Dict[str, Any]], options: dict = None,
+                    timeout: Optional[float] = None) -> AsyncIterator[StreamChunk]:
+        return self._stream("/api/chat", self._payload(model, options, True, messages=messages), timeout)
+
+    def close(self):
+        event_loop.loop.call_soon_threadsafe(self.pool.close)
+
+
+# The one event loop all Ollama traffic runs on
+event_loop = EventLoopThread()
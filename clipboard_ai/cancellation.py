@@ -0,0 +1,51 @@
+# clipboard_ai/cancellation.py
+import threading
+from typing import Callable, List
+
+
+class CancellationToken:
+    """Thread-safe, cooperative cancellation flag.
+
+    Long-running calls check ``cancelled`` between steps and register callbacks
+    (for example closing an HTTP response) that run as soon as ``cancel()`` is
+    called from another thread.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Request cancellation and run registered callbacks once."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in cancellation callback: {e}")
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancel (immediately if already cancelled).
+
+        Returns a function that unregisters the callback.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return unregister
+        callback()
+        return lambda: None
@@ -0,0 +1,79 @@
+# clipboard_ai/chunking.py
+from typing import Iterator, List
+from .context_manager import estimate_tokens
+
+FENCES = ("```", "~~~")
+
+
+def blocks(text: str) -> Iterator[str]:
+    """Paragraphs and fenced code blocks, in order, each with its trailing blank lines.
+
+    Text without blank lines (a log file, say) comes out as a single block
+    and is cut at line boundaries by ``split_text``.
+    """
+    current: List[str] = []
+    fence = None
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if fence is None and stripped.startswith(FENCES):
+            # A code block starts: end the paragraph before it
+            if any(part.strip() for part in current):
+                yield "".join(current)
+                current = []
+            fence = stripped[:3]
+            current.append(line)
+        elif fence is not None:
+            current.append(line)
+            if stripped.startswith(fence):
+                fence = None
+                yield "".join(current)
+                current = []
+        elif not stripped:
+            current.append(line)
+            if any(part.strip() for part in current):
+                yield "".join(current)
+                current = []
+        else:
+            current.append(line)
+    if any(part.strip() for part in current):
+        yield "".join(current)
+
+
+def _pieces(block: str, max_tokens: int) -> Iterator[str]:
+    """The block, or its lines if it is too big, or slices of a line that is too big on its own."""
+    if estimate_tokens(block) <= max_tokens:
+        yield block
+        return
+    for line in block.splitlines(keepends=True):
+        tokens = estimate_tokens(line)
+        if tokens <= max_tokens:
+            yield line
+            continue
+        # Characters per token varies, so slice by the line's own ratio
+        step = max(1, len(line) * max_tokens // tokens)
+        for start in range(0, len(line), step):
+            yield line[start:start + step]
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Cut text into chunks of at most about max_tokens, on the largest structure that fits.
+
+    Whole paragraphs and code blocks are packed together first; a block that
+    does not fit in a chunk of its own is cut between lines, and a single
+    overlong line between characters.
+    """
+    max_tokens = max(1, max_tokens)
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for block in blocks(text):
+        for piece in _pieces(block, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and used + tokens > max_tokens:
+                chunks.append("".join(current).strip("\n"))
+                current, used = [], 0
+            current.append(piece)
+            used += tokens
+    if current:
+        chunks.append("".join(current).strip("\n"))
+    return [chunk for chunk in chunks if chunk.strip()]
@@ -2,16 +2,18 @@
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer, QThread, Qt
 from PyQt6.QtGui import QClipboard, QImage
 from PyQt6.QtWidgets import QApplication
-import pyperclip
-import io
-import base64
 from typing import Optional, Generator
 from .config import config
 from .ollama_integration import ollama
 from .image_worker import ImageWorker
+from .clipboard_watcher import ClipboardWatcher
+from .worker_pool import WorkerPool
+from .request_scheduler import RequestScheduler, INTERACTIVE, BACKGROUND
+from .context_manager import context_manager
 
 # Import the TextWorker class for offloading text processing
 from .text_worker import TextWorker
+from .map_reduce_worker import MapReduceWorker, may_need_map_reduce
 
 class ClipboardMonitor(QObject):
     content_processed = pyqtSignal(str)  # Signal emitted when content is processed
@@ -39,13 +41,27 @@ class ClipboardMonitor(QObject):
         self.clipboard_retry_count = 0
         self.MAX_RETRIES = 3
         self.last_request_type = None
+        # Decoded image for the clipboard fingerprint it was read from
+        self._decoded_fingerprint = None
+        self._decoded_image = None
         
-        QTimer.singleShot(0, lambda: self.clipboard.dataChanged.connect(self._on_clipboard_change))
+        # All text and image requests run on one bounded, long-lived pool,
+        # in the order the scheduler picks
+        self.pool = WorkerPool(parent=self)
+        self.scheduler = RequestScheduler(self.pool, parent=self)
+        # Conversation summaries wait behind the requests the user is waiting for
+        context_manager.summary_requested.connect(self._submit_summary)
+        self.text_worker = None
+        self.text_job = None
+        # Auto-mode answers to copied text, kept apart so a copy never stops an explicit request
+        self.auto_worker = None
+        self.auto_job = None
+        self.image_worker = None
+        self.image_job = None
         
-        self.check_timer = QTimer()
-        self.check_timer.moveToThread(QApplication.instance().thread())
-        self.check_timer.timeout.connect(self._check_clipboard)
-        QTimer.singleShot(0, lambda: self.check_timer.start(1000))  # Check every second
+        # Wake only on real clipboard changes instead of polling
+        self.watcher = ClipboardWatcher(self.clipboard)
+        self.watcher.changed.connect(lambda fingerprint: self._on_clipboard_change())
 
     def _get_clipboard_content(self) -> Optional[str]:
         self.clipboard_retry_count = 0
@@ -97,37 +113,32 @@ class ClipboardMonitor(QObject):
             if success and config.get("processing_mode") == "auto":
                 self._process_current_content()
 
-    def _check_clipboard(self):
-        if not self.paused and config.get("processing_mode") == "auto":
-            if self._check_for_image():
-                self.image_detected.emit(self.last_copied_image)
-                return
-            current_content = self._get_clipboard_content()
-            if current_content and current_content != self.last_text:
-                self._process_current_content()
-
-    def _handle_stream(self, text: str):
-        self.stream_received.emit(text)
-
     def _process_current_content(self) -> None:
         content = self._get_clipboard_content()
         if not content or content == self.last_text:
             return
         self.last_text = content
+        model = config.get("selected_model")
+        # The same text is already queued or being answered
+        if self.scheduler.coalesce(("auto", model, content)) is not None:
+            return
         
         self.processing_started.emit()
-        # Offload text processing to a worker thread
-        self.text_thread = QThread()
-        self.text_worker = TextWorker(prompt=content)
-        self.text_worker.moveToThread(self.text_thread)
-        self.text_thread.started.connect(self.text_worker.process)
-        self.text_worker.result_ready.connect(lambda result: self.content_processed.emit(result))
-        self.text_worker.stream_chunk.connect(self._handle_stream)
-        self.text_worker.error.connect(lambda err: self.error_occurred.emit(f"Error processing content: {err}"))
-        self.text_worker.finished.connect(self.text_thread.quit)
-        self.text_worker.finished.connect(self.text_worker.deleteLater)
-        self.text_thread.finished.connect(self.text_thread.deleteLater)
-        self.text_thread.start()
+        # Offload text processing to the worker pool
+        if may_need_map_reduce(content):
+            # Split into parts on the worker if it does not fit the model's window
+            worker = MapReduceWorker(content)
+        else:
+            worker = TextWorker(prompt=content)
+        worker.result_ready.connect(lambda result: self.content_processed.emit(result))
+        worker.stream_chunk.connect(self.stream_received)
+        worker.error.connect(lambda err: self.error_occurred.emit(f"Error processing content: {err}"))
+        # Newer clipboard content replaces an auto request that has not started yet...
+        job = self.scheduler.submit(worker, model, BACKGROUND, key=("auto", model, content), slot="auto")
+        # ...and stops the previous auto request if it is already running;
+        # an interactive request keeps running and this one waits behind it
+        self._detach_auto_worker()
+        self.auto_worker, self.auto_job = worker, job
 
     def process_on_demand(self) -> None:
         if self.paused:
@@ -161,6 +172,7 @@ class ClipboardMonitor(QObject):
         print("Clearing conversation context and state")
         # First clear data
         self.current_context.clear()
+        context_manager.reset()
         self.last_copied_text = None
         self.last_copied_image = None
         self.last_text = ""
@@ -172,59 +184,41 @@ class ClipboardMonitor(QObject):
         # Stop any ongoing image processing
         self._cleanup_previous_image_processing()
         
-        # If there's an active text processing thread, stop it properly
-        if hasattr(self, 'text_thread') and self.text_thread and self.text_thread.isRunning():
-            try:
-                # Disconnect any signals to prevent callbacks during shutdown
-                if hasattr(self, 'text_worker') and self.text_worker:
-                    try:
-                        self.text_worker.result_ready.disconnect()
-                        self.text_worker.stream_chunk.disconnect()
-                        self.text_worker.error.disconnect()
-                        self.text_worker.finished.disconnect()
-                    except Exception:
-                        pass  # Ignore if already disconnected
-                
-                # Request the thread to quit and wait longer for it to finish
-                self.text_thread.quit()
-                if not self.text_thread.wait(2000):  # Wait up to 2 seconds
-                    print("Text thread did not terminate gracefully, forcing termination")
-                    self.text_thread.terminate()
-                    self.text_thread.wait(1000)  # Give it another second
-            except Exception as e:
-                print(f"Error cleaning up text thread: {str(e)}")
+        # Drop any queued text job and stop listening to a running one
+        self._detach_text_worker()
         
         # Process events to ensure UI remains responsive
         QApplication.processEvents()
 
-    def process_text(self, text: str, is_follow_up: bool = False):
+    def process_text(self, text: str, is_follow_up: bool = False, cache_parts: tuple = None,
+                     content: str = None, notes: str = ""):
         try:
             self.processing_started.emit()
-            self.text_thread = QThread()
-            self.text_worker = TextWorker(prompt=text, is_follow_up=is_follow_up, context=self.current_context)
-            self.text_worker.moveToThread(self.text_thread)
-            self.text_thread.started.connect(self.text_worker.process)
+            self._detach_text_worker()
+            if content is not None and may_need_map_reduce(content):
+                self.text_worker = MapReduceWorker(content, notes, prompt=text, cache_parts=cache_parts)
+            else:
+                self.text_worker = TextWorker(prompt=text, is_follow_up=is_follow_up,
+                                              context=list(self.current_context), cache_parts=cache_parts)
             self.text_worker.result_ready.connect(lambda result: self._handle_text_result(result))
-            self.text_worker.stream_chunk.connect(self._handle_stream)
+            self.text_worker.stream_chunk.connect(self.stream_received)
             self.text_worker.error.connect(lambda err: self.error_occurred.emit(f"Error processing text: {err}"))
-            self.text_worker.finished.connect(self.text_thread.quit)
-            self.text_worker.finished.connect(self.text_worker.deleteLater)
-            self.text_thread.finished.connect(self.text_thread.deleteLater)
-            self.text_thread.start()
+            self.text_job = self.scheduler.submit(self.text_worker, config.get("selected_model"), INTERACTIVE)
             self.last_request_type = "text"  # Set the request type for text processing
         except Exception as e:
             self.error_occurred.emit(f"Error processing text: {str(e)}")
 
     def _handle_text_result(self, result: str):
+        worker = self.text_worker
+        if isinstance(worker, MapReduceWorker) and worker.partials and self.current_context:
+            # Follow-ups get the notes on each part instead of the text that did not fit
+            self.current_context[-1] = (worker.digest(), "user")
         self.current_context.append((result, "assistant"))
         self.content_processed.emit("complete")
 
     def generate_stream(self, prompt: str) -> Generator[str, None, None]:
-        try:
-            for chunk in ollama.generate_stream(prompt):
-                yield chunk
-        except Exception as e:
-            yield f"Error: {str(e)}"
+        """Text of the answer as it streams; failures raise OllamaError."""
+        yield from ollama.generate_stream(prompt)
 
     def process_follow_up(self, question: str):
         if self.paused or not question.strip():
@@ -252,6 +246,7 @@ class ClipboardMonitor(QObject):
             self.processing_lock = True
             # Clear previous context to ensure we're starting fresh
             self.current_context.clear()
+            context_manager.reset()
             
             user_message = "[Image Analysis Request]\n"
             if notes:
@@ -264,19 +259,13 @@ class ClipboardMonitor(QObject):
             # Clean up any previous image processing before starting a new one
             self._cleanup_previous_image_processing()
             
-            self.worker_thread = QThread()
-            self.worker = ImageWorker(image, notes)
-            self.worker.moveToThread(self.worker_thread)
-            self.worker_thread.started.connect(self.worker.process)
-            self.worker.finished.connect(self.worker_thread.quit)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-            self.worker.response_ready.connect(lambda response: self._handle_image_response(response, image, notes))
-            self.worker.error.connect(lambda e: self.error_occurred.emit(f"Error processing image: {e}"))
-            self.worker.progress.connect(self.image_progress.emit)
-            self.worker.stream_chunk.connect(self._handle_stream)
+            self.image_worker = ImageWorker(image, notes)
+            self.image_worker.response_ready.connect(lambda response: self._handle_image_response(response, image, notes))
+            self.image_worker.error.connect(lambda e: self.error_occurred.emit(f"Error processing image: {e}"))
+            self.image_worker.progress.connect(self.image_progress.emit)
+            self.image_worker.stream_chunk.connect(self.stream_received)
             self.image_progress.emit(0)
-            self.worker_thread.start()
+            self.image_job = self.scheduler.submit(self.image_worker, config.get("image_model"), INTERACTIVE)
             
             # Set the last request type to image
             self.last_request_type = "image"
@@ -311,7 +300,10 @@ class ClipboardMonitor(QObject):
                 "Please address my notes/questions in relation to the content above."
             )
             self.current_context = [(combined_text, "user")]
-            self.process_text(combined_text)
+            context_manager.reset()
+            # The semantic cache matches the notes and the content each on their own
+            self.process_text(combined_text, cache_parts=(notes, self.last_copied_text),
+                              content=self.last_copied_text, notes=notes)
             self.last_request_type = "text"
             self.last_copied_text = None
         except Exception as e:
@@ -334,6 +326,15 @@ class ClipboardMonitor(QObject):
     def _check_for_image(self) -> bool:
         if self.processing_lock:
             return False
+        # Decode at most once per clipboard change
+        fingerprint = self.watcher.fingerprint()
+        if fingerprint == self._decoded_fingerprint:
+            if self._decoded_image is None:
+                return False
+            self.last_copied_image = self._decoded_image
+            return True
+        self._decoded_fingerprint = fingerprint
+        self._decoded_image = None
         retry_count = 0
         max_retries = 3
         while retry_count < max_retries:
@@ -346,11 +347,11 @@ class ClipboardMonitor(QObject):
                 if mime_data and mime_data.hasImage():
                     image = mime_data.imageData()
                     if image and not image.isNull():
-                        self.last_copied_image = image
+                        self.last_copied_image = self._decoded_image = image
                         return True
                     image = QImage(self.clipboard.image())
                     if not image.isNull():
-                        self.last_copied_image = image
+                        self.last_copied_image = self._decoded_image = image
                         return True
                 retry_count += 1
             except Exception as e:
@@ -391,9 +392,57 @@ class ClipboardMonitor(QObject):
 
     def _cleanup_previous_image_processing(self):
         try:
-            if hasattr(self, 'worker_thread') and self.worker_thread and self.worker_thread.isRunning():
-                self.worker_thread.quit()
-                self.worker_thread.wait(1000)
+            if self.image_worker is not None:
+                self.scheduler.cancel(self.image_job)
+                self._disconnect_worker(self.image_worker)
+                self.image_worker.cancel()
+            self.image_worker = None
+            self.image_job = None
             self.processing_lock = False
         except Exception as e:
             print(f"Error cleaning up image processing: {str(e)}")
+
+    def _detach_text_worker(self):
+        """Cancel the current text jobs, closing their Ollama streams if they are running."""
+        if self.text_worker is not None:
+            self.scheduler.cancel(self.text_job)
+            self._disconnect_worker(self.text_worker)
+            self.text_worker.cancel()
+        self.text_worker = None
+        self.text_job = None
+        self._detach_auto_worker()
+
+    def _detach_auto_worker(self):
+        """Cancel the current auto-mode job only."""
+        if self.auto_worker is not None:
+            self.scheduler.cancel(self.auto_job)
+            self._disconnect_worker(self.auto_worker)
+            self.auto_worker.cancel()
+        self.auto_worker = None
+        self.auto_job = None
+
+    @staticmethod
+    def _disconnect_worker(worker: QObject):
+        for name in ("result_ready", "response_ready", "stream_chunk", "error", "progress"):
+            signal = getattr(worker, name, None)
+            if signal is None:
+                continue
+            try:
+                signal.disconnect()
+            except (TypeError, RuntimeError):
+                pass  # Ignore if already disconnected
+
+    def _submit_summary(self, worker, model: str):
+        """Queue a conversation summary from the context manager (runs on the GUI thread)."""
+        self.scheduler.submit(worker, model, BACKGROUND)
+
+    def shutdown(self):
+        """Stop watching the clipboard and drain the worker pool."""
+        self.watcher.stop()
+        try:
+            context_manager.summary_requested.disconnect(self._submit_summary)
+        except (TypeError, RuntimeError):
+            pass  # Ignore if already disconnected
+        self._detach_text_worker()
+        self._cleanup_previous_image_processing()
+        self.scheduler.shutdown()
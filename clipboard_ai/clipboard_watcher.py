@@ -0,0 +1,103 @@
+# clipboard_ai/clipboard_watcher.py
+import hashlib
+import sys
+from typing import Optional
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QClipboard
+from .config import config
+
+
+def _native_sequence_number() -> Optional[int]:
+    """Return the OS clipboard sequence number where the platform exposes one."""
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+        return int(ctypes.windll.user32.GetClipboardSequenceNumber())
+    except Exception:
+        return None
+
+
+class ClipboardWatcher(QObject):
+    """Event-driven clipboard change detector.
+
+    Wakes only on ``QClipboard.dataChanged``, collapses bursts of events inside a
+    debounce window and compares a cheap fingerprint of the clipboard so that
+    ``changed`` fires at most once per real clipboard change.
+    """
+    changed = pyqtSignal(str)  # Emits the fingerprint of the new clipboard content
+
+    def __init__(self, clipboard: QClipboard, debounce_ms: int = None, parent=None):
+        super().__init__(parent)
+        self.clipboard = clipboard
+        self.debounce_ms = debounce_ms if debounce_ms is not None else config.get("clipboard_debounce_ms", 150)
+        self.last_fingerprint = None
+        self.event_count = 0
+        self.change_count = 0
+        self._use_native_sequence = _native_sequence_number() is not None
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.timeout.connect(self._emit_if_changed)
+
+        self.clipboard.dataChanged.connect(self._on_data_changed)
+        # Remember what is already on the clipboard so start-up does not count as a change
+        self.last_fingerprint = self.fingerprint()
+
+    def _on_data_changed(self):
+        """Restart the debounce window on every raw clipboard event."""
+        self.event_count += 1
+        self._debounce_timer.start(max(0, int(self.debounce_ms)))
+
+    def _emit_if_changed(self):
+        fingerprint = self.fingerprint()
+        if fingerprint == self.last_fingerprint:
+            return
+        self.last_fingerprint = fingerprint
+        self.change_count += 1
+        self.changed.emit(fingerprint)
+
+    def fingerprint(self) -> str:
+        """Cheap identity for the current clipboard content, without decoding images.
+
+        Only the format list and the text are read: asking for any other
+        format's payload makes Qt convert and encode a copied image into it.
+        Images and content without text (files) cannot be told apart cheaply,
+        so it is identified by the clipboard event that put it there; the
+        fingerprint stays the same until the next ``dataChanged``.
+        """
+        if self._use_native_sequence:
+            sequence = _native_sequence_number()
+            if sequence is not None:
+                return f"seq:{sequence}"
+
+        digest = hashlib.blake2b(digest_size=16)
+        informative = False
+        try:
+            mime_data = self.clipboard.mimeData()
+            if mime_data is None:
+                return "empty"
+            for fmt in mime_data.formats():
+                digest.update(fmt.encode("utf-8", "replace"))
+            if mime_data.hasText() and not mime_data.hasImage():
+                digest.update(mime_data.text().encode("utf-8", "replace"))
+                informative = True
+        except Exception as e:
+            print(f"Error fingerprinting clipboard: {e}")
+            informative = False
+
+        if not informative:
+            digest.update(self.event_count.to_bytes(8, "little"))
+        return digest.hexdigest()
+
+    def set_debounce(self, debounce_ms: int) -> None:
+        """Change the debounce window used for subsequent events."""
+        self.debounce_ms = debounce_ms
+
+    def stop(self) -> None:
+        """Stop listening to clipboard events."""
+        self._debounce_timer.stop()
+        try:
+            self.clipboard.dataChanged.disconnect(self._on_data_changed)
+        except (TypeError, RuntimeError):
+            pass
@@ -15,9 +15,57 @@ class Config:
             "selected_model": "gemma3:latest",
             "image_model": "gemma3:latest",
             "ollama_host": "http://localhost:11434",
+            "ollama_hosts": [],  # Several Ollama URLs to spread requests over (empty = ollama_host only)
+            "ollama_probe_interval_s": 10,  # Health/model probe of each host when several are set
+            "ollama_max_connections": 4,  # Keep-alive connections shared by all requests
+            "fast_start": True,  # Show the tray at once and check Ollama in the background
+            "ollama_retry_initial_s": 1,  # First retry delay while Ollama is unreachable, doubled each time
+            "ollama_retry_max_s": 30,
+            "ollama_health_interval_s": 60,  # Re-check a reachable Ollama this often (0 = never)
+            "ollama_connect_timeout_s": 5,
+            "ollama_first_token_timeout_s": 120,  # Until a stream starts, including loading the model
+            "ollama_read_timeout_s": 60,  # Longest pause between streamed chunks
+            "ollama_request_timeout_s": 300,  # Non-streamed generations, answered all at once
+            "ollama_metadata_timeout_s": 10,  # Listing and showing models
+            "model_catalog_ttl_s": 300,  # Re-list the pulled models after this long (details are kept per digest)
+            "request_retry_attempts": 3,  # Tries of calls that are safe to repeat (not generations)
+            "request_retry_base_s": 0.25,  # Backoff before the first retry, doubled each time, jittered
+            "request_retry_max_s": 4,
+            "circuit_breaker_failures": 3,  # Failures in a row before requests to a host fail fast
+            "circuit_breaker_reset_s": 15,  # How long to fail fast before trying the host again
             "notification_duration": 5000,  # milliseconds
             "history_enabled": True,
-            "max_history_items": 100
+            "max_history_items": 100,
+            "clipboard_debounce_ms": 150,  # Quiet period before a clipboard change is handled
+            "response_cache_enabled": True,
+            "response_cache_max_entries": 500,
+            "response_cache_max_bytes": 20 * 1024 * 1024,
+            "semantic_cache_enabled": False,  # Reuse answers to near-identical prompts (needs numpy)
+            "semantic_cache_model": "nomic-embed-text",  # Ollama embedding model, must be pulled
+            "semantic_cache_threshold": 0.95,  # Min cosine similarity to serve a cached answer
+            "semantic_cache_max_entries": 2000,
+            "semantic_cache_max_chars": 6000,  # Longer prompts are not embedded
+            "semantic_cache_timeout_s": 5,
+            "worker_pool_size": 2,  # Concurrent text/image requests
+            "scheduler_max_per_model": 1,  # Generations per model at once (match OLLAMA_NUM_PARALLEL)
+            # Per-model image overrides, e.g. {"llava": {"max_side": 672, "tile": 336}}
+            "image_model_profiles": {},
+            "image_hash_threshold": 4,  # Max differing bits (of 256) for two images to count as the same
+            "image_cache_max_entries": 32,
+            "image_cache_max_bytes": 64 * 1024 * 1024,
+            "model_warmup_enabled": True,  # Pre-load models at startup and after settings changes
+            "model_idle_unload_s": 900,  # Unload models after this long without activity (0 = keep loaded)
+            "model_keepalive_interval_s": 240,  # How often to refresh keep_alive while the user is active
+            "context_max_tokens": 8192,  # num_ctx for requests, capped at the model's context length (0 = model maximum)
+            "context_response_reserve": 1024,  # Tokens of the window kept free for the answer
+            "context_summary_tokens": 384,  # Length of the running summary of older turns
+            "map_reduce_enabled": True,  # Split text too long for the context window into parts
+            "map_reduce_chunk_tokens": 3000,  # Size of each part, capped by the window
+            "map_reduce_parallel": 2,  # Parts processed at once (capped by scheduler_max_per_model)
+            "map_reduce_partial_tokens": 400,  # Max length of the result for each part
+            "stream_batch_ms": 33,  # Collect streamed tokens for this long per GUI update (0 = every token)
+            "stream_batch_chars": 1024,  # ...or until this many characters are waiting
+            "metrics_buffer_size": 500  # Recent requests kept for the Performance window
         }
         self.current_config = self.load_config()
 
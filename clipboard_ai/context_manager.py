@@ -0,0 +1,225 @@
+# clipboard_ai/context_manager.py
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+from PyQt6.QtCore import QObject, pyqtSignal
+from .config import config
+from .model_catalog import model_catalog
+from .ollama_integration import ollama, DEFAULT_OPTIONS
+
+DEFAULT_CONTEXT_LENGTH = 2048  # Ollama's num_ctx when a model reports nothing
+MESSAGE_OVERHEAD = 4  # Role markers and separators added by the chat template
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Merge the previous summary and the new turns into one concise summary. Keep facts, "
+    "decisions, code identifiers and open questions; drop pleasantries. Reply with the summary only."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: about four ASCII characters per token, one per other character."""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD
+
+
+def to_messages(context: Sequence[Tuple[str, str]]) -> List[Dict[str, str]]:
+    """Convert (content, role) context items into chat messages."""
+    return [
+        {"role": "user" if role == "user" else "assistant", "content": content}
+        for content, role in context
+    ]
+
+
+class SummaryWorker(QObject):
+    """Runs one conversation summary as a scheduler job."""
+    finished = pyqtSignal()
+
+    def __init__(self, manager: "ContextManager", args: tuple):
+        super().__init__()
+        self.manager = manager
+        self.args = args
+
+    def process(self):
+        try:
+            self.manager._summarize(*self.args)
+        finally:
+            self.finished.emit()
+
+    def cancel(self):
+        pass  # A single short request; once started it runs to the end
+
+
+class ContextManager(QObject):
+    """Keeps conversation requests inside a token budget.
+
+    The budget is ``num_ctx`` (the model's context length from /api/show,
+    capped by ``context_max_tokens``) minus ``context_response_reserve``.
+    Requests carry the newest turns that fit; once the history passes the high
+    water mark the oldest turns are folded into a summary in the background,
+    which then replaces them as a stable prefix for the following turns.
+    The summary is a ``SummaryWorker`` sent through ``summary_requested``
+    so the app can queue it on the RequestScheduler at BACKGROUND priority;
+    with nothing connected it runs on its own thread.
+    """
+    summary_requested = pyqtSignal(object, str)  # SummaryWorker, model
+    HIGH_WATER = 0.75  # Start summarising at this share of the budget
+    LOW_WATER = 0.5    # ...and fold turns until the rest fits in this share
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.summary = ""
+        self.summarized = 0  # Leading context items already folded into the summary
+        self._epoch = 0
+        self._summarizing = False
+
+    def context_length(self, model: str) -> int:
+        """Context length the model was trained for, from the model catalog."""
+        try:
+            length = model_catalog.context_length(model)
+        except Exception as e:
+            print(f"Could not read context length for {model}: {e}")
+            length = None
+        return length or DEFAULT_CONTEXT_LENGTH
+
+    def num_ctx(self, model: str) -> int:
+        """Context window to request from Ollama for this model."""
+        length = self.context_length(model)
+        limit = config.get("context_max_tokens", 8192)
+        return min(length, limit) if limit and limit > 0 else length
+
+    def options_for(self, model: str) -> Dict[str, Any]:
+        """Request options with num_ctx set, shared by every request so the model is not reloaded."""
+        return dict(DEFAULT_OPTIONS, num_ctx=self.num_ctx(model))
+
+    def prompt_budget(self, model: str) -> int:
+        num_ctx = self.num_ctx(model)
+        reserve = min(config.get("context_response_reserve", 1024), num_ctx // 2)
+        return num_ctx - reserve
+
+    def reset(self):
+        """Forget the summary; called whenever a new conversation starts."""
+        with self._lock:
+            self.summary = ""
+            self.summarized = 0
+            self._epoch += 1
+
+    def build_messages(self, model: str, context: Sequence[Tuple[str, str]], prompt: str) -> List[Dict[str, str]]:
+        """Messages for a request: summary, newest turns that fit, and the prompt."""
+        budget = self.prompt_budget(model)
+        with self._lock:
+            if self.summarized > len(context):
+                # The conversation was replaced without a reset
+                self.summary, self.summarized = "", 0
+                self._epoch += 1
+            summary, start, epoch = self.summary, self.summarized, self._epoch
+
+        history = to_messages(context[start:])
+        current = {"role": "user", "content": prompt}
+        if not history or history[-1] != current:
+            history.append(current)
+        head = []
+        if summary:
+            head = [{"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}]
+
+        used = sum(message_tokens(m) for m in head + history)
+        if len(history) > 1 and used > budget * self.HIGH_WATER:
+            self._schedule_summary(model, list(context), start, epoch, budget)
+
+        # Until the summary lands, drop the oldest turns that do not fit
+        dropped = False
+        while len(history) > 1 and (used > budget or (dropped and history[0]["role"] != "user")):
+            # Keep going to the next user turn so roles still alternate
+            used -= message_tokens(history.pop(0))
+            dropped = True
+        if used > budget and head:
+            used -= message_tokens(head.pop())
+        if used > budget:
+            # A single oversized prompt: keep its start and end
+            history[-1] = dict(history[-1], content=self._truncate(history[-1]["content"], budget))
+        return head + history
+
+    @staticmethod
+    def _truncate(text: str, budget: int) -> str:
+        keep = max(1, budget - MESSAGE_OVERHEAD - 4)
+        while estimate_tokens(text) > keep:
+            # Characters per token varies, so shrink until the estimate fits
+            half = len(text) * keep // estimate_tokens(text) // 2 - 8
+            if half <= 0:
+                return text[:keep]
+            text = text[:half] + "\n[...]\n" + text[-half:]
+        return text
+
+    def _schedule_summary(self, model: str, context: List[Tuple[str, str]], start: int, epoch: int, budget: int):
+        summary_tokens = config.get("context_summary_tokens", 384)
+        with self._lock:
+            if self._summarizing or epoch != self._epoch:
+                return
+            previous = self.summary
+            items = context[start:]
+            # Fold the oldest turns until the rest fits under the low water mark,
+            # without sending the summariser more than the window holds
+            remaining = sum(estimate_tokens(content) + MESSAGE_OVERHEAD for content, _ in items)
+            room = budget - summary_tokens - estimate_tokens(previous) - estimate_tokens(SUMMARY_PROMPT)
+            count, folded = 0, 0
+            while count < len(items) - 1 and remaining > budget * self.LOW_WATER:
+                size = estimate_tokens(items[count][0]) + MESSAGE_OVERHEAD
+                if count and folded + size > room:
+                    break
+                remaining -= size
+                folded += size
+                count += 1
+            # Leave a user turn first after the summary
+            while 0 < count < len(items) - 1 and items[count][1] != "user":
+                count += 1
+            if not count:
+                return
+            self._summarizing = True
+
+        args = (model, previous, items[:count], start + count, epoch, summary_tokens)
+        if self.receivers(self.summary_requested):
+            self.summary_requested.emit(SummaryWorker(self, args), model)
+            return
+        thread = threading.Thread(target=self._summarize, args=args, name="context-summary", daemon=True)
+        thread.start()
+
+    def _summarize(self, model: str, previous: str, items: List[Tuple[str, str]], new_start: int,
+                   epoch: int, summary_tokens: int):
+        try:
+            transcript = "\n\n".join(
+                f"{'User' if role == 'user' else 'Assistant'}: {content}" for content, role in items
+            )
+            if previous:
+                transcript = f"Previous summary:\n{previous}\n\nNew turns:\n{transcript}"
+            transcript = self._truncate(transcript, self.prompt_budget(model) - summary_tokens)
+            options = dict(self.options_for(model), temperature=0.2, num_predict=summary_tokens)
+            response = ollama.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": SUMMARY_PROMPT},
+                    {"role": "user", "content": transcript}
+                ],
+                stream=False,
+                options=options
+            )
+            summary = (response.get("message") or {}).get("content", "").strip()
+            with self._lock:
+                if summary and epoch == self._epoch and new_start > self.summarized:
+                    self.summary = summary
+                    self.summarized = new_start
+                    print(f"Summarised {len(items)} earlier turns into ~{estimate_tokens(summary)} tokens")
+        except Exception as e:
+            print(f"Error summarising conversation: {e}")
+        finally:
+            with self._lock:
+                self._summarizing = False
+
+
+# Global context manager instance
+context_manager = ContextManager()
@@ -0,0 +1,302 @@
+# clipboard_ai/history_store.py
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+from .config import config
+
+
+class HistoryEntry(NamedTuple):
+    id: int
+    created: float  # Wall-clock time the request finished
+    kind: str  # "text", "follow_up" or "image"
+    source: str  # The clipboard item (for images a short description)
+    prompt: str  # The user's notes or question, if any
+    model: str
+    response: str
+    ttft_s: Optional[float]  # Time to the first streamed text, None when served from a cache
+    total_s: Optional[float]
+
+
+_FIELDS = HistoryEntry._fields
+_COLUMNS = ", ".join(_FIELDS)
+_JOINED_COLUMNS = ", ".join(f"h.{field}" for field in _FIELDS)
+_CLEAR = object()  # Queued by clear(): delete everything written so far
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix."""
+    words = re.findall(r"\w+", text, re.UNICODE)
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class HistoryStore:
+    """On-disk history of clipboard items and the answers they got.
+
+    Entries live in a SQLite database in WAL mode next to the config file,
+    with an FTS5 index over the clipboard text, prompt and response.  ``add``
+    only queues the entry: a writer thread inserts queued entries in one
+    transaction per batch and trims the table to ``max_history_items``, so
+    workers and the GUI thread never wait on disk.  Reads use their own
+    connection, which WAL lets run while a batch is being written, and page
+    through results by id so no query loads the whole history.  Listeners
+    are called on the writer thread whenever a batch or a clear has landed.
+    """
+
+    BATCH_SIZE = 200
+    BATCH_WAIT_S = 0.25  # How long a lone entry waits for others to share its transaction
+
+    def __init__(self, path: str = None, max_items: int = None):
+        self.path = path or os.path.join(config.config_dir, "history.sqlite3")
+        self._max_items = max_items
+        self.fts = True  # Cleared when SQLite was built without FTS5
+        self.written = 0
+        self.batches = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._read_conn = None
+        self._read_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(config.get("history_enabled", True))
+
+    @property
+    def max_items(self) -> int:
+        if self._max_items is not None:
+            return self._max_items
+        return max(1, int(config.get("max_history_items", 100)))
+
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent on a crash; only the last batches can be lost
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._schema_lock:
+            if not self._schema_ready:
+                self._create_schema(conn)
+                self._schema_ready = True
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            " id INTEGER PRIMARY KEY,"
+            " created REAL NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " prompt TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " ttft_s REAL,"
+            " total_s REAL)"
+        )
+        try:
+            # External-content index: the text is stored once, in the history table
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                " source, prompt, response, content='history', content_rowid='id',"
+                " tokenize='unicode61 remove_diacritics 2')"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN"
+                " INSERT INTO history_fts(rowid, source, prompt, response)"
+                " VALUES (new.id, new.source, new.prompt, new.response); END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN"
+                " INSERT INTO history_fts(history_fts, rowid, source, prompt, response)"
+                " VALUES ('delete', old.id, old.source, old.prompt, old.response); END"
+            )
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, falling back to LIKE: {e}")
+            self.fts = False
+        conn.commit()
+
+    # ----- Writing -----
+
+    def add(self, kind: str, source: str, model: str, response: str, prompt: str = "",
+            ttft_s: Optional[float] = None, total_s: Optional[float] = None) -> None:
+        """Queue an entry for writing. Returns immediately."""
+        if not self.enabled or not response:
+            return
+        self._queue.put((time.time(), kind, source or "", prompt or "", model or "", response, ttft_s, total_s))
+        self._ensure_writer()
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call callback (on the writer thread) after each batch or clear is on disk."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error notifying history listener: {e}")
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        conn = None
+        while True:
+            item = self._queue.get()
+            rows, waiters, stop, clear = [], [], False, False
+            deadline = time.monotonic() + self.BATCH_WAIT_S
+            while True:
+                if item is None:
+                    stop = True
+                elif item is _CLEAR:
+                    clear = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    rows.append(item)
+                if stop or clear or waiters or len(rows) >= self.BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if rows or clear:
+                try:
+                    if conn is None:
+                        conn = self._open()
+                    if rows:
+                        self._write_batch(conn, rows)
+                    if clear:
+                        with conn:
+                            conn.execute("DELETE FROM history")
+                except sqlite3.Error as e:
+                    print(f"Error {'clearing' if clear else 'writing'} history: {e}")
+                self._notify()
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                if conn is not None:
+                    conn.close()
+                return
+
+    def _write_batch(self, conn: sqlite3.Connection, rows: list):
+        with conn:
+            conn.executemany(
+                "INSERT INTO history (created, kind, source, prompt, model, response, ttft_s, total_s)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            # Ids only grow, so everything below the newest max_items ids is out
+            newest = conn.execute("SELECT MAX(id) FROM history").fetchone()[0]
+            conn.execute("DELETE FROM history WHERE id <= ?", (newest - self.max_items,))
+        self.written += len(rows)
+        self.batches += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is on disk."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(5.0)
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    # ----- Reading -----
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._read_conn is None:
+            self._read_conn = self._open()
+        return self._read_conn
+
+    def page(self, query: str = "", before_id: Optional[int] = None, limit: int = 50) -> List[HistoryEntry]:
+        """Newest entries first, optionally filtered by full-text query.
+
+        Pass the id of the last entry of the previous page as ``before_id`` to
+        get the next one; each page costs the same however deep it is.
+        """
+        before = before_id if before_id is not None else (1 << 62)
+        match = fts_query(query) if query else ""
+        with self._read_lock:
+            try:
+                conn = self._reader()
+                if query and self.fts:
+                    if not match:
+                        return []
+                    rows = conn.execute(
+                        f"SELECT {_JOINED_COLUMNS}"
+                        " FROM history_fts JOIN history h ON h.id = history_fts.rowid"
+                        " WHERE history_fts MATCH ? AND history_fts.rowid < ?"
+                        " ORDER BY history_fts.rowid DESC LIMIT ?",
+                        (match, before, limit)
+                    ).fetchall()
+                elif query:
+                    pattern = f"%{query}%"
+                    rows = conn.execute(
+                        f"SELECT {_COLUMNS} FROM history"
+                        " WHERE id < ? AND (source LIKE ? OR prompt LIKE ? OR response LIKE ?)"
+                        " ORDER BY id DESC LIMIT ?",
+                        (before, pattern, pattern, pattern, limit)
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        f"SELECT {_COLUMNS} FROM history WHERE id < ? ORDER BY id DESC LIMIT ?",
+                        (before, limit)
+                    ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error reading history: {e}")
+                return []
+        return [HistoryEntry(*row) for row in rows]
+
+    def get(self, entry_id: int) -> Optional[HistoryEntry]:
+        with self._read_lock:
+            try:
+                row = self._reader().execute(f"SELECT {_COLUMNS} FROM history WHERE id = ?",
+                                             (entry_id,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Error reading history: {e}")
+                return None
+        return HistoryEntry(*row) if row else None
+
+    def count(self) -> int:
+        with self._read_lock:
+            try:
+                return self._reader().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Error reading history: {e}")
+                return 0
+
+    def clear(self):
+        """Queue deleting every entry, after pending writes land. Returns immediately."""
+        self._queue.put(_CLEAR)
+        self._ensure_writer()
+
+
+# Global history store
+history_store = HistoryStore()
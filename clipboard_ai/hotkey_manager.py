@@ -1,4 +1,3 @@
-import keyboard
 from typing import Callable
 from .config import config
 from PyQt6.QtCore import QObject
@@ -28,6 +27,8 @@ class HotkeyManager(QObject):
             return
             
         try:
+            # Imported on first use: it starts the keyboard hook machinery
+            import keyboard
             keyboard.add_hotkey(self._current_hotkey, self._callback)
             self._is_registered = True
         except Exception as e:
@@ -38,6 +39,7 @@ class HotkeyManager(QObject):
         """Unregister the current hotkey."""
         if self._current_hotkey and self._is_registered:
             try:
+                import keyboard
                 keyboard.remove_hotkey(self._current_hotkey)
                 self._is_registered = False
             except:
@@ -0,0 +1,202 @@
+# clipboard_ai/image_cache.py
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+from .config import config
+from .image_encoding import EncodedImage
+
+
+def dhash(image: QImage, hash_size: int = 16) -> int:
+    """Difference hash of an image.
+
+    The image is reduced to (hash_size + 1) x hash_size grayscale and each bit
+    records whether a pixel is brighter than its right neighbour.  Re-captures
+    of the same window land within a few bits of each other.
+    """
+    small = image.scaled(
+        hash_size + 1, hash_size,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation
+    ).convertToFormat(QImage.Format.Format_Grayscale8)
+    bits = small.constBits()
+    bits.setsize(small.sizeInBytes())
+    data = bytes(bits)
+    stride = small.bytesPerLine()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * stride
+        for col in range(hash_size):
+            value = (value << 1) | (data[offset + col] > data[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ImageSignature(NamedTuple):
+    """Perceptual identity of an image."""
+    phash: int        # 256-bit difference hash (structure)
+    thumbnail: bytes  # 16x16 RGB thumbnail (colour), guards against flat images sharing a dHash
+    aspect: float
+
+
+def image_signature(image: QImage) -> ImageSignature:
+    thumb = image.scaled(
+        16, 16,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation
+    ).convertToFormat(QImage.Format.Format_RGB888)
+    bits = thumb.constBits()
+    bits.setsize(thumb.sizeInBytes())
+    return ImageSignature(
+        phash=dhash(image),
+        thumbnail=bytes(bits),
+        aspect=image.width() / max(1, image.height()),
+    )
+
+
+def thumbnail_distance(a: bytes, b: bytes) -> float:
+    """Mean absolute per-channel difference of two thumbnails (0-255)."""
+    if len(a) != len(b) or not a:
+        return 255.0
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+class _Entry:
+    __slots__ = ("signature", "payloads", "analyses", "size")
+
+    def __init__(self, signature: ImageSignature):
+        self.signature = signature
+        self.payloads: Dict[str, EncodedImage] = {}  # model -> encoded image
+        self.analyses: "OrderedDict[Tuple[str, str], str]" = OrderedDict()  # (model, notes) -> response
+        self.size = 0
+
+
+class ImageAnalysisCache:
+    """Bounded index of recently analysed images, keyed by perceptual hash.
+
+    Near-duplicate images (dHash Hamming distance within ``image_hash_threshold``
+    and near-identical colour thumbnails) share one entry that keeps the encoded
+    payload per model and the analyses produced for each set of notes.
+    """
+    THUMBNAIL_TOLERANCE = 6.0
+    ASPECT_TOLERANCE = 0.02
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, threshold: int = None):
+        self.max_entries = max_entries if max_entries is not None else config.get("image_cache_max_entries", 32)
+        self.max_bytes = max_bytes if max_bytes is not None else config.get("image_cache_max_bytes", 64 * 1024 * 1024)
+        self._threshold = threshold
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._ids = itertools.count()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.analysis_hits = 0
+        self.payload_hits = 0
+        self.misses = 0
+
+    @property
+    def threshold(self) -> int:
+        if self._threshold is not None:
+            return self._threshold
+        return config.get("image_hash_threshold", 4)
+
+    @staticmethod
+    def _notes_key(notes: Optional[str]) -> str:
+        return " ".join((notes or "").split()).lower()
+
+    def _find(self, signature: ImageSignature) -> Optional[Tuple[int, _Entry]]:
+        best, best_distance = None, self.threshold + 1
+        for key, entry in self._entries.items():
+            other = entry.signature
+            if abs(other.aspect - signature.aspect) > self.ASPECT_TOLERANCE * signature.aspect:
+                continue
+            distance = hamming(signature.phash, other.phash)
+            if distance >= best_distance:
+                continue
+            if thumbnail_distance(signature.thumbnail, other.thumbnail) > self.THUMBNAIL_TOLERANCE:
+                continue
+            best, best_distance = (key, entry), distance
+            if distance == 0:
+                break
+        if best is not None:
+            self._entries.move_to_end(best[0])
+        return best
+
+    def lookup_analysis(self, signature: ImageSignature, model: str, notes: Optional[str]) -> Optional[str]:
+        """Cached analysis of a near-identical image with the same model and notes."""
+        with self._lock:
+            found = self._find(signature)
+            entry = found[1] if found else None
+            if entry is None:
+                return None
+            response = entry.analyses.get((model, self._notes_key(notes)))
+            if response is not None:
+                self.analysis_hits += 1
+            return response
+
+    def lookup_payload(self, signature: ImageSignature, model: str) -> Optional[EncodedImage]:
+        """Previously encoded payload for a near-identical image."""
+        with self._lock:
+            found = self._find(signature)
+            payload = found[1].payloads.get(model) if found else None
+            if payload is not None:
+                self.payload_hits += 1
+            else:
+                self.misses += 1
+            return payload
+
+    def store(self, signature: ImageSignature, model: str, encoded: EncodedImage,
+              notes: Optional[str] = None, response: Optional[str] = None) -> None:
+        """Remember the payload (and optionally the analysis) for an image."""
+        with self._lock:
+            found = self._find(signature)
+            if found:
+                entry = found[1]
+            else:
+                entry = _Entry(signature)
+                entry.size = len(signature.thumbnail)
+                self._bytes += entry.size
+                self._entries[next(self._ids)] = entry
+            if model not in entry.payloads:
+                entry.payloads[model] = encoded
+                entry.size += len(encoded.base64)
+                self._bytes += len(encoded.base64)
+            if response:
+                key = (model, self._notes_key(notes))
+                previous = entry.analyses.pop(key, None)
+                if previous is not None:
+                    entry.size -= len(previous)
+                    self._bytes -= len(previous)
+                entry.analyses[key] = response
+                entry.size += len(response)
+                self._bytes += len(response)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "analysis_hits": self.analysis_hits,
+                "payload_hits": self.payload_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Global image analysis cache instance
+image_cache = ImageAnalysisCache()
@@ -0,0 +1,56 @@
+# clipboard_ai/image_encoding.py
+from typing import NamedTuple
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt6.QtGui import QImage
+
+
+class EncodedImage(NamedTuple):
+    """An image ready to attach to an Ollama request."""
+    base64: bytes      # ASCII base64 of the encoded file, spliced into the request as-is
+    format: str        # Qt image format name, e.g. "JPG"
+    width: int
+    height: int
+    encoded_size: int  # Size of the encoded file before base64
+
+
+def scale_to_fit(image: QImage, max_side: int) -> QImage:
+    """Return image scaled down so neither side exceeds max_side."""
+    if max_side and (image.width() > max_side or image.height() > max_side):
+        return image.scaled(
+            max_side, max_side,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+    return image
+
+
+def encode_image(image: QImage, max_side: int = 1200, fmt: str = "JPG", quality: int = None) -> EncodedImage:
+    """Scale and encode an image entirely in memory.
+
+    The image is written into a QByteArray through a QBuffer and base64-encoded
+    by Qt, so the only Python-side copy is the final base64 bytes.
+    """
+    if image is None or image.isNull():
+        raise ValueError("Cannot encode an empty image")
+
+    scaled = scale_to_fit(image, max_side)
+    if quality is None:
+        # Down-scaled images tolerate slightly stronger compression
+        quality = 85 if scaled is not image else 90
+
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    try:
+        if not scaled.save(buffer, fmt, quality):
+            raise ValueError(f"Could not encode image as {fmt}")
+    finally:
+        buffer.close()
+
+    return EncodedImage(
+        base64=data.toBase64().data(),
+        format=fmt,
+        width=scaled.width(),
+        height=scaled.height(),
+        encoded_size=data.size(),
+    )
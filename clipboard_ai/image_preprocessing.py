@@ -0,0 +1,133 @@
+# clipboard_ai/image_preprocessing.py
+import array
+from typing import Any, Dict, NamedTuple, Optional
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QImageWriter
+from .config import config
+from .image_encoding import EncodedImage, encode_image
+
+
+class ImageProfile(NamedTuple):
+    """How a vision model wants its images."""
+    max_side: int            # Longest side worth sending; the model resizes anything larger
+    tile: int = 0            # Encoder tile size, 0 if the model has no fixed tiling
+    photo_format: str = "JPG"
+    photo_quality: int = 85
+    text_format: str = "PNG"  # Lossless keeps screenshot text legible
+
+
+DEFAULT_PROFILE = ImageProfile(max_side=1200)
+
+# Known vision encoder geometries, matched against the model name prefix
+FAMILY_PROFILES = {
+    "llava-llama3": ImageProfile(max_side=672, tile=336),
+    "llava-phi3": ImageProfile(max_side=672, tile=336),
+    "bakllava": ImageProfile(max_side=672, tile=336),
+    "llava": ImageProfile(max_side=672, tile=336),
+    "gemma3": ImageProfile(max_side=896, tile=896),
+    "llama3.2-vision": ImageProfile(max_side=1120, tile=560),
+    "minicpm-v": ImageProfile(max_side=1344, tile=448),
+    "moondream": ImageProfile(max_side=756, tile=378),
+    "qwen2.5vl": ImageProfile(max_side=1288, tile=28),
+}
+
+def _vision_tile_from_metadata(model: str) -> int:
+    """The vision encoder input size from the model catalog (/api/show, cached per model digest)."""
+    try:
+        from .model_catalog import model_catalog
+        return model_catalog.vision_tile(model)
+    except Exception as e:
+        print(f"Could not read vision metadata for {model}: {e}")
+        return 0
+
+
+def profile_for_model(model: str, use_metadata: bool = True) -> ImageProfile:
+    """Resolve the image profile for a model.
+
+    Order: ``image_model_profiles`` in config, then the family table, then the
+    vision encoder size reported by Ollama, then DEFAULT_PROFILE.
+    """
+    name = (model or "").lower()
+    base = name.split(":", 1)[0]
+
+    overrides = config.get("image_model_profiles", {}) or {}
+    for key in (name, base):
+        if key in overrides:
+            return DEFAULT_PROFILE._replace(**_valid_fields(overrides[key]))
+
+    for prefix in sorted(FAMILY_PROFILES, key=len, reverse=True):
+        if base.startswith(prefix):
+            return FAMILY_PROFILES[prefix]
+
+    if use_metadata and model:
+        tile = _vision_tile_from_metadata(model)
+        if tile:
+            return ImageProfile(max_side=tile, tile=tile)
+    return DEFAULT_PROFILE
+
+
+def _valid_fields(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in (values or {}).items() if key in ImageProfile._fields}
+
+
+def classify_image(image: QImage) -> str:
+    """Guess whether an image is a UI/text screenshot ("text") or a photo.
+
+    Screenshots have large flat regions and a small palette; photos have
+    neither.  Works on a 64x64 thumbnail so it costs well under a millisecond.
+    """
+    small = image.scaled(
+        64, 64,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.FastTransformation
+    ).convertToFormat(QImage.Format.Format_RGB32)
+    bits = small.constBits()
+    bits.setsize(small.sizeInBytes())
+    pixels = array.array("I")
+    pixels.frombytes(bytes(bits))
+
+    width = small.bytesPerLine() // 4
+    flat = 0
+    for index in range(1, len(pixels)):
+        if index % width and pixels[index] == pixels[index - 1]:
+            flat += 1
+    flat_ratio = flat / max(1, len(pixels) - len(pixels) // width)
+    # Quantise to 4 bits per channel so sensor noise does not inflate the palette
+    palette = len({pixel & 0xF0F0F0 for pixel in pixels})
+
+    return "text" if flat_ratio > 0.45 or palette < 96 else "photo"
+
+
+def _supported(fmt: str) -> bool:
+    return fmt.lower().encode() in {bytes(f).lower() for f in QImageWriter.supportedImageFormats()}
+
+
+def target_side(image: QImage, profile: ImageProfile) -> int:
+    """Longest side to send: within the model's limit and aligned to its tiles."""
+    longest = max(image.width(), image.height())
+    side = min(longest, profile.max_side)
+    if profile.tile and side >= profile.tile:
+        # Snap to the nearest whole number of tiles so the model does not
+        # resample again; rather than upscale, leave the resize to the model
+        snapped = min(profile.max_side, max(1, round(side / profile.tile)) * profile.tile)
+        if snapped <= side:
+            side = snapped
+    return side
+
+
+def prepare_image(image: QImage, model: Optional[str] = None) -> EncodedImage:
+    """Downscale and encode an image for the given vision model."""
+    model = model or config.get("image_model")
+    profile = profile_for_model(model)
+    kind = classify_image(image)
+
+    if kind == "text":
+        fmt, quality = profile.text_format, -1
+    else:
+        fmt, quality = profile.photo_format, profile.photo_quality
+    if not _supported(fmt):
+        fmt, quality = DEFAULT_PROFILE.photo_format, DEFAULT_PROFILE.photo_quality
+
+    encoded = encode_image(image, max_side=target_side(image, profile), fmt=fmt, quality=quality)
+    print(f"Prepared {kind} image for {model}: {encoded.width}x{encoded.height} {encoded.format}")
+    return encoded
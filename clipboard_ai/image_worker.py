@@ -1,14 +1,17 @@
 from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtGui import QImage
-import base64
-from PyQt6.QtCore import QByteArray, QBuffer
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
 from .ollama_integration import ollama
+from .ollama_policy import describe_error
+from .context_manager import context_manager
 from .config import config
-import tempfile
-import os
-import uuid
+from .response_cache import response_cache
+from .cancellation import CancellationToken
+from .image_preprocessing import prepare_image
+from .image_cache import image_cache, image_signature
+from .stream_batcher import ChunkBatcher
+from .history_store import history_store
+from .model_catalog import model_catalog
+import time
 
 class ImageWorker(QObject):
     finished = pyqtSignal()  # Signal emitted when processing is complete
@@ -17,42 +20,59 @@ class ImageWorker(QObject):
     progress = pyqtSignal(int)  # Signal emitted to update progress
     stream_chunk = pyqtSignal(str)  # Signal emitted for each stream chunk
     
-    def __init__(self, image: QImage, notes: str = None):
+    def __init__(self, image: QImage, notes: str = None, cancel_token: CancellationToken = None):
         super().__init__()
         self.image = image
         self.notes = notes
         self.response_text = ""
+        self.cancel_token = cancel_token or CancellationToken()
+
+    def cancel(self):
+        """Stop the analysis and close the Ollama stream."""
+        self.cancel_token.cancel()
         
     def process(self):
         """Process the image and generate a response."""
-        temp_file_path = None
+        # Tokens reach the GUI thread in batches, not one queued signal each
+        batcher = ChunkBatcher(self.stream_chunk.emit)
+        started = time.perf_counter()
+        source = f"[Image {self.image.width()}x{self.image.height()}]"
         try:
             # Report progress
             self.progress.emit(10)
             
-            # Create a unique temporary file name with a UUID
-            unique_id = str(uuid.uuid4())
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, f"clipboard_ai_image_{unique_id}.jpg")
-            
-            # If image is very large, scale it down to reduce processing time
-            if self.image.width() > 1200 or self.image.height() > 1200:
-                scaled_image = self.image.scaled(
-                    1200, 1200,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                # Save the scaled image to the temporary file
-                scaled_image.save(temp_file_path, "JPG", 85)  # Use JPG with 85% quality for better compression
-            else:
-                # Save the original image to the temporary file
-                self.image.save(temp_file_path, "JPG", 90)
+            # Always use the image model from config
+            model = config.get("image_model")
+            # A text-only model would answer without seeing the image
+            if model_catalog.supports_images(model) is False:
+                raise Exception(f"{model} cannot read images; choose a vision model in Settings")
             
-            # Report progress
-            self.progress.emit(30)
+            # Re-copies of the same screenshot reuse the earlier analysis
+            signature = image_signature(self.image)
+            cached_analysis = image_cache.lookup_analysis(signature, model, self.notes)
+            if cached_analysis is not None:
+                print("Serving image analysis from perceptual-hash cache")
+                self.response_text = cached_analysis
+                batcher.add(cached_analysis)
+                batcher.close()
+                history_store.add("image", source, model, cached_analysis.strip(), self.notes,
+                                  total_s=time.perf_counter() - started)
+                self.progress.emit(90)
+                self.response_ready.emit(cached_analysis.strip())
+                self.progress.emit(100)
+                return
             
-            # Process events to keep UI responsive
-            QApplication.processEvents()
+            # Size and encode the image for the model, straight to base64 in memory,
+            # unless a near-identical image was already encoded
+            encoded = image_cache.lookup_payload(signature, model)
+            if encoded is None:
+                encode_start = time.perf_counter()
+                encoded = prepare_image(self.image, model)
+                print(f"Encoded {encoded.width}x{encoded.height} {encoded.format} "
+                      f"({encoded.encoded_size // 1024} KB) in {(time.perf_counter() - encode_start) * 1000:.1f} ms")
+                image_cache.store(signature, model, encoded)
+            else:
+                print("Reusing encoded payload of a near-identical image")
             
             # Report progress
             self.progress.emit(40)
@@ -65,20 +85,14 @@ class ImageWorker(QObject):
             
             # Log the prompt format
             print(f"Using prompt: {prompt[:100]}...")
-            print(f"Image saved to temporary file: {temp_file_path}")
             
             # Report progress
             self.progress.emit(50)
             
-            # Process events before model call
-            QApplication.processEvents()
-            
             try:
                 # Log that we're about to call the API
                 print("Calling Ollama API for image processing...")
                 
-                # Always use the image model from config
-                model = config.get("image_model")
                 print(f"Using model: {model} for image processing")
                 
                 # Stream the response to improve user experience
@@ -87,38 +101,57 @@ class ImageWorker(QObject):
                 # Define a callback for streaming
                 def on_stream(chunk):
                     self.response_text += chunk
-                    self.stream_chunk.emit(chunk)
-                    # Process events to keep UI responsive
-                    QApplication.processEvents()
+                    batcher.add(chunk)
                 
-                # Read the image file and encode it to base64
-                with open(temp_file_path, 'rb') as img_file:
-                    image_bytes = img_file.read()
-                    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
+                # Serve repeated analyses of the same image straight from the cache
+                # Same num_ctx as text requests, so a shared model is not reloaded
+                options = context_manager.options_for(model)
+                cache_key = response_cache.make_key(model, options, prompt, [encoded.base64])
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    print("Serving image analysis from response cache")
+                    image_cache.store(signature, model, encoded, self.notes, cached.strip())
+                    on_stream(cached)
+                    batcher.close()
+                    history_store.add("image", source, model, cached.strip(), self.notes,
+                                      total_s=time.perf_counter() - started)
+                    self.progress.emit(90)
+                    self.response_ready.emit(cached.strip())
+                    self.progress.emit(100)
+                    return
                 
                 # Use the chat API with the image in the messages array
                 response = ollama.chat(
                     model=model,
                     messages=[
-                        {"role": "user", "content": prompt, "images": [encoded_image]}
+                        {"role": "user", "content": prompt, "images": [encoded.base64]}
                     ],
                     stream=True,
-                    options={
-                        "temperature": 0.7,
-                        "top_p": 0.9
-                    }
+                    options=options,
+                    cancel_token=self.cancel_token
                 )
                 
                 # Process the streaming response
                 full_response = ""
+                first_text = None
                 for chunk in response:
-                    if "message" in chunk and "content" in chunk["message"]:
-                        text = chunk["message"]["content"]
-                        full_response += text
-                        on_stream(text)
+                    if chunk.text:
+                        if first_text is None:
+                            first_text = time.perf_counter() - started
+                        full_response += chunk.text
+                        on_stream(chunk.text)
+                
+                if self.cancel_token.cancelled:
+                    print("Image analysis cancelled")
+                    return
+                batcher.close()
                 
                 # Log successful response
                 print("Received complete response from Ollama API")
+                response_cache.put(cache_key, model, full_response)
+                image_cache.store(signature, model, encoded, self.notes, full_response.strip())
+                history_store.add("image", source, model, full_response.strip(), self.notes,
+                                  ttft_s=first_text, total_s=time.perf_counter() - started)
                 
                 # Report progress
                 self.progress.emit(90)
@@ -128,17 +161,15 @@ class ImageWorker(QObject):
                 
             except Exception as e:
                 # Log the specific error
-                error_msg = f"Error during Ollama API call: {str(e)}"
+                error_msg = f"Error during Ollama API call: {describe_error(e)}"
                 print(error_msg)
+                batcher.close()
                 self.error.emit(error_msg)
                 # Still emit progress to avoid UI getting stuck
                 self.progress.emit(100)
                 # Re-raise to be caught by outer exception handler
                 raise
             
-            # Process events after getting response
-            QApplication.processEvents()
-            
             # Emit the complete response
             self.response_ready.emit(response)
             
@@ -146,15 +177,8 @@ class ImageWorker(QObject):
             self.progress.emit(100)
             
         except Exception as e:
-            self.error.emit(str(e))
+            self.error.emit(describe_error(e))
         finally:
-            # Clean up the temporary file if it exists
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.remove(temp_file_path)
-                    print(f"Temporary image file removed: {temp_file_path}")
-                except Exception as e:
-                    print(f"Error removing temporary file: {str(e)}")
-            
+            batcher.close(drop=True)
             # Signal that processing is complete
             self.finished.emit()
@@ -4,13 +4,8 @@ from PyQt6.QtCore import QObject, QThread, QTimer
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QClipboard, QImage
 from .ui.tray import SystemTray
-from .ui.floating_dialog import FloatingDialog
-from .clipboard_monitor import ClipboardMonitor
 from .hotkey_manager import HotkeyManager
 from .config import config
-from .ollama_integration import ollama
-from .ui.notes_dialog import NotesDialog
-from .ui.image_dialog import ImageDialog
 import gc
 
 class ClipboardAI(QObject):
@@ -27,42 +22,33 @@ class ClipboardAI(QObject):
         signal.signal(signal.SIGTERM, self.signal_handler)
 
     def init_components(self):
-        """Initialize all application components."""
-        # Check Ollama availability
-        if not ollama.check_ollama_status():
-            print("Error: Ollama is not running or not accessible.")
-            print("Please make sure Ollama is installed and running.")
-            sys.exit(1)
+        """Bring up the tray and hotkeys; everything else follows once the event loop runs.
 
+        With ``fast_start`` the Ollama check runs in the background with retries
+        instead of blocking (and exiting) here, and the chat and dialogs are
+        built on first use.
+        """
         # Ensure we're on the main thread
         if QThread.currentThread() != QApplication.instance().thread():
             raise RuntimeError("Components must be initialized on the main thread")
 
-        # Initialize floating dialog
-        self.floating_dialog = FloatingDialog()
-        self.floating_dialog.follow_up_submitted.connect(self.handle_follow_up)
-        # Connect clear_chat signal to handle_clear_chat method
-        self.floating_dialog.title_bar.new_chat_btn.clicked.disconnect()
-        self.floating_dialog.title_bar.new_chat_btn.clicked.connect(self.handle_clear_chat)
-        self.floating_dialog.hide()  # Ensure it starts hidden
+        if not config.get("fast_start", True):
+            from .ollama_integration import ollama
+            if not ollama.check_ollama_status():
+                print("Error: Ollama is not running or not accessible.")
+                print("Please make sure Ollama is installed and running.")
+                sys.exit(1)
+
+        self._floating_dialog = None
+        self.clipboard_monitor = None
+        self.model_manager = None
+        self.health_monitor = None
 
         # Initialize system tray
         self.tray = SystemTray(self.app)
         self.tray.set_pause_callback(self.handle_pause)
         self.tray.set_mode_change_callback(self.handle_mode_change)
-
-        # Initialize clipboard monitor
-        self.clipboard_monitor = ClipboardMonitor(self.clipboard)
-        self.clipboard_monitor.moveToThread(QApplication.instance().thread())
-        self.clipboard_monitor.content_processed.connect(self.handle_processed_content)
-        self.clipboard_monitor.error_occurred.connect(self.handle_error)
-        self.clipboard_monitor.processing_started.connect(self.handle_processing_started)
-        self.clipboard_monitor.stream_received.connect(self.handle_stream_update)
-        self.clipboard_monitor.thinking_update.connect(self.handle_thinking_update)
-        self.clipboard_monitor.notes_requested.connect(self.handle_notes_request)
-        self.clipboard_monitor.image_detected.connect(self.handle_image_detected)
-        self.clipboard_monitor.image_progress.connect(self.handle_image_progress)
-        self.clipboard_monitor.image_processed_signal.connect(self.handle_image_processed)
+        self.tray.set_settings_callback(self.handle_settings_updated)
 
         # Initialize hotkey managers in the main thread
         self.hotkey = HotkeyManager()
@@ -82,6 +68,75 @@ class ClipboardAI(QObject):
             "ctrl+shift+o"
         )
 
+        # The rest is imported and built on the first pass of the event loop
+        QTimer.singleShot(0, self.init_background_components)
+
+    def init_background_components(self):
+        """Clipboard monitoring, model residency and the Ollama health check."""
+        from .clipboard_monitor import ClipboardMonitor
+        from .model_residency import ModelResidencyManager
+        from .ollama_health import OllamaHealthMonitor
+
+        # Models are loaded in the background once Ollama answers
+        self.model_manager = ModelResidencyManager()
+
+        # Initialize clipboard monitor
+        self.clipboard_monitor = ClipboardMonitor(self.clipboard)
+        self.clipboard_monitor.set_paused(self.tray.is_paused)
+        self.clipboard_monitor.moveToThread(QApplication.instance().thread())
+        self.clipboard_monitor.content_processed.connect(self.handle_processed_content)
+        self.clipboard_monitor.error_occurred.connect(self.handle_error)
+        self.clipboard_monitor.processing_started.connect(self.handle_processing_started)
+        self.clipboard_monitor.stream_received.connect(self.handle_stream_update)
+        self.clipboard_monitor.thinking_update.connect(self.handle_thinking_update)
+        self.clipboard_monitor.notes_requested.connect(self.handle_notes_request)
+        self.clipboard_monitor.image_detected.connect(self.handle_image_detected)
+        self.clipboard_monitor.image_progress.connect(self.handle_image_progress)
+        self.clipboard_monitor.image_processed_signal.connect(self.handle_image_processed)
+        # Clipboard activity keeps the models resident
+        self.clipboard_monitor.watcher.changed.connect(lambda fingerprint: self.model_manager.touch())
+        self.clipboard_monitor.processing_started.connect(self.model_manager.touch)
+
+        # Check Ollama without blocking; retried with backoff while it is down
+        self.health_monitor = OllamaHealthMonitor(self)
+        self.health_monitor.status_changed.connect(self.handle_ollama_status)
+        self.health_monitor.start()
+
+    @property
+    def floating_dialog(self):
+        """The chat window, built the first time it is needed."""
+        if self._floating_dialog is None:
+            from .ui.floating_dialog import FloatingDialog
+            self._floating_dialog = FloatingDialog()
+            self._floating_dialog.follow_up_submitted.connect(self.handle_follow_up)
+            # Connect clear_chat signal to handle_clear_chat method
+            self._floating_dialog.title_bar.new_chat_btn.clicked.disconnect()
+            self._floating_dialog.title_bar.new_chat_btn.clicked.connect(self.handle_clear_chat)
+            self._floating_dialog.hide()  # Ensure it starts hidden
+        return self._floating_dialog
+
+    def handle_ollama_status(self, available: bool):
+        """Handle Ollama becoming reachable or unreachable."""
+        self.tray.set_ollama_status(available)
+        if available:
+            from .model_catalog import model_catalog
+
+            # Load (or, after an Ollama restart, reload) the models in the background
+            self.model_manager.start()
+            # The settings dialog and context lookups read the model list from here
+            model_catalog.refresh()
+            if self.health_monitor.attempts > 1:
+                self.tray.show_notification("Clipboard AI", "Connected to Ollama")
+        else:
+            self.tray.show_notification(
+                "Ollama not reachable",
+                "Please make sure Ollama is installed and running.\nRetrying in the background."
+            )
+
+    def _started(self) -> bool:
+        """Whether the background components are up (hotkeys can fire before that)."""
+        return self.clipboard_monitor is not None and self.model_manager is not None
+
     def handle_processing_started(self):
         """Handle when processing starts."""
         self.floating_dialog.show_processing()
@@ -111,6 +166,7 @@ class ClipboardAI(QObject):
 
     def handle_follow_up(self, question: str):
         """Handle follow-up questions."""
+        self.model_manager.touch()
         self.clipboard_monitor.process_follow_up(question)
 
     def handle_error(self, error_message: str):
@@ -131,7 +187,8 @@ class ClipboardAI(QObject):
 
     def handle_pause(self, is_paused: bool):
         """Handle pause/resume events."""
-        self.clipboard_monitor.set_paused(is_paused)
+        if self.clipboard_monitor:
+            self.clipboard_monitor.set_paused(is_paused)
         status = "paused" if is_paused else "resumed"
         self.tray.show_notification(
             "Status Change",
@@ -145,18 +202,32 @@ class ClipboardAI(QObject):
             f"Switched to {mode} processing mode"
         )
 
+    def handle_settings_updated(self):
+        """Handle saved settings: load newly selected models."""
+        if self.model_manager:
+            self.model_manager.refresh()
+
     def handle_hotkey(self):
         """Handle hotkey press events."""
+        if not self._started():
+            return
+        self.model_manager.touch()
         if config.get("processing_mode") == "manual":
             self.clipboard_monitor.process_on_demand()
 
     def handle_notes_hotkey(self):
         """Handle notes hotkey press."""
+        if not self._started():
+            return
+        self.model_manager.touch()
         if not self.clipboard_monitor.paused:
             self.clipboard_monitor.request_notes()
             
     def handle_image_hotkey(self):
         """Handle image hotkey press."""
+        if not self._started():
+            return
+        self.model_manager.touch()
         if not self.clipboard_monitor.paused:
             # Process events before checking clipboard
             QApplication.processEvents()
@@ -183,6 +254,7 @@ class ClipboardAI(QObject):
             try:
                 # Create a deep copy of the image for the dialog
                 dialog_image = QImage(image)
+                from .ui.image_dialog import ImageDialog
                 dialog = ImageDialog(dialog_image, self.floating_dialog)
                 
                 # Connect the notes_submitted signal to process the image
@@ -205,6 +277,7 @@ class ClipboardAI(QObject):
             return
             
         # Create and show the notes dialog
+        from .ui.notes_dialog import NotesDialog
         notes_dialog = NotesDialog(self.clipboard_monitor.last_copied_text)
         notes_dialog.notes_submitted.connect(self.handle_notes_submit)
         notes_dialog.exec()  # Modal dialog
@@ -277,6 +350,7 @@ class ClipboardAI(QObject):
                 
                 # If we have a current assistant message, update it
                 if hasattr(self.floating_dialog, 'current_assistant_message') and self.floating_dialog.current_assistant_message:
+                    self.floating_dialog.finish_streaming()
                     self.floating_dialog.current_assistant_message.setText(response)
                 else:
                     # Otherwise create a new one
@@ -316,9 +390,16 @@ class ClipboardAI(QObject):
     def _cleanup_resources(self):
         """Clean up resources before shutdown."""
         try:
-            # Stop any ongoing image processing
+            # Stop clipboard monitoring and drain the worker pool
             if hasattr(self, 'clipboard_monitor') and self.clipboard_monitor:
-                self.clipboard_monitor._cleanup_previous_image_processing()
+                self.clipboard_monitor.shutdown()
+            if getattr(self, 'health_monitor', None):
+                self.health_monitor.stop()
+            if getattr(self, 'model_manager', None):
+                self.model_manager.stop()
+            # Write out queued history entries
+            from .history_store import history_store
+            history_store.close()
                 
             # Force garbage collection
             gc.collect()
@@ -343,10 +424,8 @@ class ClipboardAI(QObject):
             return 1
             
     def _exception_hook(self, exc_type, exc_value, exc_traceback):
-        """Handle unhandled exceptions."""
+        """Log unhandled exceptions; the app keeps running, so nothing is shut down here."""
         print(f"Unhandled exception: {exc_value}")
-        # Clean up resources
-        self.cleanup()
         # Call the default exception hook
         sys.__excepthook__(exc_type, exc_value, exc_traceback)
 
@@ -355,6 +434,15 @@ class ClipboardAI(QObject):
         self.hotkey.unregister_hotkey()
         self.notes_hotkey.unregister_hotkey()
         self.image_hotkey.unregister_hotkey()
+        if self.health_monitor:
+            self.health_monitor.stop()
+        if self.clipboard_monitor:
+            self.clipboard_monitor.shutdown()
+        if self.model_manager:
+            self.model_manager.stop()
+        # Write out queued history entries
+        from .history_store import history_store
+        history_store.close()
 
     def run(self):
         """Start the application."""
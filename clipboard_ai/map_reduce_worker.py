@@ -0,0 +1,271 @@
+# clipboard_ai/map_reduce_worker.py
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+from PyQt6.QtCore import QObject, pyqtSignal
+from .async_ollama import event_loop
+from .cancellation import CancellationToken
+from .chunking import split_text
+from .config import config
+from .context_manager import DEFAULT_CONTEXT_LENGTH, context_manager, estimate_tokens
+from .history_store import history_store
+from .ollama_integration import ollama, REQUEST_ERRORS
+from .ollama_policy import describe_error
+from .stream_batcher import ChunkBatcher
+from .text_worker import TextWorker
+
+HISTORY_SOURCE_CHARS = 50_000  # Start of the content kept in the history for a map-reduce request
+
+MAP_PROMPT = (
+    "You are reading part {index} of {count} of a long text the user copied. "
+    "Summarise what this part contains. Keep key facts, names, numbers, errors and code identifiers; "
+    "skip boilerplate. Reply with the summary only."
+)
+MAP_NOTES_PROMPT = (
+    "You are reading part {index} of {count} of a long text the user copied, together with the user's "
+    "notes/questions about the whole text. Extract everything in this part that helps address them, "
+    "quoting exact details where useful. If nothing in this part is relevant, reply \"Nothing relevant.\"\n\n"
+    "=== MY NOTES/QUESTIONS ===\n{notes}"
+)
+COMBINE_PROMPT = (
+    "Below are notes on parts {first} to {last} of {count} of a long text the user copied, in order. "
+    "Merge them into one set of notes on those parts. Keep every key fact, name, number, error and code "
+    "identifier; drop only repetition. Reply with the notes only."
+)
+COMBINE_NOTES_PROMPT = (
+    "Below are notes taken from parts {first} to {last} of {count} of a long text the user copied, in order, "
+    "on what in them helps address the user's notes/questions. Merge them into one set of notes on those "
+    "parts, keeping every relevant detail; drop only repetition and \"Nothing relevant.\" entries. "
+    "Reply with the notes only.\n\n"
+    "=== MY NOTES/QUESTIONS ===\n{notes}"
+)
+REDUCE_PROMPT = (
+    "Below are notes on each part of a long text the user copied, in order. "
+    "Write one response about the whole text as if you had read it in full."
+)
+REDUCE_NOTES_PROMPT = (
+    "Below are notes taken from each part of a long text the user copied, in order. "
+    "Using them, address the user's notes/questions about the whole text.\n\n"
+    "=== MY NOTES/QUESTIONS ===\n{notes}"
+)
+
+
+def may_need_map_reduce(text: str) -> bool:
+    """Cheap check for the GUI thread: could text overflow even a small context window?
+
+    The model's real window is read by the worker, since the first lookup
+    per model is a request to Ollama.
+    """
+    return bool(config.get("map_reduce_enabled", True)) and estimate_tokens(text) > DEFAULT_CONTEXT_LENGTH // 2
+
+
+class MapReduceWorker(QObject):
+    """Processes clipboard text too large for one prompt.
+
+    The text is split on its structure into chunks that fit the model's
+    window (map), each chunk is summarised (or mined for the user's notes) by
+    its own request, at most ``map_reduce_parallel`` (capped by
+    ``scheduler_max_per_model``) at a time on the shared event loop, and the
+    partial results are combined into one answer (reduce); when they are too many for one prompt, the notes on consecutive
+    parts are first merged into notes on ranges of parts.  Partial results
+    stream to the dialog as their chunks finish; the final answer streams
+    after them.  Text that fits after all is sent as one ``prompt`` by a
+    TextWorker on the same thread.  Same signals as TextWorker.
+    """
+    finished = pyqtSignal()
+    result_ready = pyqtSignal(str)
+    error = pyqtSignal(str)
+    stream_chunk = pyqtSignal(str)
+
+    def __init__(self, content: str, notes: str = "", prompt: str = None, cache_parts: tuple = None,
+                 cancel_token: CancellationToken = None):
+        super().__init__()
+        self.content = content
+        self.notes = notes or ""
+        self.prompt = prompt or content
+        self.cache_parts = cache_parts
+        self.cancel_token = cancel_token or CancellationToken()
+        self.chunks: List[str] = []
+        self.partials: List[str] = []
+
+    def cancel(self):
+        """Stop the generations and close their Ollama connections."""
+        self.cancel_token.cancel()
+
+    def chunk_budget(self, model: str) -> int:
+        """Tokens of clipboard text per chunk: the configured size, if the window allows it."""
+        instructions = estimate_tokens(MAP_NOTES_PROMPT) + estimate_tokens(self.notes) + 64
+        room = context_manager.prompt_budget(model) - instructions
+        return max(256, min(config.get("map_reduce_chunk_tokens", 3000), room))
+
+    def digest(self) -> str:
+        """What stands in for the full content in the conversation once it is processed."""
+        text = "\n\n".join(f"[Part {i + 1} of {len(self.partials)}]\n{partial}"
+                           for i, partial in enumerate(self.partials))
+        if self.notes:
+            return (f"=== MY NOTES/QUESTIONS ===\n{self.notes}\n\n"
+                    f"=== CONTENT (too long to include, notes on its parts) ===\n{text}")
+        return f"=== COPIED TEXT (too long to include, notes on its parts) ===\n{text}"
+
+    def _map_messages(self, index: int, chunk: str) -> list:
+        if self.notes:
+            system = MAP_NOTES_PROMPT.format(index=index + 1, count=len(self.chunks), notes=self.notes)
+        else:
+            system = MAP_PROMPT.format(index=index + 1, count=len(self.chunks))
+        return [{"role": "system", "content": system}, {"role": "user", "content": chunk}]
+
+    def _labelled(self, partials: List[str], spans: List[Tuple[int, int]]) -> str:
+        """Partial results headed by the parts of the text they cover, e.g. "[Parts 4-6 of 9]"."""
+        count = len(self.chunks)
+        return "\n\n".join(f"[Part {first} of {count}]\n{partial}" if first == last
+                           else f"[Parts {first}-{last} of {count}]\n{partial}"
+                           for partial, (first, last) in zip(partials, spans))
+
+    def _combine_messages(self, partials: List[str], spans: List[Tuple[int, int]]) -> list:
+        """Merge the notes on consecutive parts into notes on their whole range."""
+        values = dict(first=spans[0][0], last=spans[-1][1], count=len(self.chunks), notes=self.notes)
+        system = (COMBINE_NOTES_PROMPT if self.notes else COMBINE_PROMPT).format(**values)
+        return [{"role": "system", "content": system}, {"role": "user", "content": self._labelled(partials, spans)}]
+
+    def _reduce_messages(self, partials: List[str], spans: List[Tuple[int, int]]) -> list:
+        """The final request: one answer about the whole text."""
+        system = REDUCE_NOTES_PROMPT.format(notes=self.notes) if self.notes else REDUCE_PROMPT
+        return [{"role": "system", "content": system}, {"role": "user", "content": self._labelled(partials, spans)}]
+
+    @staticmethod
+    def _group(partials: List[str], spans: List[Tuple[int, int]], budget: int) -> List[Tuple[List[str], list]]:
+        """Runs of consecutive partial results that fit one prompt together."""
+        groups, size = [], 0
+        for partial, span in zip(partials, spans):
+            tokens = estimate_tokens(partial) + 8
+            if groups and size + tokens <= budget:
+                groups[-1][0].append(partial)
+                groups[-1][1].append(span)
+                size += tokens
+            else:
+                groups.append(([partial], [span]))
+                size = tokens
+        return groups
+
+    async def _generate_all(self, model: str, requests: List[list], options: dict
+                            ) -> AsyncIterator[Tuple[int, str]]:
+        """Run the requests with bounded parallelism, yielding (index, answer) as each finishes."""
+        # The job holds one of the scheduler's per-model slots, so stay within that limit
+        parallel = min(config.get("map_reduce_parallel", 2), config.get("scheduler_max_per_model", 1))
+        slots = asyncio.Semaphore(max(1, parallel))
+
+        async def run(index: int, messages: list) -> Tuple[int, str]:
+            async with slots:
+                try:
+                    result = await ollama.client.chat(model, messages, options)
+                except REQUEST_ERRORS as e:
+                    print(f"Map-reduce part {index + 1} failed: {e}")
+                    return index, f"[This part could not be processed: {describe_error(e)}]"
+                return index, ((result.get("message") or {}).get("content") or "").strip()
+
+        tasks = [asyncio.ensure_future(run(index, messages)) for index, messages in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _run_map(self, model: str, requests: List[list], options: dict, on_done=None) -> Optional[List[str]]:
+        results: List[Optional[str]] = [None] * len(requests)
+        for index, text in event_loop.iterate(self._generate_all(model, requests, options), self.cancel_token):
+            results[index] = text
+            if on_done is not None:
+                on_done(index, text)
+        if self.cancel_token.cancelled or any(result is None for result in results):
+            return None
+        return results
+
+    def _process_single(self):
+        worker = TextWorker(self.prompt, cancel_token=self.cancel_token, cache_parts=self.cache_parts)
+        worker.stream_chunk.connect(self.stream_chunk.emit)
+        worker.result_ready.connect(self.result_ready.emit)
+        worker.error.connect(self.error.emit)
+        worker.process()
+
+    def process(self):
+        model = config.get("selected_model")
+        try:
+            fits = estimate_tokens(self.prompt) <= context_manager.prompt_budget(model)
+        except Exception as e:
+            self.error.emit(str(e))
+            self.finished.emit()
+            return
+        if fits:
+            try:
+                self._process_single()
+            finally:
+                self.finished.emit()
+            return
+
+        batcher = ChunkBatcher(self.stream_chunk.emit)
+        started = time.perf_counter()
+        first_text = None
+        try:
+            base_options = context_manager.options_for(model)
+            self.chunks = split_text(self.content, self.chunk_budget(model))
+            count = len(self.chunks)
+            print(f"Map-reduce: {len(self.content)} characters in {count} chunks")
+            batcher.add(f"*Long text: processing it in {count} parts...*\n\n")
+
+            partial_tokens = config.get("map_reduce_partial_tokens", 400)
+            map_options = dict(base_options, num_predict=partial_tokens)
+            done = [0]
+
+            def on_part(index: int, text: str):
+                nonlocal first_text
+                if first_text is None:
+                    first_text = time.perf_counter() - started
+                done[0] += 1
+                batcher.add(f"**Part {index + 1} of {count}** ({done[0]}/{count} done)\n{text}\n\n")
+
+            partials = self._run_map(model, [self._map_messages(i, chunk) for i, chunk in enumerate(self.chunks)],
+                                     map_options, on_part)
+            if partials is None:
+                return
+            self.partials = partials
+
+            # While the notes are too big for the final prompt, merge the notes on
+            # consecutive parts into notes on ranges of parts, in rounds
+            spans = [(index + 1, index + 1) for index in range(count)]
+            instructions = max(estimate_tokens(REDUCE_NOTES_PROMPT), estimate_tokens(COMBINE_NOTES_PROMPT))
+            budget = max(256, context_manager.prompt_budget(model) - instructions - estimate_tokens(self.notes) - 64)
+            while len(partials) > 1 and estimate_tokens("\n\n".join(partials)) + 8 * len(partials) > budget:
+                groups = self._group(partials, spans, budget)
+                if len(groups) >= len(partials):
+                    break
+                merging = [index for index, (group, _) in enumerate(groups) if len(group) > 1]
+                print(f"Map-reduce: merging {len(partials)} partial results into {len(groups)}")
+                merged = self._run_map(model, [self._combine_messages(*groups[index]) for index in merging],
+                                       map_options)
+                if merged is None:
+                    return
+                partials = [group[0] for group, _ in groups]
+                for index, text in zip(merging, merged):
+                    partials[index] = text
+                spans = [(group_spans[0][0], group_spans[-1][1]) for _, group_spans in groups]
+
+            batcher.add("---\n**Combined answer**\n\n")
+            full_response = ""
+            for chunk in ollama.chat(model=model, messages=self._reduce_messages(partials, spans), stream=True,
+                                     options=base_options, cancel_token=self.cancel_token):
+                if chunk.text:
+                    full_response += chunk.text
+                    batcher.add(chunk.text)
+            if self.cancel_token.cancelled:
+                return
+            batcher.close()
+            history_store.add("text", self.content[:HISTORY_SOURCE_CHARS], model, full_response.strip(), prompt=self.notes,
+                              ttft_s=first_text, total_s=time.perf_counter() - started)
+            self.result_ready.emit(full_response.strip())
+        except Exception as e:
+            batcher.close()
+            self.error.emit(describe_error(e))
+        finally:
+            batcher.close(drop=True)
+            self.finished.emit()
@@ -0,0 +1,295 @@
+# clipboard_ai/metrics.py
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+from .config import config
+
+
+class RequestMetrics(NamedTuple):
+    """Timings of one generation request, all durations in seconds."""
+    started: float  # Wall-clock time the request was issued
+    endpoint: str  # "generate", "chat" or "load"
+    model: str
+    status: str  # "ok", "error" or "cancelled"
+    queue_wait_s: float  # Waiting for a free pooled connection
+    connect_s: float  # Opening a new TCP connection, 0 when one was reused
+    reused: bool
+    ttft_s: Optional[float]  # Until the first chunk with text
+    total_s: float
+    chunks: int  # Chunks with text received by the client
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+    load_s: Optional[float] = None  # Ollama's own durations from the done chunk
+    prompt_eval_s: Optional[float] = None
+    eval_s: Optional[float] = None
+    error: str = ""
+
+    @property
+    def tokens_per_s(self) -> Optional[float]:
+        """Generation speed as Ollama measured it, else as seen by the client."""
+        if self.eval_count and self.eval_s:
+            return self.eval_count / self.eval_s
+        if self.chunks > 1 and self.ttft_s is not None and self.total_s > self.ttft_s:
+            return (self.chunks - 1) / (self.total_s - self.ttft_s)
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self._asdict(), "tokens_per_s": self.tokens_per_s}
+
+
+def _seconds(stats: Dict[str, int], key: str) -> Optional[float]:
+    value = stats.get(key)
+    return value / 1e9 if value is not None else None
+
+
+class RequestTimer:
+    """Collects the timings of one request as it runs and records them when it ends."""
+
+    def __init__(self, endpoint: str, model: str, recorder: "MetricsRecorder" = None):
+        self.endpoint = endpoint
+        self.model = model
+        self.recorder = recorder or metrics
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.queue_wait = 0.0
+        self.connect = 0.0
+        self.reused = False
+        self.ttft = None
+        self.chunks = 0
+        self.stats: Dict[str, int] = {}
+
+    def connected(self, response):
+        """Take the connection timings from a pooled Response."""
+        self.queue_wait = response.queue_wait
+        self.connect = response.connect_time
+        self.reused = response.reused
+
+    def text(self):
+        """Count a chunk that carried text."""
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+        self.chunks += 1
+
+    def finish(self, status: str = "ok", error: str = "") -> RequestMetrics:
+        stats = self.stats
+        entry = RequestMetrics(
+            self.started, self.endpoint, self.model, status,
+            self.queue_wait, self.connect, self.reused,
+            self.ttft, time.perf_counter() - self._start, self.chunks,
+            stats.get("prompt_eval_count"), stats.get("eval_count"),
+            _seconds(stats, "load_duration"), _seconds(stats, "prompt_eval_duration"),
+            _seconds(stats, "eval_duration"), error,
+        )
+        self.recorder.record(entry)
+        return entry
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRecorder:
+    """In-process ring buffer of the most recent request timings.
+
+    Requests finish on the asyncio loop thread and are read from the GUI, so
+    access goes through a lock.  Totals per model, endpoint and status keep
+    counting after entries fall out of the buffer.  The request scheduler
+    reports its queue depth, how long jobs waited and how many requests it
+    replaced or coalesced.  Caches register their ``stats()`` so hits,
+    misses and evictions show up next to the request timings.
+    """
+
+    def __init__(self, size: int = None):
+        self.size = size or config.get("metrics_buffer_size", 500)
+        self._entries: Deque[RequestMetrics] = deque(maxlen=self.size)
+        self._totals: Dict[tuple, int] = {}
+        self._waits: Deque[Tuple[str, str, float]] = deque(maxlen=self.size)  # (priority, model, seconds)
+        self._queue_events: Dict[str, int] = {}
+        self.queue_depth = 0
+        self.queue_depth_max = 0
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, entry: RequestMetrics):
+        key = (entry.endpoint, entry.model, entry.status)
+        with self._lock:
+            self._entries.append(entry)
+            self._totals[key] = self._totals.get(key, 0) + 1
+
+    def record_queue_wait(self, priority: str, model: str, wait_s: float):
+        """A scheduled job left the queue after wait_s."""
+        with self._lock:
+            self._waits.append((priority, model, wait_s))
+            key = f"dispatched_{priority}"
+            self._queue_events[key] = self._queue_events.get(key, 0) + 1
+
+    def record_queue_event(self, event: str):
+        """Count a scheduler event such as "replaced" or "coalesced"."""
+        with self._lock:
+            self._queue_events[event] = self._queue_events.get(event, 0) + 1
+
+    def set_queue_depth(self, depth: int):
+        with self._lock:
+            self.queue_depth = depth
+            self.queue_depth_max = max(self.queue_depth_max, depth)
+
+    def queue_summary(self) -> Dict[str, Any]:
+        """Scheduler queue depth, event counts and wait percentiles per priority."""
+        with self._lock:
+            waits = list(self._waits)
+            result = {"depth": self.queue_depth, "max_depth": self.queue_depth_max, **self._queue_events}
+        for priority in sorted({w[0] for w in waits}):
+            values = [w[2] for w in waits if w[0] == priority]
+            result[f"{priority}_wait_p50_s"] = _percentile(values, 0.5)
+            result[f"{priority}_wait_p95_s"] = _percentile(values, 0.95)
+        return result
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, Any]]):
+        """Report a cache's ``stats()`` (hits, misses, evictions, entries) under name."""
+        with self._lock:
+            self._caches[name] = stats
+
+    def cache_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Current counters of every registered cache."""
+        with self._lock:
+            caches = dict(self._caches)
+        result = {}
+        for name, stats in sorted(caches.items()):
+            try:
+                result[name] = stats()
+            except Exception as e:
+                print(f"Error reading {name} cache stats: {e}")
+        return result
+
+    def snapshot(self) -> List[RequestMetrics]:
+        """The buffered entries, oldest first."""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._totals.clear()
+            self._waits.clear()
+            self._queue_events.clear()
+            self.queue_depth_max = self.queue_depth
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model latency and speed figures over the buffered requests."""
+        by_model: Dict[str, List[RequestMetrics]] = {}
+        for entry in self.snapshot():
+            if entry.endpoint != "load":
+                by_model.setdefault(entry.model, []).append(entry)
+        result = {}
+        for model, entries in by_model.items():
+            ok = [e for e in entries if e.status == "ok"]
+            ttft = [e.ttft_s for e in ok if e.ttft_s is not None]
+            speed = [e.tokens_per_s for e in ok if e.tokens_per_s is not None]
+            result[model] = {
+                "requests": len(entries),
+                "errors": sum(e.status == "error" for e in entries),
+                "ttft_p50_s": _percentile(ttft, 0.5),
+                "ttft_p95_s": _percentile(ttft, 0.95),
+                "total_p50_s": _percentile([e.total_s for e in ok], 0.5),
+                "tokens_per_s_p50": _percentile(speed, 0.5),
+                "queue_wait_p95_s": _percentile([e.queue_wait_s for e in entries], 0.95),
+                "connect_p95_s": _percentile([e.connect_s for e in entries], 0.95),
+            }
+        return result
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps({
+            "generated_at": time.time(),
+            "summary": self.summary(),
+            "scheduler": self.queue_summary(),
+            "caches": self.cache_summary(),
+            "requests": [entry.to_dict() for entry in self.snapshot()],
+        }, indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition: request counters and per-model quantiles."""
+        with self._lock:
+            totals = dict(self._totals)
+            events = dict(self._queue_events)
+            waits = list(self._waits)
+            depth = self.queue_depth
+        lines = [
+            "# HELP clipboard_ai_requests_total Ollama requests by endpoint, model and outcome.",
+            "# TYPE clipboard_ai_requests_total counter",
+        ]
+        for (endpoint, model, status), count in sorted(totals.items()):
+            lines.append(f'clipboard_ai_requests_total{{endpoint="{endpoint}",model="{_label(model)}",'
+                         f'status="{status}"}} {count}')
+
+        gauges = (
+            ("ttft_seconds", "Time to first token", "ttft_s"),
+            ("request_seconds", "Request duration", "total_s"),
+            ("tokens_per_second", "Generation speed", "tokens_per_s"),
+            ("queue_wait_seconds", "Wait for a pooled connection", "queue_wait_s"),
+            ("connect_seconds", "TCP connect time", "connect_s"),
+            ("prompt_eval_seconds", "Ollama prompt_eval_duration", "prompt_eval_s"),
+            ("eval_seconds", "Ollama eval_duration", "eval_s"),
+        )
+        by_model: Dict[str, List[RequestMetrics]] = {}
+        for entry in self.snapshot():
+            if entry.status == "ok" and entry.endpoint != "load":
+                by_model.setdefault(entry.model, []).append(entry)
+        for name, help_text, field in gauges:
+            lines.append(f"# HELP clipboard_ai_{name} {help_text} over the last {self.size} requests.")
+            lines.append(f"# TYPE clipboard_ai_{name} summary")
+            for model, entries in sorted(by_model.items()):
+                values = [v for v in (getattr(e, field) for e in entries) if v is not None]
+                if not values:
+                    continue
+                for q in (0.5, 0.95):
+                    lines.append(f'clipboard_ai_{name}{{model="{_label(model)}",quantile="{q}"}} '
+                                 f"{_percentile(values, q):.6f}")
+                lines.append(f'clipboard_ai_{name}_sum{{model="{_label(model)}"}} {sum(values):.6f}')
+                lines.append(f'clipboard_ai_{name}_count{{model="{_label(model)}"}} {len(values)}')
+
+        lines += [
+            "# HELP clipboard_ai_scheduler_queue_depth Jobs waiting in the request scheduler.",
+            "# TYPE clipboard_ai_scheduler_queue_depth gauge",
+            f"clipboard_ai_scheduler_queue_depth {depth}",
+            "# HELP clipboard_ai_scheduler_events_total Scheduler dispatches, replacements and coalesced requests.",
+            "# TYPE clipboard_ai_scheduler_events_total counter",
+        ]
+        for event, count in sorted(events.items()):
+            lines.append(f'clipboard_ai_scheduler_events_total{{event="{event}"}} {count}')
+        lines.append(f"# HELP clipboard_ai_scheduler_wait_seconds Time jobs spent queued, last {self.size} jobs.")
+        lines.append("# TYPE clipboard_ai_scheduler_wait_seconds summary")
+        for priority in sorted({w[0] for w in waits}):
+            values = [w[2] for w in waits if w[0] == priority]
+            for q in (0.5, 0.95):
+                lines.append(f'clipboard_ai_scheduler_wait_seconds{{priority="{priority}",quantile="{q}"}} '
+                             f"{_percentile(values, q):.6f}")
+            lines.append(f'clipboard_ai_scheduler_wait_seconds_sum{{priority="{priority}"}} {sum(values):.6f}')
+            lines.append(f'clipboard_ai_scheduler_wait_seconds_count{{priority="{priority}"}} {len(values)}')
+
+        caches = self.cache_summary()
+        counters = (
+            ("hits_total", "counter", "Cache lookups answered from the cache.", "hits"),
+            ("misses_total", "counter", "Cache lookups that went to Ollama.", "misses"),
+            ("evictions_total", "counter", "Entries evicted to stay within the cache limits.", "evictions"),
+            ("entries", "gauge", "Entries currently stored.", "entries"),
+        )
+        for name, kind, help_text, field in counters:
+            lines.append(f"# HELP clipboard_ai_cache_{name} {help_text}")
+            lines.append(f"# TYPE clipboard_ai_cache_{name} {kind}")
+            for cache, stats in caches.items():
+                if field in stats:
+                    lines.append(f'clipboard_ai_cache_{name}{{cache="{_label(cache)}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics recorder
+metrics = MetricsRecorder()
@@ -0,0 +1,263 @@
+# clipboard_ai/model_catalog.py
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from PyQt6.QtCore import QObject, pyqtSignal
+from .async_ollama import event_loop
+from .config import config
+from .ollama_integration import ollama, REQUEST_ERRORS
+
+
+class ModelInfo(NamedTuple):
+    name: str
+    digest: str
+    size: int
+    family: str
+    parameter_size: str
+    context_length: Optional[int]  # None until /api/show has been read
+    capabilities: Tuple[str, ...]  # As reported by /api/show, e.g. ("completion", "vision")
+    vision_tile: int  # Vision encoder input size, 0 if not reported
+
+
+def parse_show(info: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of an /api/show answer the app uses."""
+    context_length = None
+    vision_tile = 0
+    for section in ("model_info", "projector_info"):
+        for key, value in (info.get(section) or {}).items():
+            if not isinstance(value, int):
+                continue
+            if section == "model_info" and key.endswith(".context_length") and context_length is None:
+                context_length = value
+            elif key.endswith("vision.image_size") and not vision_tile:
+                vision_tile = value
+    details = info.get("details") or {}
+    families = details.get("families") or []
+    return {
+        "context_length": context_length,
+        "vision_tile": vision_tile,
+        "capabilities": list(info.get("capabilities") or []),
+        # Ollama before 0.6 lists no capabilities; a projector or CLIP family means vision
+        "projector": bool(info.get("projector_info")) or "clip" in families or "mllama" in families,
+    }
+
+
+class ModelCatalog(QObject):
+    """What Ollama has pulled and what each model is, without asking on every use.
+
+    The model list (/api/tags) is fetched in the background on the shared
+    event loop and is fresh for ``model_catalog_ttl_s``; ``snapshot()``
+    returns the last known list at once and starts a refresh when it is
+    stale.  Details from /api/show (context length, capabilities, vision
+    encoder size) are fetched for new models during a refresh and kept per
+    model digest: Ollama sends no ETags, but the digest changes exactly when
+    a model is re-pulled, so details stay valid until then.  Both are saved
+    to ``model_catalog.json`` so a restart starts warm.  Thread-safe;
+    ``refreshed`` fires (from the loop thread) after every successful
+    refresh, ``changed`` before it when the refresh brought news.
+    """
+    changed = pyqtSignal()
+    refreshed = pyqtSignal()
+    refresh_failed = pyqtSignal(str)
+
+    SHOW_PARALLEL = 4  # /api/show requests at once during a refresh
+
+    def __init__(self, path: str = None, parent=None):
+        super().__init__(parent)
+        self.path = path or os.path.join(config.config_dir, "model_catalog.json")
+        self._lock = threading.Lock()
+        self._tags: Dict[str, Dict[str, Any]] = {}  # name -> /api/tags entry, in Ollama's order
+        self._details: Dict[str, Dict[str, Any]] = {}  # digest (or "name:<model>") -> parse_show()
+        self._fetched_at = 0.0  # monotonic time of the last successful refresh, 0 = not this session
+        self._loaded = False
+        self._refreshing = None
+        self.last_error = ""
+
+    # ----- Persistence -----
+
+    def _ensure_loaded(self):
+        """Read the saved catalog the first time it is needed (caller holds the lock)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self._tags = {entry["name"]: entry for entry in saved.get("models", []) if entry.get("name")}
+            self._details = dict(saved.get("details") or {})
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save(self):
+        with self._lock:
+            saved = {"models": list(self._tags.values()), "details": dict(self._details)}
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temporary = self.path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Could not save the model catalog: {e}")
+
+    # ----- Refreshing -----
+
+    @staticmethod
+    def _ttl() -> float:
+        return float(config.get("model_catalog_ttl_s", 300))
+
+    def is_stale(self) -> bool:
+        with self._lock:
+            return not self._fetched_at or time.monotonic() - self._fetched_at > self._ttl()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Fetch the model list in the background unless it is fresh. Returns True if a fetch started."""
+        with self._lock:
+            if self._refreshing is not None:
+                return False
+            if not force and self._fetched_at and time.monotonic() - self._fetched_at <= self._ttl():
+                return False
+            self._refreshing = event_loop.submit(self._refresh())
+        self._refreshing.add_done_callback(self._on_refreshed)
+        return True
+
+    def _on_refreshed(self, future):
+        with self._lock:
+            self._refreshing = None
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.last_error = str(error)
+            print(f"Could not refresh the model catalog: {error}")
+            self.refresh_failed.emit(self.last_error)
+        else:
+            if future.result():
+                self.changed.emit()
+            self.refreshed.emit()
+
+    @staticmethod
+    def _key(name: str, digest: str) -> str:
+        return digest or f"name:{name}"
+
+    async def _refresh(self) -> bool:
+        """Fetch /api/tags, then /api/show for models not seen at this digest. True if anything changed."""
+        client = ollama.client
+        entries = await client.list_models()
+        tags = {entry["name"]: entry for entry in entries if entry.get("name")}
+        with self._lock:
+            self._ensure_loaded()
+            known = set(self._details)
+        missing = [name for name, entry in tags.items() if self._key(name, entry.get("digest", "")) not in known]
+
+        slots = asyncio.Semaphore(self.SHOW_PARALLEL)
+
+        async def show(name: str):
+            async with slots:
+                try:
+                    return name, parse_show(await client.show(name))
+                except (REQUEST_ERRORS + (ValueError,)) as e:
+                    print(f"Could not read details of {name}: {e}")
+                    return name, None
+
+        shown = await asyncio.gather(*(show(name) for name in missing))
+        with self._lock:
+            changed = list(tags.items()) != list(self._tags.items()) or any(details for _, details in shown)
+            self._tags = tags
+            for name, details in shown:
+                if details is not None:
+                    self._details[self._key(name, tags[name].get("digest", ""))] = details
+            # Details of models that were removed or re-pulled are no longer needed
+            live = {self._key(name, entry.get("digest", "")) for name, entry in tags.items()}
+            stale = [key for key in self._details if key not in live]
+            for key in stale:
+                del self._details[key]
+            self._fetched_at = time.monotonic()
+            self.last_error = ""
+        if changed or stale:
+            self._save()
+        return changed
+
+    # ----- Queries -----
+
+    def _resolve(self, model: str) -> Optional[str]:
+        """The listed name a model refers to (caller holds the lock)."""
+        for name in (model, f"{model}:latest"):
+            if name in self._tags:
+                return name
+        return None
+
+    def _info(self, name: str) -> ModelInfo:
+        entry = self._tags.get(name) or {}
+        digest = entry.get("digest", "")
+        details = self._details.get(self._key(name, digest)) or {}
+        extra = entry.get("details") or {}
+        return ModelInfo(name, digest, int(entry.get("size") or 0), extra.get("family", ""),
+                         extra.get("parameter_size", ""), details.get("context_length"),
+                         tuple(details.get("capabilities") or ()), int(details.get("vision_tile") or 0))
+
+    def has_data(self) -> bool:
+        """Whether any model list is known, from this session or a saved one."""
+        with self._lock:
+            self._ensure_loaded()
+            return bool(self._tags)
+
+    def snapshot(self, refresh: bool = True) -> List[ModelInfo]:
+        """The known models, at once; starts a background refresh if the list is stale."""
+        with self._lock:
+            self._ensure_loaded()
+            models = [self._info(name) for name in self._tags]
+        if refresh:
+            self.refresh()
+        return models
+
+    def names(self) -> List[str]:
+        return [info.name for info in self.snapshot()]
+
+    def _details_for(self, model: str, fetch: bool) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded()
+            name = self._resolve(model)
+            digest = self._tags[name].get("digest", "") if name else ""
+            key = self._key(name or model, digest)
+            details = self._details.get(key)
+        if details is not None or not fetch:
+            return details
+        # Not listed yet, or listed before its details were read: ask once, from this thread
+        info = ollama.get_model_info(model)
+        if not info:
+            return None  # Not cached, Ollama may just not be up yet
+        details = parse_show(info)
+        with self._lock:
+            self._details[key] = details
+        self._save()
+        return details
+
+    def context_length(self, model: str, fetch: bool = True) -> Optional[int]:
+        details = self._details_for(model, fetch)
+        return details.get("context_length") if details else None
+
+    def vision_tile(self, model: str, fetch: bool = True) -> int:
+        details = self._details_for(model, fetch)
+        return int(details.get("vision_tile") or 0) if details else 0
+
+    def supports_images(self, model: str, fetch: bool = False) -> Optional[bool]:
+        """Whether the model accepts images, or None if that is not known."""
+        details = self._details_for(model, fetch)
+        if not details:
+            return None
+        if details.get("capabilities"):
+            return "vision" in details["capabilities"]
+        return True if details.get("projector") or details.get("vision_tile") else None
+
+    def invalidate(self):
+        """Forget the model list so the next snapshot refreshes; details stay valid per digest."""
+        with self._lock:
+            self._fetched_at = 0.0
+
+
+# Global model catalog
+model_catalog = ModelCatalog()
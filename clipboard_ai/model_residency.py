@@ -0,0 +1,135 @@
+# clipboard_ai/model_residency.py
+import queue
+import threading
+import time
+from typing import Set
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from .config import config
+from .ollama_integration import ollama
+from .context_manager import context_manager
+
+
+class ModelResidencyManager(QObject):
+    """Keeps the configured models loaded in Ollama while the user is active.
+
+    Models are pre-loaded in the background at startup and whenever the
+    settings change, their keep_alive is refreshed periodically while there is
+    clipboard or hotkey activity, and they are unloaded once the user has been
+    idle for ``model_idle_unload_s`` so the memory goes back to the system.
+    """
+    model_loaded = pyqtSignal(str)
+    model_unloaded = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loaded: Set[str] = set()
+        self.warming: Set[str] = set()  # Queued or in-flight loads
+        # Both sets change on the background thread and are read on the GUI thread
+        self._lock = threading.Lock()
+        self.last_activity = time.monotonic()
+        self.last_ping = 0.0
+        # Loads and unloads run one at a time on a background thread
+        self._jobs = queue.Queue()
+        self._thread = None
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._tick)
+
+    @staticmethod
+    def wanted_models() -> Set[str]:
+        """Models the app will use next: the text model and the image model."""
+        return {m for m in (config.get("selected_model"), config.get("image_model")) if m}
+
+    def start(self):
+        """Warm up the configured models and start the keep-alive timer."""
+        interval = max(10, int(config.get("model_keepalive_interval_s", 240)))
+        self.timer.start(interval * 1000)
+        if config.get("model_warmup_enabled", True):
+            self._run_in_background(self._warm, self.wanted_models())
+
+    def stop(self):
+        self.timer.stop()
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread = None
+
+    def touch(self):
+        """Record user activity; reload models if they were unloaded while idle."""
+        self.last_activity = time.monotonic()
+        if not config.get("model_warmup_enabled", True):
+            return
+        with self._lock:
+            missing = self.wanted_models() - self.loaded - self.warming
+        if missing:
+            self._run_in_background(self._warm, missing)
+
+    def refresh(self):
+        """Settings changed: load the new models and release the ones no longer used."""
+        wanted = self.wanted_models()
+        with self._lock:
+            loaded = set(self.loaded)
+        stale = loaded - wanted
+        if stale:
+            self._run_in_background(self._unload, stale)
+        if config.get("model_warmup_enabled", True):
+            self._run_in_background(self._warm, wanted - loaded)
+
+    def _tick(self):
+        now = time.monotonic()
+        idle = now - self.last_activity
+        idle_limit = config.get("model_idle_unload_s", 900)
+        if idle_limit and idle_limit > 0 and idle >= idle_limit:
+            with self._lock:
+                loaded = set(self.loaded)
+            if loaded:
+                print(f"Idle for {idle:.0f}s, unloading models: {', '.join(sorted(loaded))}")
+                self._run_in_background(self._unload, loaded)
+        elif self.last_activity > self.last_ping and config.get("model_warmup_enabled", True):
+            # Active since the last ping: push the server-side unload timer forward
+            self.last_ping = now
+            self._run_in_background(self._warm, self.wanted_models())
+
+    def _run_in_background(self, job, models: Set[str]):
+        if not models:
+            return
+        if job == self._warm:
+            with self._lock:
+                self.warming |= models
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._drain, name="model-residency", daemon=True)
+            self._thread.start()
+        self._jobs.put((job, set(models)))
+
+    def _drain(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            job, models = item
+            try:
+                job(models)
+            except Exception as e:
+                print(f"Model residency error: {e}")
+
+    def _warm(self, models: Set[str]):
+        for model in sorted(models):
+            started = time.perf_counter()
+            try:
+                # Load with the num_ctx requests will use, or the first request reloads it
+                if ollama.load_model(model, options={"num_ctx": context_manager.num_ctx(model)}):
+                    with self._lock:
+                        new = model not in self.loaded
+                        self.loaded.add(model)
+                    if new:
+                        print(f"Model {model} ready in {time.perf_counter() - started:.1f}s")
+                    self.model_loaded.emit(model)
+            finally:
+                with self._lock:
+                    self.warming.discard(model)
+
+    def _unload(self, models: Set[str]):
+        for model in sorted(models):
+            if ollama.unload_model(model):
+                with self._lock:
+                    self.loaded.discard(model)
+                self.model_unloaded.emit(model)
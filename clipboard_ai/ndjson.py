@@ -0,0 +1,102 @@
+# clipboard_ai/ndjson.py
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up, the standard library is the fallback
+    orjson = None
+
+# Timing fields Ollama puts on the final ("done") chunk of a generation
+STAT_FIELDS = (
+    "total_duration", "load_duration",
+    "prompt_eval_count", "prompt_eval_duration",
+    "eval_count", "eval_duration",
+)
+
+
+def loads(data) -> Any:
+    """Parse JSON from bytes, bytearray or memoryview with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def backend() -> str:
+    return "orjson" if orjson is not None else "json"
+
+
+class StreamChunk:
+    """The parts of one streamed /api/generate or /api/chat line that the app uses."""
+    __slots__ = ("text", "done", "error", "stats")
+
+    def __init__(self, text: str = "", done: bool = False, error: Optional[str] = None,
+                 stats: Optional[Dict[str, int]] = None):
+        self.text = text
+        self.done = done
+        self.error = error
+        self.stats = stats if stats is not None else {}
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any]) -> "StreamChunk":
+        message = obj.get("message")
+        text = (message.get("content") or "") if message else (obj.get("response") or "")
+        done = bool(obj.get("done"))
+        stats = {key: obj[key] for key in STAT_FIELDS if key in obj} if done else None
+        return cls(text, done, obj.get("error"), stats)
+
+    def __repr__(self):
+        return f"StreamChunk(text={self.text!r}, done={self.done}, error={self.error!r})"
+
+
+class NDJSONDecoder:
+    """Incremental decoder for Ollama's newline-delimited JSON streams.
+
+    Raw body data is fed in whatever pieces the network delivers; complete
+    lines are parsed straight out of the buffer (without slicing copies when
+    orjson is available) and returned as StreamChunks.  Lines that are not
+    valid JSON are skipped.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[StreamChunk]:
+        if not self._buffer and data.endswith(b"\n") and data.find(b"\n", 0, len(data) - 1) < 0:
+            # Fast path: one whole line, as Ollama writes one per flush
+            chunk = self._parse(data)
+            return [chunk] if chunk is not None else []
+        self._buffer += data
+        chunks = []
+        start = 0
+        with memoryview(self._buffer) as view:
+            while True:
+                end = self._buffer.find(b"\n", start)
+                if end < 0:
+                    break
+                if end > start:
+                    chunk = self._parse(view[start:end])
+                    if chunk is not None:
+                        chunks.append(chunk)
+                start = end + 1
+        if start:
+            del self._buffer[:start]
+        return chunks
+
+    def close(self) -> List[StreamChunk]:
+        """Parse a final line that was not newline-terminated."""
+        data, self._buffer = bytes(self._buffer), bytearray()
+        chunk = self._parse(data) if data.strip() else None
+        return [chunk] if chunk is not None else []
+
+    @staticmethod
+    def _parse(line) -> Optional[StreamChunk]:
+        try:
+            obj = loads(line)
+        except ValueError:
+            return None
+        if not isinstance(obj, dict):
+            return None
+        return StreamChunk.from_json(obj)
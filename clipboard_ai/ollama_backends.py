@@ -0,0 +1,285 @@
+# clipboard_ai/ollama_backends.py
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from .async_ollama import AsyncOllamaAPI, HTTPStatusError, TRANSPORT_ERRORS
+from .config import config
+from .ndjson import StreamChunk
+
+
+class Backend:
+    """One Ollama host and what probing and routing have learned about it."""
+
+    LATENCY_WEIGHT = 0.3  # Weight of the newest probe in the moving average
+
+    def __init__(self, url: str, max_connections: Optional[int] = None):
+        self.client = AsyncOllamaAPI(url, max_connections)
+        self.url = self.client.base_url
+        self.healthy: Optional[bool] = None  # None until the first probe
+        self.latency_s: Optional[float] = None  # Moving average of the /api/tags round trip
+        self.models: Set[str] = set()  # Pulled on the host
+        self.resident: Set[str] = set()  # Loaded in memory
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.checked_at = 0.0
+
+    def record_latency(self, seconds: float):
+        if self.latency_s is None:
+            self.latency_s = seconds
+        else:
+            self.latency_s += self.LATENCY_WEIGHT * (seconds - self.latency_s)
+
+    def mark_down(self, error: Exception):
+        if self.healthy is not False:
+            print(f"Ollama host {self.url} unavailable: {error}")
+        self.healthy = False
+        self.failures += 1
+        self.resident.clear()
+
+    def has_model(self, model: str) -> bool:
+        """Whether the host has the model, assuming it does while that is unknown."""
+        return not self.models or _matches(model, self.models)
+
+    def loaded(self, model: str):
+        """Note the model as resident after a request used it, under the name the host lists."""
+        if ":" not in model and f"{model}:latest" in self.models:
+            model = f"{model}:latest"
+        self.resident.add(model)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency_ms": self.latency_s * 1000 if self.latency_s is not None else None,
+            "models": sorted(self.models),
+            "resident": sorted(self.resident),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+def _matches(model: str, names: Set[str]) -> bool:
+    # Ollama lists "gemma3:latest" for a request naming just "gemma3"
+    return model in names or (":" not in model and f"{model}:latest" in names)
+
+
+class BalancedOllamaAPI:
+    """The AsyncOllamaAPI interface spread over several Ollama hosts.
+
+    A background task probes every host's /api/tags and /api/ps each
+    ``ollama_probe_interval_s`` for health, round-trip latency, the models
+    it has and the models it has loaded.  Each request goes to the healthy
+    host that has its model, preferring hosts with the model already
+    resident, then the fewest requests in flight from this app (a host that
+    has to load the model counts ``COLD_LOAD_COST`` extra), then the lowest
+    latency.  A request that fails to reach a host, or that the host
+    cannot serve, moves on to the next candidate; a stream only does so
+    while nothing has been yielded from it.  Hosts that failed are
+    probed again and come back when they answer.  Must run on ``event_loop``
+    like AsyncOllamaAPI.
+    """
+
+    PROBE_TIMEOUT_S = 3.0
+    COLD_LOAD_COST = 2  # Loading a model weighs like this many requests queued ahead
+
+    def __init__(self, urls: List[str], max_connections: Optional[int] = None):
+        self.backends = [Backend(url, max_connections) for url in urls]
+        self._probe_task: Optional[asyncio.Task] = None
+        self._first_probe: Optional[asyncio.Task] = None
+
+    @property
+    def base_url(self) -> str:
+        """The host requests currently prefer, for log messages."""
+        healthy = [b for b in self.backends if b.healthy is not False]
+        return min(healthy or self.backends, key=lambda b: (b.in_flight, b.latency_s or 0.0)).url
+
+    # ----- Probing -----
+
+    async def _probe(self, backend: Backend):
+        started = time.perf_counter()
+        try:
+            models = await backend.client.probe(timeout=self.PROBE_TIMEOUT_S)
+            if models is None:
+                raise ConnectionError("no answer to /api/tags")
+            backend.record_latency(time.perf_counter() - started)
+            running = await backend.client.running_models(timeout=self.PROBE_TIMEOUT_S)
+        except (TRANSPORT_ERRORS + (HTTPStatusError, ValueError)) as e:
+            backend.mark_down(e)
+        else:
+            if backend.healthy is False:
+                print(f"Ollama host {backend.url} is back")
+            backend.healthy = True
+            backend.models = {m.get("name") for m in models if m.get("name")}
+            backend.resident = {m.get("name") for m in running if m.get("name")}
+        backend.checked_at = time.monotonic()
+
+    async def probe_all(self):
+        await asyncio.gather(*(self._probe(backend) for backend in self.backends))
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(max(1.0, float(config.get("ollama_probe_interval_s", 10))))
+            await self.probe_all()
+
+    async def _ready(self):
+        """Probe once before the first routed request, and keep probing in the background."""
+        if self._first_probe is None:
+            self._first_probe = asyncio.ensure_future(self.probe_all())
+        if self._probe_task is None:
+            self._probe_task = asyncio.ensure_future(self._probe_loop())
+        await asyncio.shield(self._first_probe)
+
+    # ----- Routing -----
+
+    def candidates(self, model: Optional[str]) -> List[Backend]:
+        """Hosts to try for a model, best first; failed hosts come last as a final resort."""
+        def rank(backend: Backend):
+            has = model is None or backend.has_model(model)
+            cold = model is not None and not _matches(model, backend.resident)
+            return (backend.healthy is False, not has, backend.in_flight + self.COLD_LOAD_COST * cold,
+                    backend.latency_s if backend.latency_s is not None else float("inf"))
+        return sorted(self.backends, key=rank)
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        # 404 is a model the host does not have, 5xx a host that cannot serve it now
+        return not isinstance(error, HTTPStatusError) or error.status == 404 or error.status >= 500
+
+    @staticmethod
+    def _failed(backend: Backend, model: Optional[str], error: Exception):
+        if isinstance(error, HTTPStatusError):
+            if error.status == 404 and model:
+                backend.models.discard(model)
+                backend.resident.discard(model)
+        else:
+            backend.mark_down(error)
+
+    async def _call(self, model: Optional[str], method: str, *args, **kwargs) -> Any:
+        await self._ready()
+        last_error: Optional[Exception] = None
+        for backend in self.candidates(model):
+            backend.in_flight += 1
+            backend.requests += 1
+            try:
+                result = await getattr(backend.client, method)(*args, **kwargs)
+            except TRANSPORT_ERRORS + (HTTPStatusError,) as e:
+                if not self._retryable(e):
+                    raise
+                self._failed(backend, model, e)
+                last_error = e
+                continue
+            finally:
+                backend.in_flight -= 1
+            if model and method != "show":
+                backend.loaded(model)
+            return result
+        raise last_error or ConnectionError("No Ollama hosts configured")
+
+    async def _stream_call(self, model: str, method: str, *args, **kwargs) -> AsyncIterator[StreamChunk]:
+        await self._ready()
+        last_error: Optional[Exception] = None
+        for backend in self.candidates(model):
+            backend.in_flight += 1
+            backend.requests += 1
+            started = False
+            try:
+                async for chunk in getattr(backend.client, method)(*args, **kwargs):
+                    if not started:
+                        started = True
+                        backend.loaded(model)
+                    yield chunk
+                return
+            except TRANSPORT_ERRORS + (HTTPStatusError,) as e:
+                if not self._retryable(e):
+                    raise
+                self._failed(backend, model, e)
+                # Text already shown cannot be taken back, so only fail over before the first chunk
+                if started:
+                    raise
+                last_error = e
+            finally:
+                backend.in_flight -= 1
+        raise last_error or ConnectionError("No Ollama hosts configured")
+
+    # ----- AsyncOllamaAPI interface -----
+
+    async def check_status(self, timeout: float = 5.0) -> bool:
+        await asyncio.wait_for(self.probe_all(), timeout)
+        if self._probe_task is None:
+            self._probe_task = asyncio.ensure_future(self._probe_loop())
+        return any(backend.healthy for backend in self.backends)
+
+    async def list_models(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Models available on any healthy host, each listed once."""
+        await self._ready()
+        results = await asyncio.gather(*(b.client.list_models(timeout=timeout) for b in self.backends
+                                         if b.healthy is not False), return_exceptions=True)
+        merged: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            if isinstance(result, BaseException):
+                continue
+            for item in result:
+                merged.setdefault(item.get("name"), item)
+        if not merged and any(isinstance(result, BaseException) for result in results):
+            raise next(result for result in results if isinstance(result, BaseException))
+        return list(merged.values())
+
+    async def running_models(self, timeout: Optional[float] = 5) -> List[Dict[str, Any]]:
+        await self._ready()
+        results = await asyncio.gather(*(b.client.running_models(timeout=timeout) for b in self.backends
+                                         if b.healthy is not False), return_exceptions=True)
+        merged: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            if not isinstance(result, BaseException):
+                for item in result:
+                    merged.setdefault(item.get("name"), item)
+        return list(merged.values())
+
+    async def show(self, model: str) -> Dict[str, Any]:
+        return await self._call(model, "show", model)
+
+    async def load_model(self, model: str, keep_alive: Optional[int] = None, options: dict = None) -> bool:
+        if keep_alive == 0:
+            # Unloading applies wherever the model is resident
+            await self._ready()
+            hosts = [b for b in self.backends if _matches(model, b.resident)] or self.backends
+            results = await asyncio.gather(*(b.client.load_model(model, 0, options) for b in hosts),
+                                           return_exceptions=True)
+            for backend in hosts:
+                backend.resident.discard(model)
+            return any(result is True for result in results)
+        return await self._call(model, "load_model", model, keep_alive, options)
+
+    async def generate(self, model: str, prompt: str, options: dict = None, **fields) -> Dict[str, Any]:
+        return await self._call(model, "generate", model, prompt, options, **fields)
+
+    def generate_stream(self, model: str, prompt: str, options: dict = None, timeout: Optional[float] = None,
+                        **fields) -> AsyncIterator[StreamChunk]:
+        return self._stream_call(model, "generate_stream", model, prompt, options, timeout, **fields)
+
+    async def chat(self, model: str, messages: List[Dict[str, Any]], options: dict = None) -> Dict[str, Any]:
+        return await self._call(model, "chat", model, messages, options)
+
+    def chat_stream(self, model: str, messages: List[Dict[str, Any]], options: dict = None,
+                    timeout: Optional[float] = None) -> AsyncIterator[StreamChunk]:
+        return self._stream_call(model, "chat_stream", model, messages, options, timeout)
+
+    async def embed(self, model: str, inputs: List[str], timeout: Optional[float] = 60) -> List[List[float]]:
+        return await self._call(model, "embed", model, inputs, timeout)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """What is known about each host, for display."""
+        return [backend.to_dict() for backend in self.backends]
+
+    def close(self):
+        from .async_ollama import event_loop
+
+        def stop():
+            for task in (self._probe_task, self._first_probe):
+                if task is not None:
+                    task.cancel()
+        event_loop.loop.call_soon_threadsafe(stop)
+        for backend in self.backends:
+            backend.client.close()
@@ -0,0 +1,70 @@
+# clipboard_ai/ollama_health.py
+from typing import Optional
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from .config import config
+from .ollama_integration import ollama
+from .async_ollama import event_loop
+
+
+class OllamaHealthMonitor(QObject):
+    """Checks in the background whether Ollama is reachable.
+
+    The check runs on the shared asyncio loop, so the GUI thread never waits
+    on the network.  While Ollama is down it is retried with exponential
+    backoff (``ollama_retry_initial_s`` doubling up to ``ollama_retry_max_s``);
+    once it is up it is re-checked every ``ollama_health_interval_s``.
+    ``status_changed`` fires on the first result and on every change.
+    """
+    status_changed = pyqtSignal(bool)
+
+    # Results come back on the loop thread and are queued to this object's thread
+    _checked = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.available: Optional[bool] = None  # Unknown until the first check returns
+        self.attempts = 0
+        self._checking = False
+        self._delay = self._initial_delay()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.check)
+        self._checked.connect(self._on_checked)
+
+    @staticmethod
+    def _initial_delay() -> float:
+        return max(0.1, float(config.get("ollama_retry_initial_s", 1)))
+
+    def start(self):
+        self.check()
+
+    def stop(self):
+        self._timer.stop()
+
+    def check(self):
+        """Start a check now unless one is already running."""
+        if self._checking:
+            return
+        self._checking = True
+        self._timer.stop()
+        future = event_loop.submit(ollama.client.check_status(timeout=5.0))
+        future.add_done_callback(
+            lambda f: self._checked.emit(not f.cancelled() and f.exception() is None and bool(f.result()))
+        )
+
+    def _on_checked(self, available: bool):
+        self._checking = False
+        self.attempts += 1
+        changed = available != self.available
+        self.available = available
+        if available:
+            self._delay = self._initial_delay()
+            interval = config.get("ollama_health_interval_s", 60)
+            if interval and interval > 0:
+                self._timer.start(int(interval * 1000))
+        else:
+            print(f"Ollama not reachable at {ollama.base_url}, retrying in {self._delay:g}s")
+            self._timer.start(int(self._delay * 1000))
+            self._delay = min(self._delay * 2, max(self._delay, float(config.get("ollama_retry_max_s", 30))))
+        if changed:
+            self.status_changed.emit(available)
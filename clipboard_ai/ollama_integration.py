@@ -1,109 +1,147 @@
-import requests
-import json
 from typing import Dict, Any, List, Optional, Callable, Generator, Union
 from .config import config
+from .cancellation import CancellationToken
+from .ndjson import StreamChunk
+from .async_ollama import AsyncOllamaAPI, TRANSPORT_ERRORS, event_loop
+from .ollama_backends import BalancedOllamaAPI
+from .ollama_policy import OllamaError
 import base64
 
+# Sampling options used for every clipboard request
+DEFAULT_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+}
+
+# Failures of a request to Ollama, whether in the transport or an error status
+REQUEST_ERRORS = TRANSPORT_ERRORS + (OllamaError,)
+
 class OllamaAPI:
+    """Blocking facade over AsyncOllamaAPI for worker threads.
+
+    Every call runs on the shared asyncio loop and its pool of keep-alive
+    connections; the calling thread just waits for the result, or consumes
+    streamed chunks as a plain generator.  Generation calls raise
+    OllamaError subclasses (unreachable, timed out, circuit open, error
+    status, error in the stream); lookups log the failure and return an
+    empty result.
+    """
+
     def __init__(self):
-        self.base_url = config.get("ollama_host")
-        self.session = requests.Session()
+        self.client = self._make_client(config.get("ollama_hosts") or [config.get("ollama_host")])
+
+    @staticmethod
+    def _make_client(hosts: List[str]) -> Union[AsyncOllamaAPI, BalancedOllamaAPI]:
+        hosts = [host for host in hosts if host]
+        if len(hosts) > 1:
+            return BalancedOllamaAPI(hosts)
+        return AsyncOllamaAPI(hosts[0] if hosts else config.get("ollama_host"))
+
+    @property
+    def base_url(self) -> str:
+        return self.client.base_url
+
+    @base_url.setter
+    def base_url(self, url: str):
+        if isinstance(self.client, BalancedOllamaAPI) or url.rstrip("/") != self.client.base_url:
+            self.client.close()
+            self.client = AsyncOllamaAPI(url)
+
+    @property
+    def hosts(self) -> List[str]:
+        if isinstance(self.client, BalancedOllamaAPI):
+            return [backend.url for backend in self.client.backends]
+        return [self.client.base_url]
+
+    @hosts.setter
+    def hosts(self, urls: List[str]):
+        """Switch to these Ollama hosts; more than one spreads requests across them."""
+        if [url.rstrip("/") for url in urls if url] != self.hosts:
+            self.client.close()
+            self.client = self._make_client(urls)
 
     def check_ollama_status(self) -> bool:
         """Check if Ollama is running and accessible."""
+        return event_loop.run(self.client.check_status())
+
+    def load_model(self, model: str, keep_alive: Optional[int] = None, options: dict = None) -> bool:
+        """Load a model into memory without generating anything.
+
+        Also used as a keep-alive ping: for a resident model it only resets
+        the unload timer on the server.
+        """
         try:
-            response = self.session.get(f"{self.base_url}/api/tags")
-            return response.status_code == 200
-        except requests.RequestException:
+            return event_loop.run(self.client.load_model(model, keep_alive, options))
+        except REQUEST_ERRORS as e:
+            print(f"Error loading model {model}: {e}")
             return False
 
+    def unload_model(self, model: str) -> bool:
+        """Ask Ollama to release a model's memory now."""
+        return self.load_model(model, keep_alive=0)
+
+    def running_models(self) -> List[str]:
+        """Names of the models currently loaded by Ollama."""
+        try:
+            return [m.get("name") for m in event_loop.run(self.client.running_models())]
+        except (REQUEST_ERRORS + (ValueError,)) as e:
+            print(f"Error listing running models: {e}")
+            return []
+
     def list_models(self) -> List[Dict[str, str]]:
         """Get list of available models."""
         try:
-            response = self.session.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                return response.json().get("models", [])
-            return []
-        except requests.RequestException as e:
+            return event_loop.run(self.client.list_models())
+        except (REQUEST_ERRORS + (ValueError,)) as e:
             print(f"Error listing models: {e}")
             return []
 
-    def generate_stream(self, prompt: str, image_data: Optional[bytes] = None) -> Generator[str, None, None]:
-        """Generate a streaming response from Ollama."""
+    def embed(self, model: str, texts: List[str], timeout: Optional[float] = 60) -> List[List[float]]:
+        """Embedding vectors for texts, or an empty list if Ollama could not provide them."""
         try:
-            # Use different model based on whether we have image data
-            model = config.get("image_model") if image_data else config.get("selected_model")
-            data = {
-                "model": model,
-                "prompt": prompt,
-                "stream": True,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                }
-            }
-            
-            # Add image data if provided
-            if image_data:
-                data["options"]["images"] = [base64.b64encode(image_data).decode()]
+            return event_loop.run(self.client.embed(model, texts, timeout))
+        except (REQUEST_ERRORS + (ValueError,)) as e:
+            print(f"Error getting embeddings from {model}: {e}")
+            return []
 
-            response = self.session.post(
-                f"{self.base_url}/api/generate",
-                json=data,
-                stream=True
-            )
+    def generate_stream(self, prompt: str, image_data: Optional[bytes] = None,
+                        cancel_token: Optional[CancellationToken] = None) -> Generator[str, None, None]:
+        """Generate a streaming response from Ollama; failures raise OllamaError."""
+        if cancel_token is not None and cancel_token.cancelled:
+            return
+        # Use different model based on whether we have image data
+        model = config.get("image_model") if image_data else config.get("selected_model")
+        options = dict(DEFAULT_OPTIONS)
 
-            if response.status_code == 200:
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            chunk = json.loads(line)
-                            if "response" in chunk:
-                                yield chunk["response"]
-                        except json.JSONDecodeError:
-                            continue
-            else:
-                yield f"Error: {response.status_code} - {response.text}"
+        # Add image data if provided
+        if image_data:
+            options["images"] = [base64.b64encode(image_data).decode()]
 
-        except requests.RequestException as e:
-            yield f"Error communicating with Ollama: {str(e)}"
+        for chunk in self._stream(self.client.generate_stream(model, prompt, options), cancel_token,
+                                  "Failed to generate response"):
+            if chunk.text:
+                yield chunk.text
 
-    def generate(self, model: str, prompt: str, stream: bool = True, options: dict = None) -> Union[dict, Generator]:
+    def generate(self, model: str, prompt: str, stream: bool = True, options: dict = None,
+                 cancel_token: Optional[CancellationToken] = None) -> Union[dict, Generator]:
         """Generate a response from Ollama with support for multimodal inputs."""
+        print(f"Sending request to {self.base_url}/api/generate with model {model}")
+        if stream:
+            return self._stream(self.client.generate_stream(model, prompt, options), cancel_token,
+                                "Failed to generate response")
         try:
-            # Prepare the API endpoint
-            url = f"{self.base_url}/api/generate"
-            
-            # Prepare the payload
-            payload = {
-                "model": model,
-                "prompt": prompt,
-                "stream": stream
-            }
-            
-            # Add options if provided
-            if options:
-                payload["options"] = options
-    
-            # Make the API call
-            print(f"Sending request to {url} with model {model}")
-            print(f"Payload structure: {json.dumps({k: '...' if k == 'options' and 'images' in v else v for k, v in payload.items()}, indent=2)}")
-            
-            response = requests.post(url, json=payload, stream=stream)
-            response.raise_for_status()
-            
-            if stream:
-                return self._process_stream(response)
-            else:
-                return response.json()
-                
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to generate response: {str(e)}"
-            print(error_msg)
-            raise Exception(error_msg)
+            return event_loop.run(self.client.generate(model, prompt, options))
+        except REQUEST_ERRORS as e:
+            print(f"Failed to generate response: {e}")
+            raise
+
+    def generate_response(self, prompt: str, model: Optional[str] = None, on_stream: Optional[Callable[[str], None]] = None,
+                          timeout: Optional[float] = None, cancel_token: Optional[CancellationToken] = None) -> str:
+        """Generate a response using the specified model with streaming support.
 
-    def generate_response(self, prompt: str, model: Optional[str] = None, on_stream: Optional[Callable[[str], None]] = None, timeout: int = 60) -> str:
-        """Generate a response using the specified model with streaming support."""
+        timeout bounds each wait for streamed data (``ollama_read_timeout_s``
+        if not given).  Failures raise OllamaError.
+        """
         # Determine if this is an image request by checking for the image tag format
         is_image_request = "<image" in prompt
         request_type = "image" if is_image_request else "text"
@@ -114,157 +152,72 @@ class OllamaAPI:
         
         print(f"Starting {request_type} request to Ollama API with model: {model}")
         print(f"Prompt length: {len(prompt)} characters")
-        
-        try:
-            # Add timeout to prevent hanging indefinitely
-            print(f"Sending request to {self.base_url}/api/generate")
-            
-            # For image requests, we need to extract the base64 image data
-            options = {
-                "temperature": 0.7,
-                "top_p": 0.9,
-            }
-            
-            # If this is an image request, extract the base64 data and use the images parameter
-            if is_image_request:
-                # Extract base64 image data from the prompt
-                import re
-                image_match = re.search(r'<image data:image/jpeg;base64,([^>]+)>', prompt)
-                if image_match:
-                    # Remove the image tag from the prompt
-                    base64_data = image_match.group(1)
-                    prompt = re.sub(r'<image data:image/jpeg;base64,[^>]+>', '', prompt).strip()
-                    # Add the image data to the options
-                    options["images"] = [base64_data]
-            
-            response = self.session.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": True,
-                    "options": options
-                },
-                stream=True,
-                timeout=timeout
-            )
-            
-            print(f"Received initial response with status code: {response.status_code}")
-            
-            if response.status_code == 200:
-                full_response = ""
-                chunk_count = 0
-                print("Starting to process response stream...")
-                
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            chunk = json.loads(line)
-                            if "response" in chunk:
-                                text = chunk["response"]
-                                full_response += text
-                                chunk_count += 1
-                                if chunk_count % 10 == 0:
-                                    print(f"Processed {chunk_count} chunks so far")
-                                if on_stream:
-                                    on_stream(text)
-                        except json.JSONDecodeError as json_err:
-                            print(f"JSON decode error: {str(json_err)} on line: {line[:100]}...")
-                            continue
-                        except Exception as chunk_err:
-                            print(f"Error processing chunk: {str(chunk_err)}")
-                            continue
-                
-                print(f"Completed processing {chunk_count} chunks from Ollama")
-                return full_response.strip()
-            else:
-                error_msg = f"Error: {response.status_code} - {response.text}"
-                print(f"API error: {error_msg}")
+        print(f"Sending request to {self.base_url}/api/generate")
+
+        # For image requests, we need to extract the base64 image data
+        options = dict(DEFAULT_OPTIONS)
+
+        # If this is an image request, extract the base64 data and use the images parameter
+        if is_image_request:
+            # Extract base64 image data from the prompt
+            import re
+            image_match = re.search(r'<image data:image/jpeg;base64,([^>]+)>', prompt)
+            if image_match:
+                # Remove the image tag from the prompt
+                base64_data = image_match.group(1)
+                prompt = re.sub(r'<image data:image/jpeg;base64,[^>]+>', '', prompt).strip()
+                # Add the image data to the options
+                options["images"] = [base64_data]
+
+        stream = self.client.generate_stream(model, prompt, options, timeout=timeout)
+        parts = []
+        print("Starting to process response stream...")
+
+        for chunk in self._stream(stream, cancel_token, "Error in generate_response"):
+            text = chunk.text
+            if text:
+                parts.append(text)
                 if on_stream:
-                    on_stream(error_msg)
-                return error_msg
-                
-        except requests.exceptions.Timeout as e:
-            error_msg = f"Timeout error communicating with Ollama: {str(e)}"
-            print(error_msg)
-            if on_stream:
-                on_stream(error_msg)
-            return error_msg
-        except requests.exceptions.ConnectionError as e:
-            error_msg = f"Connection error with Ollama: {str(e)}"
-            print(error_msg)
-            if on_stream:
-                on_stream(error_msg)
-            return error_msg
-        except requests.RequestException as e:
-            error_msg = f"Error communicating with Ollama: {str(e)}"
-            print(error_msg)
-            if on_stream:
-                on_stream(error_msg)
-            return error_msg
-        except Exception as e:
-            error_msg = f"Unexpected error in generate_response: {str(e)}"
-            print(error_msg)
-            if on_stream:
-                on_stream(error_msg)
-            return error_msg
+                    try:
+                        on_stream(text)
+                    except Exception as chunk_err:
+                        print(f"Error processing chunk: {str(chunk_err)}")
+
+        if cancel_token is not None and cancel_token.cancelled:
+            print(f"Generation cancelled after {len(parts)} chunks")
+        else:
+            print(f"Completed processing {len(parts)} chunks from Ollama")
+        return "".join(parts).strip()
 
     def get_model_info(self, model_name: str) -> Dict[str, Any]:
         """Get information about a specific model."""
         try:
-            response = self.session.post(
-                f"{self.base_url}/api/show",
-                json={"name": model_name}
-            )
-            if response.status_code == 200:
-                return response.json()
-            return {}
-        except requests.RequestException as e:
+            return event_loop.run(self.client.show(model_name))
+        except (REQUEST_ERRORS + (ValueError,)) as e:
             print(f"Error getting model info: {e}")
             return {}
 
-    def _process_stream(self, response):
-        """Process a streaming response from Ollama."""
-        for line in response.iter_lines():
-            if line:
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+    @staticmethod
+    def _stream(chunks, cancel_token: Optional[CancellationToken], error_prefix: str) -> Generator[StreamChunk, None, None]:
+        """Yield decoded chunks of a streaming call, logging a failure before it propagates."""
+        try:
+            yield from event_loop.iterate(chunks, cancel_token)
+        except REQUEST_ERRORS as e:
+            print(f"{error_prefix}: {e}")
+            raise
                     
-    def chat(self, model: str, messages: List[Dict[str, Any]], stream: bool = True, options: dict = None) -> Union[dict, Generator]:
+    def chat(self, model: str, messages: List[Dict[str, Any]], stream: bool = True, options: dict = None,
+             cancel_token: Optional[CancellationToken] = None) -> Union[dict, Generator]:
         """Send a chat request to Ollama with support for multimodal inputs."""
+        print(f"Sending request to {self.base_url}/api/chat with model {model}")
+        if stream:
+            return self._stream(self.client.chat_stream(model, messages, options), cancel_token,
+                                "Failed to generate chat response")
         try:
-            # Prepare the API endpoint
-            url = f"{self.base_url}/api/chat"
-            
-            # Prepare the payload
-            payload = {
-                "model": model,
-                "messages": messages,
-                "stream": stream
-            }
-            
-            # Add options if provided
-            if options:
-                payload["options"] = options
-    
-            # Make the API call
-            print(f"Sending request to {url} with model {model}")
-            print(f"Payload structure: {json.dumps({k: '...' if k == 'messages' else v for k, v in payload.items()}, indent=2)}")
-            
-            response = requests.post(url, json=payload, stream=stream)
-            response.raise_for_status()
-            
-            if stream:
-                return self._process_stream(response)
-            else:
-                return response.json()
-                
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to generate chat response: {str(e)}"
-            print(error_msg)
-            raise Exception(error_msg)
+            return event_loop.run(self.client.chat(model, messages, options))
+        except REQUEST_ERRORS as e:
+            print(f"Failed to generate chat response: {e}")
+            raise
 
 # Global Ollama API instance
 ollama = OllamaAPI()
\ No newline at end of file
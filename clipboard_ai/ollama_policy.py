@@ -0,0 +1,163 @@
+# clipboard_ai/ollama_policy.py
+import math
+import random
+import threading
+import time
+from typing import Optional
+from .config import config
+
+
+class OllamaError(Exception):
+    """A request to Ollama failed."""
+
+
+class OllamaConnectionError(OllamaError, ConnectionError):
+    """Ollama could not be reached, or dropped the connection."""
+
+
+class CircuitOpenError(OllamaConnectionError):
+    """Ollama failed repeatedly and requests fail fast until it is tried again."""
+
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class OllamaTimeoutError(OllamaError, TimeoutError):
+    """Ollama did not answer in time.
+
+    phase is "connect", "first_token" (no response yet, which includes
+    loading the model) or "read" (a stream or body stalled).
+    """
+
+    def __init__(self, message: str, phase: str):
+        super().__init__(message)
+        self.phase = phase
+
+
+class OllamaStreamError(OllamaError):
+    """Ollama reported an error inside a streamed response."""
+
+
+# Statuses a busy or restarting Ollama (or a proxy in front of it) answers with
+RETRYABLE_STATUSES = (502, 503, 504)
+
+
+def timeouts() -> dict:
+    """The configured timeouts in seconds, by phase and kind of call."""
+    return {
+        "connect": float(config.get("ollama_connect_timeout_s", 5)),
+        "first_token": float(config.get("ollama_first_token_timeout_s", 120)),
+        "read": float(config.get("ollama_read_timeout_s", 60)),
+        "request": float(config.get("ollama_request_timeout_s", 300)),
+        "metadata": float(config.get("ollama_metadata_timeout_s", 10)),
+    }
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether trying the same request again could succeed."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (OllamaConnectionError, OllamaTimeoutError)):
+        return True
+    return getattr(error, "status", None) in RETRYABLE_STATUSES
+
+
+def describe_error(error: BaseException) -> str:
+    """What to tell the user about a failed request, including what to expect next."""
+    if isinstance(error, CircuitOpenError):
+        return (f"Ollama is not responding, it may be restarting; "
+                f"retry in {max(1, math.ceil(error.retry_in))} s")
+    if isinstance(error, OllamaTimeoutError):
+        hint = {
+            "connect": "is Ollama running?",
+            "first_token": "the model may still be loading, try again in a moment",
+            "read": "the answer stalled, try again",
+        }.get(error.phase)
+        return f"{error}; {hint}" if hint else str(error)
+    if isinstance(error, OllamaConnectionError):
+        return f"{error}. Is Ollama running?"
+    return str(error)
+
+
+def retry_attempts() -> int:
+    return max(1, int(config.get("request_retry_attempts", 3)))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to wait before retry number attempt + 1: exponential with full jitter."""
+    base = float(config.get("request_retry_base_s", 0.25))
+    cap = float(config.get("request_retry_max_s", 4))
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fails requests to one Ollama host fast while it is down.
+
+    After ``circuit_breaker_failures`` failures in a row the circuit opens
+    and requests raise CircuitOpenError at once instead of each waiting for
+    a timeout.  Once ``circuit_breaker_reset_s`` has passed, one request is
+    let through as a trial: if it succeeds the circuit closes, otherwise it
+    stays open for another period.  Any successful response, including a
+    health check, closes it.  Thread-safe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_at: Optional[float] = None  # When the half-open trial request started
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _threshold() -> int:
+        return max(1, int(config.get("circuit_breaker_failures", 3)))
+
+    @staticmethod
+    def _reset_s() -> float:
+        return max(0.1, float(config.get("circuit_breaker_reset_s", 15)))
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may go out now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            reset_s = self._reset_s()
+            if self.state == self.OPEN and now - self.opened_at >= reset_s:
+                self.state = self.HALF_OPEN
+                self.trial_at = None
+            if self.state == self.HALF_OPEN:
+                # One trial at a time; a trial that never reported back is replaced
+                if self.trial_at is None or now - self.trial_at >= reset_s:
+                    self.trial_at = now
+                    return
+                retry_in = reset_s - (now - self.trial_at)
+            else:
+                retry_in = reset_s - (now - self.opened_at)
+        raise CircuitOpenError(f"Ollama at {self.name} is not responding; "
+                               f"trying again in {max(0.0, retry_in):.0f} s", retry_in)
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"Ollama at {self.name} is responding again")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self._threshold()):
+                if self.state == self.CLOSED:
+                    print(f"Ollama at {self.name} failed {self.failures} times in a row; failing fast for "
+                          f"{self._reset_s():g} s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.trial_at = None
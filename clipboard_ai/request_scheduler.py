@@ -0,0 +1,165 @@
+# clipboard_ai/request_scheduler.py
+import itertools
+import time
+from typing import Dict, Hashable, List, Optional
+from PyQt6.QtCore import QObject, pyqtSignal
+from .config import config
+from .metrics import metrics
+from .worker_pool import WorkerPool
+
+# Priorities, lower runs first
+INTERACTIVE = 0  # The user is waiting: follow-ups, notes, images they confirmed
+BACKGROUND = 1  # Auto mode reacting to a copy
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class _Job:
+    __slots__ = ("job_id", "worker", "model", "priority", "key", "slot", "submitted_at", "pool_job")
+
+    def __init__(self, job_id: int, worker: QObject, model: str, priority: int, key, slot):
+        self.job_id = job_id
+        self.worker = worker
+        self.model = model
+        self.priority = priority
+        self.key = key
+        self.slot = slot
+        self.submitted_at = time.perf_counter()
+        self.pool_job = None  # WorkerPool job id once dispatched
+
+
+class RequestScheduler(QObject):
+    """Decides which worker runs next on the WorkerPool.
+
+    Jobs wait in a queue ordered by priority, then submission order, and
+    are handed to the pool only when it has a free thread and their model
+    has fewer than ``scheduler_max_per_model`` generations running, so
+    requests queue here instead of competing inside one Ollama instance.
+    A job submitted with a ``slot`` replaces any job still queued in that
+    slot (the newest clipboard content wins), and ``coalesce`` lets callers
+    fold a request into an identical one that is already queued or running.
+    Queue depth, waits and replaced/coalesced counts go to ``metrics``.
+    Lives on the GUI thread.
+    """
+    job_started = pyqtSignal(int)
+    job_finished = pyqtSignal(int)
+    job_dropped = pyqtSignal(int)  # Replaced or cancelled before it ran
+
+    def __init__(self, pool: WorkerPool = None, max_per_model: int = None, parent=None):
+        super().__init__(parent)
+        self.pool = pool or WorkerPool(parent=self)
+        self._max_per_model = max_per_model
+        self._ids = itertools.count(1)
+        self._queue: List[_Job] = []
+        self._dispatched: Dict[int, _Job] = {}  # pool job id -> job
+        self._jobs: Dict[int, _Job] = {}  # Queued or dispatched, by job id
+        self._running: Dict[str, int] = {}  # model -> dispatched jobs
+        self.pool.job_started.connect(self._on_pool_started)
+        self.pool.job_finished.connect(self._on_pool_finished)
+
+    @property
+    def max_per_model(self) -> int:
+        if self._max_per_model is not None:
+            return max(1, self._max_per_model)
+        return max(1, int(config.get("scheduler_max_per_model", 1)))
+
+    def submit(self, worker: QObject, model: str, priority: int = INTERACTIVE,
+               key: Hashable = None, slot: Hashable = None) -> int:
+        """Queue a worker and return its job id.
+
+        key identifies the request for ``coalesce``; slot makes this job
+        replace whatever is still queued under the same slot.
+        """
+        if slot is not None:
+            for job in [job for job in self._queue if job.slot == slot]:
+                self._drop(job)
+                metrics.record_queue_event("replaced")
+        job = _Job(next(self._ids), worker, model or "", priority, key, slot)
+        self._queue.append(job)
+        self._jobs[job.job_id] = job
+        self._dispatch()
+        metrics.set_queue_depth(len(self._queue))
+        return job.job_id
+
+    def coalesce(self, key: Hashable) -> Optional[int]:
+        """The id of a queued or running job with this key, counted as a coalesced request."""
+        if key is None:
+            return None
+        for job in self._jobs.values():
+            if job.key == key:
+                metrics.record_queue_event("coalesced")
+                return job.job_id
+        return None
+
+    def cancel(self, job_id: Optional[int]) -> bool:
+        """Drop a job that has not started yet. Returns True if it was removed."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if job.pool_job is None:
+            self._drop(job)
+            metrics.set_queue_depth(len(self._queue))
+            return True
+        return self.pool.cancel(job.pool_job)
+
+    def is_active(self, job_id: Optional[int]) -> bool:
+        """Whether the job is still queued or running."""
+        return job_id in self._jobs
+
+    def worker(self, job_id: Optional[int]) -> Optional[QObject]:
+        job = self._jobs.get(job_id)
+        return job.worker if job else None
+
+    def queued_count(self) -> int:
+        return len(self._queue)
+
+    def running_count(self, model: str = None) -> int:
+        if model is not None:
+            return self._running.get(model, 0)
+        return sum(self._running.values())
+
+    def _drop(self, job: _Job):
+        self._queue.remove(job)
+        del self._jobs[job.job_id]
+        self.job_dropped.emit(job.job_id)
+
+    def _free_threads(self) -> int:
+        return self.pool.max_workers() - self.pool.pending_count() - self.pool.running_count()
+
+    def _dispatch(self):
+        while self._queue and self._free_threads() > 0:
+            eligible = [job for job in self._queue if self._running.get(job.model, 0) < self.max_per_model]
+            if not eligible:
+                return
+            # Lists stay short, a scan beats keeping a heap in sync with removals
+            job = min(eligible, key=lambda j: (j.priority, j.job_id))
+            self._queue.remove(job)
+            self._running[job.model] = self._running.get(job.model, 0) + 1
+            metrics.record_queue_wait(PRIORITY_NAMES.get(job.priority, str(job.priority)), job.model,
+                                      time.perf_counter() - job.submitted_at)
+            job.pool_job = self.pool.submit(job.worker)
+            self._dispatched[job.pool_job] = job
+
+    def _on_pool_started(self, pool_job: int):
+        job = self._dispatched.get(pool_job)
+        if job is not None:
+            self.job_started.emit(job.job_id)
+
+    def _on_pool_finished(self, pool_job: int):
+        job = self._dispatched.pop(pool_job, None)
+        if job is None:
+            return
+        self._jobs.pop(job.job_id, None)
+        self._running[job.model] -= 1
+        if not self._running[job.model]:
+            del self._running[job.model]
+        self.job_finished.emit(job.job_id)
+        self._dispatch()
+        metrics.set_queue_depth(len(self._queue))
+
+    def shutdown(self, timeout_ms: int = 3000) -> bool:
+        """Drop queued jobs, then drain the pool."""
+        for job in list(self._queue):
+            self._drop(job)
+        metrics.set_queue_depth(0)
+        return self.pool.shutdown(timeout_ms)
@@ -0,0 +1,168 @@
+# clipboard_ai/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+from .config import config
+from .metrics import metrics
+
+
+class ResponseCache:
+    """Persistent LRU cache of model responses.
+
+    Entries are keyed by a hash of (model, options, prompt, images) and kept in a
+    small SQLite database next to the config file.  The cache is bounded both by
+    entry count and by the total size of the stored responses.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, max_bytes: int = None):
+        self.path = path or os.path.join(config.config_dir, "response_cache.sqlite3")
+        self.max_entries = max_entries if max_entries is not None else config.get("response_cache_max_entries", 500)
+        self.max_bytes = max_bytes if max_bytes is not None else config.get("response_cache_max_bytes", 20 * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._entries = 0
+        self._bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(config.get("response_cache_enabled", True))
+
+    @staticmethod
+    def make_key(model: str, options: Optional[Dict[str, Any]], prompt: str,
+                 images: Optional[List[Union[str, bytes]]] = None) -> str:
+        """Build the cache key for a request."""
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(options or {}, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        for image in images or []:
+            digest.update(b"\0")
+            digest.update(image.encode("ascii") if isinstance(image, str) else bytes(image))
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+            self._conn.commit()
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            self._entries, self._bytes = entries, size
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                print(f"Error reading response cache: {e}")
+                self.misses += 1
+                return None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a response and evict least recently used entries over the limits."""
+        if not self.enabled or not response:
+            return
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, model, response, size, time.time())
+                )
+                if old:
+                    self._bytes -= old[0]
+                else:
+                    self._entries += 1
+                self._bytes += size
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing response cache: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        while self._entries > self.max_entries or self._bytes > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT ?",
+                (max(1, self._entries - self.max_entries),)
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= size
+                self.evictions += 1
+                if self._entries <= self.max_entries and self._bytes <= self.max_bytes:
+                    break
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+                self._entries = self._bytes = 0
+            except sqlite3.Error as e:
+                print(f"Error clearing response cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            try:
+                self._connect()
+            except sqlite3.Error:
+                pass
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": self._entries,
+                "bytes": self._bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global response cache instance
+response_cache = ResponseCache()
+metrics.register_cache("response", response_cache.stats)
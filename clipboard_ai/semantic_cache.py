@@ -0,0 +1,327 @@
+# clipboard_ai/semantic_cache.py
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from .config import config
+from .metrics import metrics
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the semantic cache stays off
+    np = None
+
+
+def normalize(vector) -> Optional["np.ndarray"]:
+    """The vector as unit-length float32, or None for an empty or all-zero vector."""
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(array)) if array.size else 0.0
+    if not norm or not np.isfinite(norm):
+        return None
+    return array / norm
+
+
+class VectorIndex:
+    """Unit vectors in one NumPy matrix, searched by cosine similarity.
+
+    Rows are packed at the front of a preallocated matrix, so a search is a
+    single matrix-vector product over the live rows.  Inserts append (the
+    matrix grows by half when full) and removals move the last row into the
+    hole, so neither ever shifts the rest.  Each row carries an integer key
+    and a group; searches can be limited to one group.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        capacity = max(1, capacity)
+        self._matrix = np.empty((capacity, dim), dtype=np.float32)
+        self._keys = np.empty(capacity, dtype=np.int64)
+        self._groups = np.empty(capacity, dtype=np.int32)
+        self._rows: Dict[int, int] = {}  # key -> row
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._rows
+
+    def _reserve(self, count: int):
+        needed = self.size + count
+        capacity = len(self._matrix)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity + capacity // 2)
+        for name in ("_matrix", "_keys", "_groups"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, key: int, vector: "np.ndarray", group: int = 0):
+        """Insert or replace the vector for key; it must already be unit length."""
+        if key in self._rows:
+            self.remove(key)
+        self._reserve(1)
+        row = self.size
+        self._matrix[row] = vector
+        self._keys[row] = key
+        self._groups[row] = group
+        self._rows[key] = row
+        self.size += 1
+
+    def add_many(self, keys: Sequence[int], vectors: "np.ndarray", groups: Sequence[int]):
+        """Append many new (unit length) vectors with one copy."""
+        count = len(keys)
+        if not count:
+            return
+        self._reserve(count)
+        start = self.size
+        self._matrix[start:start + count] = vectors
+        self._keys[start:start + count] = keys
+        self._groups[start:start + count] = groups
+        for offset, key in enumerate(keys):
+            self._rows[int(key)] = start + offset
+        self.size += count
+
+    def remove(self, key: int) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        last = self.size - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self._keys[row] = self._keys[last]
+            self._groups[row] = self._groups[last]
+            self._rows[int(self._keys[row])] = row
+        self.size = last
+        return True
+
+    def clear(self):
+        self._rows.clear()
+        self.size = 0
+
+    def search(self, vector: "np.ndarray", k: int = 1, group: Optional[int] = None) -> List[Tuple[int, float]]:
+        """The k most similar (key, cosine similarity) pairs, best first."""
+        if not self.size or k < 1:
+            return []
+        scores = self._matrix[:self.size] @ vector
+        if group is not None:
+            scores[self._groups[:self.size] != group] = -np.inf
+        if k == 1:
+            rows = [int(np.argmax(scores))]
+        else:
+            k = min(k, self.size)
+            rows = np.argpartition(-scores, k - 1)[:k]
+            rows = rows[np.argsort(-scores[rows])]
+        return [(int(self._keys[row]), float(scores[row])) for row in rows if scores[row] > -np.inf]
+
+
+class SemanticHit(NamedTuple):
+    response: str
+    score: float  # Cosine similarity of the two prompts
+    prompt: str  # The earlier prompt the answer was given for
+
+
+class SemanticCache:
+    """Answers reused for prompts that mean the same as an earlier one.
+
+    Prompts are embedded with ``semantic_cache_model`` through Ollama and
+    compared with the vectors of earlier prompts in the same scope (the chat
+    model, and the kind of request).  A cached answer is served when the best cosine similarity reaches
+    ``semantic_cache_threshold``.  Entries persist in a SQLite database next
+    to the config file; their vectors are loaded into a VectorIndex on first
+    use, and the least recently used entries are evicted beyond
+    ``semantic_cache_max_entries``.  When the embedding model is unavailable
+    the cache stays out of the way for ``RETRY_S`` before trying again.
+    """
+
+    RETRY_S = 60.0
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        self.path = path or os.path.join(config.config_dir, "semantic_cache.sqlite3")
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._index: Optional[VectorIndex] = None
+        self._index_model = None  # Embedding model the loaded vectors came from
+        self._recency: "OrderedDict[int, None]" = OrderedDict()  # Least recently used first
+        self._groups: Dict[str, int] = {}  # Scope -> group in the index
+        self._retry_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return np is not None and bool(config.get("semantic_cache_enabled", False))
+
+    @property
+    def embedding_model(self) -> str:
+        return config.get("semantic_cache_model", "nomic-embed-text")
+
+    @property
+    def threshold(self) -> float:
+        return float(config.get("semantic_cache_threshold", 0.95))
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return max(1, int(config.get("semantic_cache_max_entries", 2000)))
+
+    def embed(self, *texts: str) -> Optional["np.ndarray"]:
+        """The unit vector for the texts, or None when the cache should not be used for them.
+
+        Several texts (say notes and the content they are about) are embedded
+        separately in one request and averaged, so a match needs every part to
+        be similar rather than the longest part to dominate.
+        """
+        if not self.enabled or not any(text.strip() for text in texts) or time.monotonic() < self._retry_at:
+            return None
+        # Beyond this the embedding model truncates, and texts differing in the tail would match
+        if max(len(text) for text in texts) > config.get("semantic_cache_max_chars", 6000):
+            return None
+        from .ollama_integration import ollama
+
+        vectors = ollama.embed(self.embedding_model, list(texts), timeout=config.get("semantic_cache_timeout_s", 5))
+        parts = [normalize(vector) for vector in vectors]
+        vector = None
+        if len(parts) == len(texts) and all(part is not None for part in parts):
+            vector = normalize(np.sum(parts, axis=0)) if len(parts) > 1 else parts[0]
+        if vector is None:
+            print(f"Semantic cache paused for {self.RETRY_S:.0f}s: no embedding from {self.embedding_model}")
+            self._retry_at = time.monotonic() + self.RETRY_S
+        return vector
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " id INTEGER PRIMARY KEY,"
+                " embed_model TEXT NOT NULL,"
+                " scope TEXT NOT NULL,"
+                " prompt TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _group(self, scope: str) -> int:
+        return self._groups.setdefault(scope, len(self._groups))
+
+    def _load(self, dim: int) -> VectorIndex:
+        """The index for the current embedding model, loaded from disk on first use."""
+        embed_model = self.embedding_model
+        if self._index is not None and self._index_model == embed_model and self._index.dim == dim:
+            return self._index
+        conn = self._connect()
+        # Vectors of another embedding model (or size) can never match again
+        conn.execute("DELETE FROM entries WHERE embed_model != ? OR length(vector) != ?", (embed_model, dim * 4))
+        conn.commit()
+        rows = conn.execute("SELECT id, scope, vector FROM entries ORDER BY last_used").fetchall()
+        index = VectorIndex(dim, capacity=max(len(rows), self.max_entries) + 1)
+        if rows:
+            index.add_many([row[0] for row in rows],
+                           np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32).reshape(-1, dim),
+                           [self._group(row[1]) for row in rows])
+        self._recency = OrderedDict((row[0], None) for row in rows)
+        self._index, self._index_model = index, embed_model
+        return index
+
+    def lookup(self, scope: str, vector: Optional["np.ndarray"]) -> Optional[SemanticHit]:
+        """The cached answer to the most similar earlier prompt, if it is similar enough."""
+        if vector is None or not self.enabled:
+            return None
+        with self._lock:
+            try:
+                index = self._load(len(vector))
+                group = self._groups.get(scope)
+                matches = index.search(vector, 1, group) if group is not None else []
+                if not matches or matches[0][1] < self.threshold:
+                    self.misses += 1
+                    return None
+                key, score = matches[0]
+                conn = self._connect()
+                row = conn.execute("SELECT prompt, response FROM entries WHERE id = ?", (key,)).fetchone()
+                if row is None:
+                    index.remove(key)
+                    self._recency.pop(key, None)
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE entries SET last_used = ? WHERE id = ?", (time.time(), key))
+                conn.commit()
+                self._recency.move_to_end(key)
+                self.hits += 1
+                return SemanticHit(row[1], score, row[0])
+            except sqlite3.Error as e:
+                print(f"Error reading semantic cache: {e}")
+                self.misses += 1
+                return None
+
+    def put(self, scope: str, prompt: str, vector: Optional["np.ndarray"], response: str):
+        """Remember the answer to prompt, evicting the least recently used entries over the limit."""
+        if vector is None or not self.enabled or not response:
+            return
+        with self._lock:
+            try:
+                index = self._load(len(vector))
+                conn = self._connect()
+                cursor = conn.execute(
+                    "INSERT INTO entries (embed_model, scope, prompt, response, vector, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._index_model, scope, prompt, response, vector.astype(np.float32).tobytes(), time.time())
+                )
+                key = cursor.lastrowid
+                index.add(key, vector, self._group(scope))
+                self._recency[key] = None
+                evicted = []
+                while len(self._recency) > self.max_entries:
+                    old, _ = self._recency.popitem(last=False)
+                    index.remove(old)
+                    evicted.append((old,))
+                if evicted:
+                    conn.executemany("DELETE FROM entries WHERE id = ?", evicted)
+                    self.evictions += len(evicted)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing semantic cache: {e}")
+
+    def clear(self):
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM entries")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error clearing semantic cache: {e}")
+            if self._index is not None:
+                self._index.clear()
+            self._recency.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._recency),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global semantic cache instance
+semantic_cache = SemanticCache()
+metrics.register_cache("semantic", semantic_cache.stats)
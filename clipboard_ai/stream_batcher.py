@@ -0,0 +1,118 @@
+# clipboard_ai/stream_batcher.py
+import threading
+import time
+from typing import Callable, List, Optional, Set
+from .config import config
+
+
+class ChunkBatcher:
+    """Collects streamed tokens on the worker thread and emits them in batches.
+
+    Every emit of a worker signal from a pool thread posts a queued event to
+    the GUI thread, so emitting once per token floods the event loop.  Tokens
+    are buffered here and handed to ``emit`` (normally ``stream_chunk.emit``)
+    when ``interval_ms`` has passed since the last batch or ``max_chars`` are
+    waiting.  A token arriving after a quiet period goes out at once, and a
+    shared flusher thread delivers the tail of a batch if the stream stalls.
+    An interval of 0 passes every token straight through.
+    """
+
+    def __init__(self, emit: Callable[[str], None], interval_ms: int = None, max_chars: int = None):
+        self._emit = emit
+        if interval_ms is None:
+            interval_ms = config.get("stream_batch_ms", 33)
+        self.interval = max(0, interval_ms) / 1000
+        self.max_chars = max_chars if max_chars is not None else config.get("stream_batch_chars", 1024)
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+
+    def add(self, text: str) -> None:
+        if not text:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.append(text)
+            self._pending_chars += len(text)
+            if (time.perf_counter() - self._last_emit >= self.interval
+                    or (self.max_chars and self._pending_chars >= self.max_chars)):
+                self._emit_pending()
+                return
+        _flusher.watch(self)
+
+    def flush(self) -> None:
+        """Emit whatever is buffered now."""
+        with self._lock:
+            if self._pending and not self._closed:
+                self._emit_pending()
+
+    def close(self, drop: bool = False) -> None:
+        """Flush (or drop) the buffer and stop emitting. Safe to call more than once."""
+        with self._lock:
+            if self._pending and not self._closed and not drop:
+                self._emit_pending()
+            self._pending.clear()
+            self._pending_chars = 0
+            self._closed = True
+        _flusher.forget(self)
+
+    def _tick(self) -> Optional[float]:
+        """Called by the flusher: emit a stalled tail, or return seconds until it is due."""
+        with self._lock:
+            if self._pending and not self._closed:
+                due = self._last_emit + self.interval - time.perf_counter()
+                if due > 0:
+                    return due
+                self._emit_pending()
+            # Under the lock, so a token added meanwhile re-registers afterwards
+            _flusher.forget(self)
+            return None
+
+    def _emit_pending(self):
+        # Emitting under the lock keeps batches from two threads in order
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._pending_chars = 0
+        self._last_emit = time.perf_counter()
+        self.batches += 1
+        self._emit(text)
+
+
+class _Flusher:
+    """One daemon thread that emits the tails of stalled batches for every batcher."""
+
+    def __init__(self):
+        self._batchers: Set[ChunkBatcher] = set()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def watch(self, batcher: ChunkBatcher):
+        with self._cond:
+            if batcher in self._batchers:
+                return
+            self._batchers.add(batcher)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stream-flusher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def forget(self, batcher: ChunkBatcher):
+        with self._cond:
+            self._batchers.discard(batcher)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._batchers:
+                    self._cond.wait()
+                batchers = list(self._batchers)
+            waits = [wait for wait in (batcher._tick() for batcher in batchers) if wait is not None]
+            if waits:
+                time.sleep(min(waits))
+
+
+_flusher = _Flusher()
@@ -1,7 +1,16 @@
 # clipboard_ai/text_worker.py
+import json
+import time
 from PyQt6.QtCore import QObject, pyqtSignal
 from clipboard_ai.ollama_integration import ollama
+from clipboard_ai.ollama_policy import describe_error
+from clipboard_ai.context_manager import context_manager
 from clipboard_ai.config import config
+from clipboard_ai.response_cache import response_cache
+from clipboard_ai.semantic_cache import semantic_cache
+from clipboard_ai.cancellation import CancellationToken
+from clipboard_ai.stream_batcher import ChunkBatcher
+from clipboard_ai.history_store import history_store
 
 class TextWorker(QObject):
     finished = pyqtSignal()
@@ -9,28 +18,89 @@ class TextWorker(QObject):
     error = pyqtSignal(str)
     stream_chunk = pyqtSignal(str)
 
-    def __init__(self, prompt: str, is_follow_up: bool = False, context: list = None):
+    def __init__(self, prompt: str, is_follow_up: bool = False, context: list = None,
+                 cancel_token: CancellationToken = None, cache_parts: tuple = None):
         super().__init__()
         self.prompt = prompt
         self.is_follow_up = is_follow_up
         self.context = context if context is not None else []
+        self.cancel_token = cancel_token or CancellationToken()
+        # What the semantic cache compares, e.g. (notes, content) instead of the combined prompt
+        self.cache_parts = tuple(cache_parts) if cache_parts else (prompt,)
+
+    def cancel(self):
+        """Stop the generation and close the Ollama stream."""
+        self.cancel_token.cancel()
+
+    def build_messages(self, model: str) -> list:
+        """Chat messages for this request.
+
+        Follow-ups send the conversation as a messages list instead of one
+        flattened prompt, so the rendered history is a stable prefix and Ollama
+        can reuse its KV cache instead of re-running prefill on every turn.
+        The context manager keeps the list inside the model's token budget.
+        """
+        context = self.context if self.is_follow_up else []
+        return context_manager.build_messages(model, context, self.prompt)
 
     def process(self):
+        # Tokens reach the GUI thread in batches, not one queued signal each
+        batcher = ChunkBatcher(self.stream_chunk.emit)
+        started = time.perf_counter()
+        kind = "follow_up" if self.is_follow_up else "text"
         try:
-            # If it is a follow-up and context exists, build a composite prompt
-            if self.is_follow_up and self.context:
-                context_str = "\n".join([
-                    f"{'User' if role == 'user' else 'Assistant'}: {content}"
-                    for content, role in self.context
-                ])
-                self.prompt = f"{context_str}\n\nUser: {self.prompt}\n\nAssistant: Let me help you with that follow-up question."
+            model = config.get("selected_model")
+            messages = self.build_messages(model)
+            options = context_manager.options_for(model)
+            cache_key = response_cache.make_key(model, options, json.dumps(messages))
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                # Replay the cached answer through the normal streaming path
+                batcher.add(cached)
+                batcher.close()
+                history_store.add(kind, self.prompt, model, cached.strip(), total_s=time.perf_counter() - started)
+                self.result_ready.emit(cached.strip())
+                return
+            # Follow-ups depend on the conversation, so only first questions are matched by meaning
+            vector = None if self.is_follow_up else semantic_cache.embed(*self.cache_parts)
+            scope = model if len(self.cache_parts) == 1 else f"{model}|notes"
+            similar = semantic_cache.lookup(scope, vector)
+            if similar is not None:
+                print(f"Semantic cache hit (similarity {similar.score:.3f})")
+                batcher.add(similar.response)
+                batcher.close()
+                history_store.add(kind, self.prompt, model, similar.response.strip(),
+                                  total_s=time.perf_counter() - started)
+                self.result_ready.emit(similar.response.strip())
+                return
             full_response = ""
+            first_text = None
             # Stream the response from Ollama in a non-blocking way
-            for chunk in ollama.generate_stream(self.prompt):
-                full_response += chunk
-                self.stream_chunk.emit(chunk)
+            response = ollama.chat(
+                model=model,
+                messages=messages,
+                stream=True,
+                options=options,
+                cancel_token=self.cancel_token
+            )
+            for chunk in response:
+                text = chunk.text
+                if text:
+                    if first_text is None:
+                        first_text = time.perf_counter() - started
+                    full_response += text
+                    batcher.add(text)
+            if self.cancel_token.cancelled:
+                return
+            batcher.close()
+            response_cache.put(cache_key, model, full_response)
+            semantic_cache.put(scope, self.prompt, vector, full_response)
+            history_store.add(kind, self.prompt, model, full_response.strip(),
+                              ttft_s=first_text, total_s=time.perf_counter() - started)
             self.result_ready.emit(full_response.strip())
         except Exception as e:
-            self.error.emit(str(e))
+            batcher.close()
+            self.error.emit(describe_error(e))
         finally:
+            batcher.close(drop=True)
             self.finished.emit()
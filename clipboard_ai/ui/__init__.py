@@ -1,6 +1,19 @@
 """UI components for the Clipboard AI application."""
 
-from .tray import SystemTray
-from .settings_dialog import SettingsDialog
+import importlib
 
-__all__ = ["SystemTray", "SettingsDialog"] 
\ No newline at end of file
+# Dialogs are imported on first access so that the tray can come up quickly
+_MODULES = {
+    "SystemTray": ".tray",
+    "SettingsDialog": ".settings_dialog",
+    "MetricsDialog": ".metrics_dialog",
+    "HistoryDialog": ".history_dialog",
+}
+
+__all__ = ["SystemTray", "SettingsDialog", "MetricsDialog", "HistoryDialog"]
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        return getattr(importlib.import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,429 @@
+import itertools
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex, QPersistentModelIndex, QRect, QRectF, QSize,
+                          QBuffer, QByteArray, QIODevice, QEvent)
+from PyQt6.QtGui import (QColor, QFont, QImage, QPainter, QPainterPath, QPen, QPixmap,
+                         QPixmapCache, QTextCursor, QTextDocument, QTextOption, QPalette, QAbstractTextDocumentLayout)
+from PyQt6.QtWidgets import QApplication, QFrame, QListView, QStyledItemDelegate, QAbstractItemView, QTextEdit
+
+THUMBNAIL_SIZE = QSize(400, 300)  # Box images are shown in, as before
+
+
+def make_thumbnail(image: QImage) -> Tuple[bytes, QSize]:
+    """Downscale an image to the chat thumbnail size and JPEG-encode it."""
+    if image is None or image.isNull():
+        return b"", QSize()
+    if image.width() > THUMBNAIL_SIZE.width() or image.height() > THUMBNAIL_SIZE.height():
+        image = image.scaled(
+            THUMBNAIL_SIZE,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPG", 85)
+    buffer.close()
+    return data.data(), image.size()
+
+
+class _Message:
+    __slots__ = ("id", "text", "is_user", "thumbnail", "thumbnail_size", "revision", "appended_from")
+
+    def __init__(self, message_id: int, text: str, is_user: bool, thumbnail: bytes, thumbnail_size: QSize):
+        self.id = message_id
+        self.text = text
+        self.is_user = is_user
+        self.thumbnail = thumbnail  # JPEG bytes; decoded on demand through QPixmapCache
+        self.thumbnail_size = thumbnail_size
+        self.revision = 0
+        self.appended_from = -1  # Text length before the latest append, -1 after a replace
+
+
+class ChatMessageModel(QAbstractListModel):
+    """Chat history as a flat list of messages.
+
+    Images are kept only as small JPEG thumbnails; decoded pixmaps live in the
+    global, size-bounded QPixmapCache, so memory does not grow with the number
+    of images in the conversation.
+    """
+    IsUserRole = Qt.ItemDataRole.UserRole + 1
+    ThumbnailRole = Qt.ItemDataRole.UserRole + 2
+    ThumbnailSizeRole = Qt.ItemDataRole.UserRole + 3
+    KeyRole = Qt.ItemDataRole.UserRole + 4  # (id, revision) of the message text
+    AppendedFromRole = Qt.ItemDataRole.UserRole + 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._messages: List[_Message] = []
+        self._ids = itertools.count()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._messages)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._messages):
+            return None
+        message = self._messages[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return message.text
+        if role == self.IsUserRole:
+            return message.is_user
+        if role == self.ThumbnailRole:
+            return self._pixmap(message)
+        if role == self.ThumbnailSizeRole:
+            return message.thumbnail_size
+        if role == self.KeyRole:
+            return (message.id, message.revision)
+        if role == self.AppendedFromRole:
+            return message.appended_from
+        return None
+
+    @staticmethod
+    def _pixmap_key(message: _Message) -> str:
+        return f"clipboard_ai-chat-{message.id}"
+
+    def _pixmap(self, message: _Message) -> Optional[QPixmap]:
+        if not message.thumbnail:
+            return None
+        key = self._pixmap_key(message)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QPixmap()
+            pixmap.loadFromData(message.thumbnail, "JPG")
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def _row(self, message_id: int) -> int:
+        # Messages are only ever appended, so ids are consecutive within the list
+        if not self._messages:
+            return -1
+        row = message_id - self._messages[0].id
+        return row if 0 <= row < len(self._messages) else -1
+
+    def add_message(self, text: str, is_user: bool = True, image: QImage = None) -> "MessageHandle":
+        thumbnail, thumbnail_size = make_thumbnail(image)
+        message = _Message(next(self._ids), text or "", is_user, thumbnail, thumbnail_size)
+        row = len(self._messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._messages.append(message)
+        self.endInsertRows()
+        return MessageHandle(self, message.id)
+
+    def _update(self, message_id: int, text: str, append: bool):
+        row = self._row(message_id)
+        if row < 0:
+            return
+        message = self._messages[row]
+        message.appended_from = len(message.text) if append else -1
+        message.text = message.text + text if append else text
+        message.revision += 1
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def set_text(self, message_id: int, text: str):
+        self._update(message_id, text, append=False)
+
+    def append_text(self, message_id: int, text: str):
+        self._update(message_id, text, append=True)
+
+    def text(self, message_id: int) -> str:
+        row = self._row(message_id)
+        return self._messages[row].text if row >= 0 else ""
+
+    def history(self) -> List[Tuple[str, bool, bytes]]:
+        """(text, is_user, JPEG thumbnail) for every message."""
+        return [(m.text, m.is_user, m.thumbnail) for m in self._messages]
+
+    def clear(self):
+        self.beginResetModel()
+        for message in self._messages:
+            if message.thumbnail:
+                QPixmapCache.remove(self._pixmap_key(message))
+        self._messages.clear()
+        self.endResetModel()
+
+
+class MessageHandle:
+    """A message in the model, used where callers previously held the message widget."""
+
+    def __init__(self, model: ChatMessageModel, message_id: int):
+        self.model = model
+        self.message_id = message_id
+
+    def setText(self, text: str):
+        self.model.set_text(self.message_id, text)
+
+    def append_text(self, text: str):
+        self.model.append_text(self.message_id, text)
+
+    def text(self) -> str:
+        return self.model.text(self.message_id)
+
+
+class ChatMessageDelegate(QStyledItemDelegate):
+    """Paints a message bubble: role header, copy button, thumbnail and text.
+
+    Text layouts are cached per (message, revision, width) for the rows on
+    screen only; every other row just keeps its height, so relayouts after a
+    streamed append do not re-wrap the rest of the history.  Painted text
+    cannot be selected, so the view opens a read-only text editor (see
+    ``createEditor``) over the text of the row under the mouse.
+    """
+    MARGIN = QSize(4, 3)        # Outside the bubble
+    PADDING = QSize(15, 12)     # Inside the bubble
+    HEADER_HEIGHT = 24
+    SPACING = 8
+    TEXT_PADDING = 8
+    COPY_SIZE = QSize(76, 24)
+    MAX_DOCUMENTS = 32
+
+    def __init__(self, view: QListView):
+        super().__init__(view)
+        self.view = view
+        self.text_font = QFont(view.font())
+        self.text_font.setPixelSize(13)
+        self.label_font = QFont(view.font())
+        self.label_font.setPixelSize(12)
+        self.label_font.setWeight(QFont.Weight.Medium)
+        self._documents: "OrderedDict[tuple, QTextDocument]" = OrderedDict()
+        self._heights: Dict[int, Tuple[int, int, int]] = {}  # message id -> (revision, width, height)
+
+    def clear_cache(self):
+        self._documents.clear()
+        self._heights.clear()
+
+    def _bubble(self, rect: QRect) -> QRect:
+        return rect.adjusted(self.MARGIN.width(), self.MARGIN.height(), -self.MARGIN.width(), -self.MARGIN.height())
+
+    def _text_width(self, width: int) -> int:
+        return max(50, width - 2 * (self.MARGIN.width() + self.PADDING.width() + self.TEXT_PADDING))
+
+    def _document(self, key: tuple, text: str, width: int, appended_from: int = -1) -> QTextDocument:
+        cache_key = (key, width)
+        document = self._documents.get(cache_key)
+        if document is not None:
+            self._documents.move_to_end(cache_key)
+            return document
+        if appended_from >= 0:
+            # Streaming: extend the previous revision's layout instead of re-wrapping everything
+            message_id, revision = key
+            previous = self._documents.pop(((message_id, revision - 1), width), None)
+            if previous is not None and previous.characterCount() - 1 == appended_from:
+                cursor = QTextCursor(previous)
+                cursor.movePosition(QTextCursor.MoveOperation.End)
+                cursor.insertText(text[appended_from:])
+                self._documents[cache_key] = previous
+                return previous
+        document = QTextDocument()
+        document.setDocumentMargin(0)
+        document.setDefaultFont(self.text_font)
+        option = QTextOption()
+        option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        document.setDefaultTextOption(option)
+        document.setPlainText(text)
+        document.setTextWidth(width)
+        self._documents[cache_key] = document
+        while len(self._documents) > self.MAX_DOCUMENTS:
+            self._documents.popitem(last=False)
+        return document
+
+    def _text_height(self, index, width: int) -> int:
+        key = index.data(ChatMessageModel.KeyRole)
+        message_id, revision = key
+        cached = self._heights.get(message_id)
+        if cached is not None and cached[:2] == (revision, width):
+            return cached[2]
+        document = self._document(key, index.data() or "", width, index.data(ChatMessageModel.AppendedFromRole))
+        height = int(document.size().height() + 0.999)
+        self._heights[message_id] = (revision, width, height)
+        return height
+
+    def _layout(self, index, width: int):
+        """Heights of the pieces of a row: (image height, text height, total)."""
+        text_height = self._text_height(index, self._text_width(width))
+        thumbnail_size = index.data(ChatMessageModel.ThumbnailSizeRole)
+        image_height = thumbnail_size.height() + 10 if thumbnail_size and thumbnail_size.isValid() else 0
+        total = (2 * (self.MARGIN.height() + self.PADDING.height()) + self.HEADER_HEIGHT + self.SPACING
+                 + image_height + text_height + 2 * self.TEXT_PADDING)
+        return image_height, text_height, total
+
+    def sizeHint(self, option, index):
+        width = self.view.viewport().width()
+        return QSize(width, self._layout(index, width)[2])
+
+    def text_rect(self, rect: QRect, image_height: int, text_height: int) -> QRect:
+        bubble = self._bubble(rect)
+        top = bubble.top() + self.PADDING.height() + self.HEADER_HEIGHT + self.SPACING + image_height
+        return QRect(bubble.left() + self.PADDING.width() + self.TEXT_PADDING, top + self.TEXT_PADDING,
+                     self._text_width(rect.width()), text_height)
+
+    def copy_rect(self, rect: QRect) -> QRect:
+        bubble = self._bubble(rect)
+        return QRect(
+            bubble.right() - self.PADDING.width() - self.COPY_SIZE.width(),
+            bubble.top() + self.PADDING.height(),
+            self.COPY_SIZE.width(),
+            self.COPY_SIZE.height()
+        )
+
+    def paint(self, painter: QPainter, option, index):
+        is_user = bool(index.data(ChatMessageModel.IsUserRole))
+        rect = option.rect
+        bubble = self._bubble(rect)
+        image_height, text_height, _ = self._layout(index, rect.width())
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(bubble), 8, 8)
+        if is_user:
+            painter.fillPath(path, QColor(124, 124, 255, 26))
+        else:
+            painter.fillPath(path, QColor("#252535"))
+            painter.setPen(QPen(QColor(255, 255, 255, 26), 1))
+            painter.drawPath(path)
+
+        # Header: role icon and label on the left, copy button on the right
+        left = bubble.left() + self.PADDING.width()
+        top = bubble.top() + self.PADDING.height()
+        header = QRect(left, top, bubble.width() - 2 * self.PADDING.width(), self.HEADER_HEIGHT)
+        painter.setFont(self.text_font)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(header, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, "👤" if is_user else "🤖")
+        painter.setFont(self.label_font)
+        painter.setPen(QColor("#a0a0a0"))
+        painter.drawText(header.adjusted(26, 0, 0, 0), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         "You" if is_user else "Assistant")
+        copy = self.copy_rect(rect)
+        painter.setPen(QPen(QColor(124, 124, 255, 128), 1))
+        painter.drawRoundedRect(QRectF(copy).adjusted(0.5, 0.5, -0.5, -0.5), 4, 4)
+        painter.setPen(QColor("#7c7cff"))
+        painter.drawText(copy, Qt.AlignmentFlag.AlignCenter, "📋 Copy")
+
+        y = top + self.HEADER_HEIGHT + self.SPACING
+        if image_height:
+            pixmap = index.data(ChatMessageModel.ThumbnailRole)
+            if pixmap is not None:
+                x = bubble.left() + (bubble.width() - pixmap.width()) // 2
+                painter.drawPixmap(x, y, pixmap)
+            y += image_height
+
+        # Only rows on screen get here, so only they keep a text layout; a row
+        # with a selectable editor open has its text drawn by the editor
+        text = index.data() or ""
+        if text and self.view.indexWidget(index) is None:
+            text_rect = self.text_rect(rect, image_height, text_height)
+            document = self._document(index.data(ChatMessageModel.KeyRole), text, text_rect.width(),
+                                      index.data(ChatMessageModel.AppendedFromRole))
+            origin_x, origin_y = text_rect.left(), text_rect.top()
+            # Long answers are taller than the view; only lay out and draw the visible lines
+            visible = QRectF(self.view.viewport().rect()).translated(-origin_x, -origin_y)
+            clip = QRectF(0, 0, text_rect.width(), text_height).intersected(visible)
+            painter.translate(origin_x, origin_y)
+            context = QAbstractTextDocumentLayout.PaintContext()
+            context.palette.setColor(QPalette.ColorRole.Text, QColor("#ffffff"))
+            context.clip = clip
+            painter.setClipRect(clip)
+            document.documentLayout().draw(painter, context)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self.copy_rect(option.rect).contains(event.position().toPoint())):
+            QApplication.clipboard().setText(index.data() or "")
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        """A read-only editor laid out like the painted text, so part of a message can be selected."""
+        editor = QTextEdit(parent)
+        editor.setObjectName("chatSelectableText")
+        editor.setReadOnly(True)
+        editor.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse
+                                       | Qt.TextInteractionFlag.TextSelectableByKeyboard)
+        editor.setFrameShape(QFrame.Shape.NoFrame)
+        editor.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        editor.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        # Override the dialog's QTextEdit style so the text sits exactly where it was painted
+        editor.setStyleSheet(f"""
+            #chatSelectableText {{
+                background: transparent;
+                border: none;
+                padding: 0px;
+                color: #ffffff;
+                selection-background-color: rgba(124, 124, 255, 0.3);
+                font-family: "{self.text_font.family()}";
+                font-size: 13px;
+            }}
+        """)
+        editor.setFont(self.text_font)
+        editor.document().setDocumentMargin(0)
+        editor.setWordWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        return editor
+
+    def setEditorData(self, editor, index):
+        text = index.data() or ""
+        appended_from = index.data(ChatMessageModel.AppendedFromRole)
+        document = editor.document()
+        if 0 <= appended_from == document.characterCount() - 1:
+            # Streaming into the open row: append, keeping the user's selection
+            cursor = QTextCursor(document)
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text[appended_from:])
+        elif editor.toPlainText() != text:
+            editor.setPlainText(text)
+
+    def setModelData(self, editor, model, index):
+        pass  # Read-only
+
+    def updateEditorGeometry(self, editor, option, index):
+        image_height, text_height, _ = self._layout(index, option.rect.width())
+        editor.setGeometry(self.text_rect(option.rect, image_height, text_height))
+
+
+class ChatListView(QListView):
+    """List view for the chat; only visible rows are painted."""
+
+    def __init__(self, model: ChatMessageModel, parent=None):
+        super().__init__(parent)
+        self.setObjectName("chatView")
+        self.setModel(model)
+        self.delegate = ChatMessageDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setUniformItemSizes(False)
+        self.setSpacing(0)
+        # The row under the mouse gets a selectable editor over its text
+        self.setMouseTracking(True)
+        self._selectable = QPersistentModelIndex()
+        model.modelReset.connect(self.delegate.clear_cache)
+        # A row whose text changed needs a new height
+        model.dataChanged.connect(lambda top_left, bottom_right, roles=None: self.delegate.sizeHintChanged.emit(top_left))
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        if event.buttons() == Qt.MouseButton.NoButton:
+            self._open_selectable(self.indexAt(event.position().toPoint()))
+
+    def _open_selectable(self, index: QModelIndex):
+        """Move the selectable editor to index, unless the user has text selected in it."""
+        if not index.isValid() or index == QModelIndex(self._selectable) or not index.data():
+            return
+        if self._selectable.isValid():
+            current = QModelIndex(self._selectable)
+            editor = self.indexWidget(current)
+            if editor is not None and editor.textCursor().hasSelection():
+                return
+            self.closePersistentEditor(current)
+        self._selectable = QPersistentModelIndex(index)
+        self.openPersistentEditor(index)
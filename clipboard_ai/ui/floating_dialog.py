@@ -3,6 +3,8 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QSplitter, QWidget, QScrollArea, QSizePolicy)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QSize
 from PyQt6.QtGui import QScreen, QColor, QPalette, QIcon, QImage, QPixmap
+from .stream_renderer import StreamRenderer
+from .chat_view import ChatMessageModel, ChatListView
 
 class TitleBar(QFrame):
     def __init__(self, parent=None):
@@ -114,81 +116,6 @@ class ThinkingWidget(QWidget):
         self.thinking_icon.setText("❌")
         self.thinking_label.setText("Error")
 
-class ChatMessage(QFrame):
-    def __init__(self, is_user=True, parent=None):
-        super().__init__(parent)
-        self.setObjectName("userMessage" if is_user else "assistantMessage")
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(15, 12, 15, 12)
-        layout.setSpacing(8)
-        
-        # Add header with role label and copy button
-        header = QHBoxLayout()
-        header.setSpacing(10)
-        
-        role_icon = QLabel("👤" if is_user else "🤖")
-        role_icon.setObjectName("roleIcon")
-        header.addWidget(role_icon)
-        
-        role_label = QLabel("You" if is_user else "Assistant")
-        role_label.setObjectName("roleLabel")
-        header.addWidget(role_label)
-        
-        header.addStretch()
-        
-        copy_btn = QPushButton("📋 Copy")
-        copy_btn.setObjectName("copyButton")
-        copy_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        copy_btn.clicked.connect(self.copy_content)
-        header.addWidget(copy_btn)
-        
-        layout.addLayout(header)
-        
-        # Content container
-        content_layout = QVBoxLayout()
-        content_layout.setSpacing(10)
-        
-        # Image preview (if any)
-        self.image_label = QLabel()
-        self.image_label.setObjectName("messageImage")
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.image_label.hide()
-        content_layout.addWidget(self.image_label)
-        
-        # Text content
-        self.content = QLabel()
-        self.content.setObjectName("messageContent")
-        self.content.setWordWrap(True)
-        self.content.setTextFormat(Qt.TextFormat.PlainText)
-        self.content.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-        content_layout.addWidget(self.content)
-        
-        layout.addLayout(content_layout)
-
-    def copy_content(self):
-        """Copy message content to clipboard."""
-        clipboard = QApplication.clipboard()
-        clipboard.setText(self.content.text())
-        
-    def setText(self, text):
-        """Set the message content."""
-        self.content.setText(text)
-
-    def setImage(self, image: QImage):
-        """Set the image content."""
-        if image:
-            # Scale the image to fit while maintaining aspect ratio
-            pixmap = QPixmap.fromImage(image)
-            scaled_pixmap = pixmap.scaled(
-                400, 300,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap)
-            self.image_label.show()
-            QApplication.processEvents()
-
 class ChatWidget(QFrame):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -198,23 +125,16 @@ class ChatWidget(QFrame):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
         
-        # Scroll area for messages
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.scroll.setObjectName("chatScroll")
+        # Messages live in a model; the view only renders the rows on screen
+        self.model = ChatMessageModel(self)
+        self.view = ChatListView(self.model)
+        layout.addWidget(self.view)
         
-        # Container for messages
-        self.messages_widget = QWidget()
-        self.messages_widget.setObjectName("messagesContainer")
-        self.messages_layout = QVBoxLayout(self.messages_widget)
-        self.messages_layout.setContentsMargins(4,5,4,5)
-        self.messages_layout.setSpacing(6)  # Space between messages
-        self.messages_layout.addStretch()
-        
-        self.scroll.setWidget(self.messages_widget)
-        layout.addWidget(self.scroll)
+        # Keep following new content while the view is at the bottom
+        self.stick_to_bottom = True
+        scrollbar = self.view.verticalScrollBar()
+        scrollbar.rangeChanged.connect(self._on_scroll_range_changed)
+        scrollbar.valueChanged.connect(self._on_scroll_value_changed)
         
         # Follow-up input area
         input_container = QWidget()
@@ -236,52 +156,35 @@ class ChatWidget(QFrame):
         
         layout.addWidget(input_container)
         
-        # Store message history
-        self.message_history = []
+    @property
+    def message_history(self):
+        """(text, is_user, JPEG thumbnail) for every message."""
+        return self.model.history()
 
     def add_message(self, text, is_user=True, image=None):
-        msg = ChatMessage(is_user)
-        msg.setText(text)
-        if image:
-            msg.setImage(image)
-        # Insert before the stretch at the end
-        self.messages_layout.insertWidget(self.messages_layout.count() - 1, msg)
-        self.message_history.append((text, is_user, image))
+        """Append a message; returns a handle that supports setText/append_text."""
+        message = self.model.add_message(text, is_user, image)
         
         # Scroll to bottom
         QTimer.singleShot(100, self.scroll_to_bottom)
-        return msg
-    
-    def restore_history(self):
-        """Restore chat history from stored messages."""
-        self.clear_history()
-        for text, is_user, image in self.message_history:
-            msg = ChatMessage(is_user)
-            msg.setText(text)
-            if image:
-                msg.setImage(image)
-            self.messages_layout.insertWidget(self.messages_layout.count() - 1, msg)
+        return message
 
     def scroll_to_bottom(self):
         """Scroll to the bottom of the chat."""
-        scrollbar = self.scroll.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self.view.scrollToBottom()
+
+    def _on_scroll_range_changed(self, minimum, maximum):
+        if self.stick_to_bottom:
+            self.view.verticalScrollBar().setValue(maximum)
+
+    def _on_scroll_value_changed(self, value):
+        # Scrolling up to read stops the view from jumping while text streams in
+        self.stick_to_bottom = value >= self.view.verticalScrollBar().maximum() - 4
     
     def clear_history(self):
         """Clear the chat history."""
-        while self.messages_layout.count() > 1:  # Keep the stretch
-            item = self.messages_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        self.message_history.clear()
-    
-    def restore_history(self):
-        """Restore chat history from stored messages."""
-        self.clear_history()
-        for text, is_user in self.message_history:
-            msg = ChatMessage(is_user)
-            msg.setText(text)
-            self.messages_layout.insertWidget(self.messages_layout.count() - 1, msg)
+        self.model.clear()
+        self.stick_to_bottom = True
 
     def get_stylesheet(self):
         return """
@@ -289,13 +192,10 @@ class ChatWidget(QFrame):
                 background: #1e1e2e;
                 border-radius: 8px;
             }
-            #chatScroll {
-                background: transparent;
+            #chatView {
+                background: #1e1e2e;
                 border: none;
             }
-            #messagesContainer {
-                background: transparent;
-            }
             #inputContainer {
                 background: #252535;
                 border-top: 1px solid rgba(255, 255, 255, 0.1);
@@ -383,6 +283,8 @@ class FloatingDialog(QDialog):
         self.setup_animations()
         
         self.text_updated.connect(self._update_streaming_text)
+        # Streamed chunks are buffered and appended at most 30 times a second
+        self.stream_renderer = StreamRenderer(fps=30, parent=self)
         self.current_text = ""
         self.current_assistant_message = None
         self.resize(800, 600)  # Set a larger default size
@@ -616,6 +518,10 @@ class FloatingDialog(QDialog):
                 border: none;
                 background: transparent;
             }
+            #chatView {
+                background: #1e1e2e;
+                border: none;
+            }
         """
 
     def set_thinking_content(self, thinking_text: str):
@@ -643,29 +549,26 @@ class FloatingDialog(QDialog):
                 self.current_text = ""
             return
             
-        # If we have an existing message, append to it
-        if hasattr(self, 'current_assistant_message') and self.current_assistant_message:
-            # Get current text and append new chunk
-            current = self.current_assistant_message.content.text()
-            updated_text = current + text
-            
-            # Update the message
-            self.current_assistant_message.content.setText(updated_text)
-            self.current_text = updated_text
-        else:
+        if self.current_assistant_message is None:
             # Only create a new assistant message if we have actual content
-            if text.strip():
-                self.current_text = text
-                self.current_assistant_message = self.chat_widget.add_message(text, is_user=False)
-            else:
+            if not text.strip():
                 # Just store the text without creating a message yet
                 self.current_text = text
-            
-        # Process events to keep UI responsive without recursive repaints
-        QApplication.processEvents()
-        
-        # Scroll to bottom without forcing a repaint
-        self.chat_widget.scroll_to_bottom()
+                return
+            self.current_text = ""
+            self.current_assistant_message = self.chat_widget.add_message("", is_user=False)
+        self._stream_to_current(text)
+
+    def _stream_to_current(self, text: str):
+        """Queue text for the current assistant message; the renderer appends it on its next frame."""
+        if self.stream_renderer.target is not self.current_assistant_message:
+            self.stream_renderer.attach(self.current_assistant_message)
+        self.current_text += text
+        self.stream_renderer.feed(text)
+
+    def finish_streaming(self):
+        """Render anything still buffered."""
+        self.stream_renderer.flush()
 
     def _update_streaming_text(self, new_text: str):
         """Update the text display with streaming content."""
@@ -673,17 +576,15 @@ class FloatingDialog(QDialog):
             # Remove leading/trailing whitespace only for the first chunk
             if not self.current_text:
                 new_text = new_text.lstrip()
-            self.current_text += new_text
             
             # Create assistant message if it doesn't exist yet and we have content
-            if not self.current_assistant_message and self.current_text.strip():
+            if not self.current_assistant_message and (self.current_text + new_text).strip():
                 self.current_assistant_message = self.chat_widget.add_message("", is_user=False)
                 
             if self.current_assistant_message:
-                self.current_assistant_message.content.setText(self.current_text)
-                self.chat_widget.scroll_to_bottom()
-                # Process events to keep UI responsive
-                QApplication.processEvents()
+                self._stream_to_current(new_text)
+            else:
+                self.current_text += new_text
 
     def handle_follow_up(self):
         """Handle follow-up question submission."""
@@ -864,6 +765,9 @@ class FloatingDialog(QDialog):
 
     def clear_chat(self):
         """Clear the chat history and reset the dialog."""
+        # Drop buffered chunks before their message widget goes away
+        self.stream_renderer.reset()
+        
         # Clear chat history
         self.chat_widget.clear_history()
         
@@ -0,0 +1,191 @@
+# clipboard_ai/ui/history_dialog.py
+
+import time
+from typing import List, Optional
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QListView,
+    QPushButton, QSplitter, QTextEdit, QApplication
+)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, pyqtSignal
+from ..history_store import HistoryEntry, history_store
+
+
+class HistoryListModel(QAbstractListModel):
+    """History entries for a query, fetched from the store one page at a time.
+
+    Qt calls ``fetchMore`` as the view scrolls towards the end, so only the
+    pages the user actually looks at are ever read.
+    """
+    EntryRole = Qt.ItemDataRole.UserRole + 1
+
+    PAGE_SIZE = 50
+
+    def __init__(self, store=None, parent=None):
+        super().__init__(parent)
+        self.store = store or history_store
+        self.query = ""
+        self._entries: List[HistoryEntry] = []
+        self._exhausted = False
+
+    def set_query(self, query: str):
+        self.beginResetModel()
+        self.query = query.strip()
+        self._entries = []
+        self._exhausted = False
+        self.endResetModel()
+        # Fill the first page right away rather than on the view's first layout
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        before = self._entries[-1].id if self._entries else None
+        page = self.store.page(self.query, before_id=before, limit=self.PAGE_SIZE)
+        if len(page) < self.PAGE_SIZE:
+            self._exhausted = True
+        if page:
+            start = len(self._entries)
+            self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+            self._entries.extend(page)
+            self.endInsertRows()
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.created))
+            source = " ".join(entry.source.split())
+            return f"{stamp}  [{entry.kind}]  {source[:120]}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return entry.model
+        if role == self.EntryRole:
+            return entry
+        return None
+
+    def entry(self, row: int) -> Optional[HistoryEntry]:
+        return self._entries[row] if 0 <= row < len(self._entries) else None
+
+
+class HistoryDialog(QDialog):
+    """
+    Browse and search past clipboard items and their answers.
+    Results load page by page as the list is scrolled, and reload when the
+    history writer lands new entries while the dialog is open.
+    """
+    history_changed = pyqtSignal()  # Emitted from the history writer thread
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Clipboard AI History")
+        self.resize(900, 560)
+        self.model = HistoryListModel(parent=self)
+        self.init_ui()
+
+        # Search once typing pauses instead of on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.refresh)
+        self.search_input.textChanged.connect(lambda _text: self.search_timer.start())
+        self.history_changed.connect(self.refresh)
+        self._on_history_written = self.history_changed.emit  # The same callable to add and remove
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search clipboard items and answers...")
+        self.search_input.setClearButtonEnabled(True)
+        layout.addWidget(self.search_input)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.selectionModel().currentChanged.connect(self.show_entry)
+        splitter.addWidget(self.list_view)
+
+        self.detail = QTextEdit()
+        self.detail.setReadOnly(True)
+        splitter.addWidget(self.detail)
+        splitter.setSizes([450, 450])
+        layout.addWidget(splitter)
+
+        # ===== Buttons =====
+        button_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        copy_button = QPushButton("Copy Answer")
+        clear_button = QPushButton("Clear History")
+        close_button = QPushButton("Close")
+
+        copy_button.clicked.connect(self.copy_answer)
+        clear_button.clicked.connect(self.clear_history)
+        close_button.clicked.connect(self.close)
+
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        button_layout.addWidget(copy_button)
+        button_layout.addWidget(clear_button)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        """Re-run the search over what is on disk, keeping the selected entry if it is still listed."""
+        selected = self.model.entry(self.list_view.currentIndex().row())
+        started = time.perf_counter()
+        self.model.set_query(self.search_input.text())
+        elapsed = (time.perf_counter() - started) * 1000
+        self.status_label.setText(f"{self.model.rowCount()}{'+' if self.model.canFetchMore() else ''} "
+                                  f"results in {elapsed:.0f} ms")
+        for row in range(self.model.rowCount()):
+            if selected is not None and self.model.entry(row).id == selected.id:
+                self.list_view.setCurrentIndex(self.model.index(row))
+                return
+        self.detail.clear()
+
+    def show_entry(self, current: QModelIndex, _previous: QModelIndex = None):
+        entry = self.model.entry(current.row())
+        if entry is None:
+            self.detail.clear()
+            return
+        parts = [f"Model: {entry.model}"]
+        if entry.total_s is not None:
+            timing = f"Took {entry.total_s:.1f}s"
+            if entry.ttft_s is not None:
+                timing += f", first text after {entry.ttft_s:.2f}s"
+            parts.append(timing)
+        parts.append("")
+        parts.append("=== Clipboard ===")
+        parts.append(entry.source)
+        if entry.prompt:
+            parts += ["", "=== Notes ===", entry.prompt]
+        parts += ["", "=== Answer ===", entry.response]
+        self.detail.setPlainText("\n".join(parts))
+
+    def copy_answer(self):
+        entry = self.model.entry(self.list_view.currentIndex().row())
+        if entry is not None:
+            QApplication.clipboard().setText(entry.response)
+
+    def clear_history(self):
+        # Runs on the writer thread; history_changed refreshes the list once it is done
+        history_store.clear()
+        self.status_label.setText("Clearing history...")
+
+    def showEvent(self, event):
+        history_store.add_listener(self._on_history_written)
+        self.refresh()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        history_store.remove_listener(self._on_history_written)
+        super().hideEvent(event)
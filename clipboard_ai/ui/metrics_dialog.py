@@ -0,0 +1,169 @@
+# clipboard_ai/ui/metrics_dialog.py
+
+import time
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGroupBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QApplication
+)
+from PyQt6.QtCore import Qt, QTimer
+from ..metrics import metrics
+
+
+def _ms(value) -> str:
+    return f"{value * 1000:.0f}" if value is not None else "-"
+
+
+def _rate(value) -> str:
+    return f"{value:.1f}" if value is not None else "-"
+
+
+class MetricsDialog(QDialog):
+    """
+    Performance window: per-model summary and the most recent Ollama requests
+    with queue wait, connect time, time to first token and tokens per second,
+    plus scheduler and cache counters.
+    The data can be exported as JSON or Prometheus text.
+    """
+
+    COLUMNS = ["Time", "Endpoint", "Model", "Status", "Queue ms", "Connect ms",
+               "TTFT ms", "Total ms", "Tokens", "Tok/s", "Prompt eval ms", "Eval ms"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Clipboard AI Performance")
+        self.resize(900, 480)
+        self.init_ui()
+
+        # Refresh while open so running requests show up
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(2000)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        # ===== Summary =====
+        summary_group = QGroupBox("Summary (per model)")
+        summary_layout = QVBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        summary_layout.addWidget(self.summary_label)
+        self.queue_label = QLabel()
+        self.queue_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        summary_layout.addWidget(self.queue_label)
+        self.cache_label = QLabel()
+        self.cache_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        summary_layout.addWidget(self.cache_label)
+        summary_group.setLayout(summary_layout)
+        layout.addWidget(summary_group)
+
+        # ===== Recent requests =====
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+
+        # ===== Buttons =====
+        button_layout = QHBoxLayout()
+        json_button = QPushButton("Export JSON")
+        prometheus_button = QPushButton("Export Prometheus")
+        copy_button = QPushButton("Copy Prometheus")
+        clear_button = QPushButton("Clear")
+        close_button = QPushButton("Close")
+
+        json_button.clicked.connect(lambda: self.export("json"))
+        prometheus_button.clicked.connect(lambda: self.export("prometheus"))
+        copy_button.clicked.connect(lambda: QApplication.clipboard().setText(metrics.to_prometheus()))
+        clear_button.clicked.connect(self.clear)
+        close_button.clicked.connect(self.close)
+
+        for button in (json_button, prometheus_button, copy_button, clear_button):
+            button_layout.addWidget(button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        """Reload the summary and table from the metrics buffer."""
+        summary = metrics.summary()
+        if summary:
+            self.summary_label.setText("\n".join(
+                f"{model}: {s['requests']} requests, {s['errors']} errors, "
+                f"TTFT p50 {_ms(s['ttft_p50_s'])} ms / p95 {_ms(s['ttft_p95_s'])} ms, "
+                f"{_rate(s['tokens_per_s_p50'])} tok/s, "
+                f"queue p95 {_ms(s['queue_wait_p95_s'])} ms, connect p95 {_ms(s['connect_p95_s'])} ms"
+                for model, s in summary.items()
+            ))
+        else:
+            self.summary_label.setText("No requests recorded yet.")
+
+        queue = metrics.queue_summary()
+        waits = ", ".join(
+            f"{priority} wait p50 {_ms(queue.get(f'{priority}_wait_p50_s'))} ms / "
+            f"p95 {_ms(queue.get(f'{priority}_wait_p95_s'))} ms"
+            for priority in ("interactive", "background") if f"{priority}_wait_p50_s" in queue
+        )
+        self.queue_label.setText(
+            f"Scheduler: {queue['depth']} queued (max {queue['max_depth']}), "
+            f"{queue.get('replaced', 0)} replaced, {queue.get('coalesced', 0)} coalesced"
+            + (f", {waits}" if waits else "")
+        )
+
+        caches = metrics.cache_summary()
+        self.cache_label.setText("\n".join(
+            f"{name.capitalize()} cache: {c['hits']} hits, {c['misses']} misses "
+            f"({c['hit_rate'] * 100:.0f}% hit rate), {c['evictions']} evictions, {c['entries']} entries"
+            for name, c in caches.items()
+        ))
+
+        entries = metrics.snapshot()[::-1]  # Newest first
+        self.table.setRowCount(len(entries))
+        for row, entry in enumerate(entries):
+            cells = [
+                time.strftime("%H:%M:%S", time.localtime(entry.started)),
+                entry.endpoint, entry.model, entry.status,
+                _ms(entry.queue_wait_s), _ms(entry.connect_s) if not entry.reused else "reused",
+                _ms(entry.ttft_s), _ms(entry.total_s),
+                str(entry.eval_count if entry.eval_count is not None else entry.chunks),
+                _rate(entry.tokens_per_s), _ms(entry.prompt_eval_s), _ms(entry.eval_s),
+            ]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if entry.error:
+                    item.setToolTip(entry.error)
+                self.table.setItem(row, column, item)
+
+    def export(self, fmt: str):
+        """Save the buffered metrics as JSON or Prometheus text."""
+        if fmt == "json":
+            path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "clipboard_ai_metrics.json",
+                                                  "JSON (*.json)")
+            data = metrics.to_json()
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "clipboard_ai_metrics.prom",
+                                                  "Prometheus text (*.prom *.txt)")
+            data = metrics.to_prometheus()
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Error exporting metrics: {e}")
+
+    def clear(self):
+        metrics.clear()
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
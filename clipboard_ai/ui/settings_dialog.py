@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from ..config import config
-from ..ollama_integration import ollama
+from ..model_catalog import model_catalog
 
 class SettingsDialog(QDialog):
     """
@@ -23,22 +23,35 @@ class SettingsDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Clipboard AI Settings")
         self.setMinimumWidth(450)
-        self.check_dependencies()
+        self._dependencies_checked = False
+        # The model list comes from the catalog at once; a refresh updates it in the background
+        model_catalog.changed.connect(self.populate_models)
+        model_catalog.refreshed.connect(self._on_catalog_refreshed)
+        model_catalog.refresh_failed.connect(self._on_catalog_failed)
         self.init_ui()
+        if not model_catalog.is_stale():
+            self.check_dependencies()
+
+    def _on_catalog_refreshed(self):
+        if not self._dependencies_checked:
+            self.check_dependencies()
+
+    def _on_catalog_failed(self, error: str):
+        if not self._dependencies_checked:
+            self._dependencies_checked = True
+            self.show_ollama_missing()
 
     def check_dependencies(self):
-        """Check if Ollama is installed and required models are available."""
+        """Warn, once, if the selected models are not installed in Ollama."""
+        self._dependencies_checked = True
         try:
-            # Check if Ollama is available
-            models = ollama.list_models()
-            
             # Check for required models
             required_models = {
                 'text': config.get("selected_model", "gemma3:latest"),
                 'image': config.get("image_model", "gemma3:latest")
             }
             
-            available_models = {model.get("name", "") for model in models}
+            available_models = set(model_catalog.names())
             missing_models = []
             
             for model_type, model_name in required_models.items():
@@ -61,16 +74,20 @@ class SettingsDialog(QDialog):
                 msg.exec()
                 
         except Exception as e:
-            from PyQt6.QtWidgets import QMessageBox
-            msg = QMessageBox()
-            msg.setIcon(QMessageBox.Icon.Critical)
-            msg.setWindowTitle("Ollama Not Found")
-            msg.setText("Unable to connect to Ollama")
-            msg.setInformativeText(
-                "Please ensure Ollama is installed and running.\n\n" 
-                "Visit https://ollama.ai for installation instructions."
-            )
-            msg.exec()
+            print(f"Error checking models: {e}")
+            self.show_ollama_missing()
+
+    def show_ollama_missing(self):
+        from PyQt6.QtWidgets import QMessageBox
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Icon.Critical)
+        msg.setWindowTitle("Ollama Not Found")
+        msg.setText("Unable to connect to Ollama")
+        msg.setInformativeText(
+            "Please ensure Ollama is installed and running.\n\n" 
+            "Visit https://ollama.ai for installation instructions."
+        )
+        msg.exec()
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -157,26 +174,26 @@ class SettingsDialog(QDialog):
         self.setLayout(layout)
 
         # Initialize combos with current settings
-        self.refresh_models()
+        self.populate_models()
 
     def refresh_models(self):
-        """Refresh the list of available models and populate both combos."""
-        self.text_model_combo.clear()
-        self.image_model_combo.clear()
+        """Ask Ollama for the model list again; the combos update when it arrives."""
+        model_catalog.refresh(force=True)
 
-        # Retrieve all models from Ollama
-        models = ollama.list_models()
+    def populate_models(self):
+        """Fill both combos from the model catalog's snapshot, which never waits on Ollama."""
+        # Keep what the user picked but has not saved yet
+        current_text_model = self.text_model_combo.currentText() or config.get("selected_model", "deepseek-r1:8b")
+        current_image_model = self.image_model_combo.currentText() or config.get("image_model", "llava:latest")
 
-        # Current selections from config
-        current_text_model = config.get("selected_model", "deepseek-r1:8b")
-        current_image_model = config.get("image_model", "llava:latest")
+        self.text_model_combo.clear()
+        self.image_model_combo.clear()
 
         # Populate combos
-        for model in models:
-            model_name = model.get("name", "")
+        for model in model_catalog.snapshot():
             # Add to both combos
-            self.text_model_combo.addItem(model_name)
-            self.image_model_combo.addItem(model_name)
+            self.text_model_combo.addItem(model.name)
+            self.image_model_combo.addItem(model.name)
 
         # Try to select the current config value for text model
         idx_text = self.text_model_combo.findText(current_text_model)
@@ -0,0 +1,58 @@
+from typing import List
+from PyQt6.QtCore import QObject, QTimer
+
+
+class StreamRenderer(QObject):
+    """Buffers streamed chunks and appends them to a message at a capped frame rate.
+
+    Tokens arrive far faster than the screen refreshes; re-laying out the whole
+    message for each one makes rendering cost grow with the square of the
+    answer length.  Chunks are collected in a Python list and appended to the
+    target in one go at most ``fps`` times per second.  The first chunk after a
+    quiet period is shown immediately so time-to-first-token is unaffected.
+    """
+
+    def __init__(self, fps: int = 30, parent=None):
+        super().__init__(parent)
+        self._pending: List[str] = []
+        self._target = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(max(1, 1000 // fps))
+        self.timer.timeout.connect(self.flush)
+
+    @property
+    def target(self):
+        return self._target
+
+    def attach(self, target) -> None:
+        """Send subsequent chunks to target, which must provide append_text(str)."""
+        self.flush()
+        self._target = target
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        self._pending.append(text)
+        if not self.timer.isActive():
+            # Leading edge: render now, then throttle while chunks keep coming
+            self.flush()
+            self.timer.start()
+
+    def flush(self) -> None:
+        if not self._pending:
+            self.timer.stop()
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        if self._target is not None:
+            try:
+                self._target.append_text(text)
+            except RuntimeError:
+                # The message widget was deleted under us
+                self._target = None
+
+    def reset(self) -> None:
+        """Drop buffered chunks and detach from the current target."""
+        self._pending.clear()
+        self._target = None
+        self.timer.stop()
@@ -1,7 +1,6 @@
 from PyQt6.QtWidgets import QSystemTrayIcon, QMenu, QApplication, QStyle
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import pyqtSignal, QObject
-from .settings_dialog import SettingsDialog
 from ..config import config
 
 class SystemTray(QSystemTrayIcon):
@@ -13,6 +12,8 @@ class SystemTray(QSystemTrayIcon):
         # Initialize state
         self.is_paused = False
         self.settings_dialog = None
+        self.metrics_dialog = None
+        self.history_dialog = None
 
     def init_ui(self):
         """Initialize the system tray UI."""
@@ -32,6 +33,12 @@ class SystemTray(QSystemTrayIcon):
         # Settings and quit actions
         self.settings_action = self.menu.addAction("Settings")
         self.settings_action.triggered.connect(self.show_settings)
+
+        self.history_action = self.menu.addAction("History")
+        self.history_action.triggered.connect(self.show_history)
+
+        self.metrics_action = self.menu.addAction("Performance")
+        self.metrics_action.triggered.connect(self.show_metrics)
         
         self.menu.addSeparator()
         
@@ -69,11 +76,40 @@ class SystemTray(QSystemTrayIcon):
     def show_settings(self):
         """Show the settings dialog."""
         if not self.settings_dialog:
+            # Imported on first use, it pulls in the Ollama client
+            from .settings_dialog import SettingsDialog
             self.settings_dialog = SettingsDialog()
+            self.settings_dialog.settings_updated.connect(self._on_settings_updated)
         self.settings_dialog.show()
         self.settings_dialog.raise_()
         self.settings_dialog.activateWindow()
 
+    def show_history(self):
+        """Show the searchable clipboard and answer history."""
+        if not self.history_dialog:
+            from .history_dialog import HistoryDialog
+            self.history_dialog = HistoryDialog()
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+        self.history_dialog.activateWindow()
+
+    def show_metrics(self):
+        """Show the request performance window."""
+        if not self.metrics_dialog:
+            from .metrics_dialog import MetricsDialog
+            self.metrics_dialog = MetricsDialog()
+        self.metrics_dialog.show()
+        self.metrics_dialog.raise_()
+        self.metrics_dialog.activateWindow()
+
+    def _on_settings_updated(self):
+        if hasattr(self, 'settings_callback'):
+            self.settings_callback()
+
+    def set_ollama_status(self, available: bool):
+        """Reflect whether Ollama is reachable in the tray tooltip."""
+        self.setToolTip("Clipboard AI" if available else "Clipboard AI - waiting for Ollama")
+
     def show_notification(self, title: str, message: str, duration: int = None):
         """Show a notification message."""
         if duration is None:
@@ -92,4 +128,8 @@ class SystemTray(QSystemTrayIcon):
 
     def set_mode_change_callback(self, callback):
         """Set the callback for mode change events."""
-        self.mode_change_callback = callback 
\ No newline at end of file
+        self.mode_change_callback = callback 
+
+    def set_settings_callback(self, callback):
+        """Set the callback for saved settings."""
+        self.settings_callback = callback
\ No newline at end of file
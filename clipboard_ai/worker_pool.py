@@ -0,0 +1,114 @@
+# clipboard_ai/worker_pool.py
+import itertools
+import time
+from typing import Dict, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from .config import config
+
+
+class _WorkerRunnable(QRunnable):
+    """Runs a worker's process() method on a pool thread."""
+
+    def __init__(self, pool: "WorkerPool", job_id: int, worker: QObject):
+        super().__init__()
+        # The pool keeps the runnable alive until the job is reported finished
+        self.setAutoDelete(False)
+        self.pool = pool
+        self.job_id = job_id
+        self.worker = worker
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+
+    def run(self):
+        self.started_at = time.perf_counter()
+        self.pool._job_started.emit(self.job_id)
+        try:
+            self.worker.process()
+        except Exception as e:
+            print(f"Unhandled error in worker job {self.job_id}: {e}")
+        finally:
+            self.pool._job_done.emit(self.job_id)
+
+
+class WorkerPool(QObject):
+    """Bounded, long-lived pool that runs TextWorker/ImageWorker jobs.
+
+    Workers are plain QObjects with a ``process()`` method.  Their signals are
+    emitted from a pool thread and reach GUI-thread receivers as queued
+    connections, exactly as they did with a dedicated QThread per request.
+    """
+    job_started = pyqtSignal(int)
+    job_finished = pyqtSignal(int)
+
+    # Internal cross-thread notifications
+    _job_started = pyqtSignal(int)
+    _job_done = pyqtSignal(int)
+
+    def __init__(self, max_workers: int = None, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, max_workers or config.get("worker_pool_size", 2)))
+        # Keep idle threads around instead of re-spawning them for every request
+        self._pool.setExpiryTimeout(-1)
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, _WorkerRunnable] = {}
+        self._running = set()
+        self._job_started.connect(self._on_job_started)
+        self._job_done.connect(self._on_job_done)
+
+    def submit(self, worker: QObject) -> int:
+        """Queue a worker and return its job id."""
+        job_id = next(self._ids)
+        runnable = _WorkerRunnable(self, job_id, worker)
+        self._jobs[job_id] = runnable
+        self._pool.start(runnable)
+        return job_id
+
+    def cancel(self, job_id: Optional[int]) -> bool:
+        """Drop a job that has not started yet. Returns True if it was removed."""
+        runnable = self._jobs.get(job_id)
+        if runnable is None or job_id in self._running:
+            return False
+        if self._pool.tryTake(runnable):
+            del self._jobs[job_id]
+            self.job_finished.emit(job_id)
+            return True
+        return False
+
+    def is_active(self, job_id: Optional[int]) -> bool:
+        """Whether the job is still queued or running."""
+        return job_id in self._jobs
+
+    def worker(self, job_id: Optional[int]) -> Optional[QObject]:
+        runnable = self._jobs.get(job_id)
+        return runnable.worker if runnable else None
+
+    def pending_count(self) -> int:
+        return len(self._jobs) - len(self._running)
+
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def max_workers(self) -> int:
+        return self._pool.maxThreadCount()
+
+    def _on_job_started(self, job_id: int):
+        if job_id in self._jobs:
+            self._running.add(job_id)
+            self.job_started.emit(job_id)
+
+    def _on_job_done(self, job_id: int):
+        self._running.discard(job_id)
+        if self._jobs.pop(job_id, None) is not None:
+            self.job_finished.emit(job_id)
+
+    def shutdown(self, timeout_ms: int = 3000) -> bool:
+        """Drop queued jobs and wait for running ones to finish."""
+        self._pool.clear()
+        for job_id in list(self._jobs):
+            if job_id not in self._running:
+                del self._jobs[job_id]
+        done = self._pool.waitForDone(timeout_ms)
+        if not done:
+            print(f"Worker pool did not drain within {timeout_ms} ms")
+        return done
@@ -27,12 +27,17 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "PyQt6>=6.6.1",
-        "requests>=2.31.0",
         "keyboard>=0.13.5",
         "python-dotenv>=1.0.0",
         "pyperclip>=1.8.2",
         "appdirs>=1.4.4",
     ],
+    extras_require={
+        # Faster decoding of streamed responses; the standard json module is used otherwise
+        "fast": ["orjson>=3.8"],
+        # Vector index of the semantic response cache
+        "semantic": ["numpy>=1.21"],
+    },
     entry_points={
         "console_scripts": [
             "clipboard-ai=clipboard_ai:main",